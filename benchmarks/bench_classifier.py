@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Clasificación por palabras clave
+=============================================
+Compara la clasificación de hallazgos de Nikto de los dos puntos que la
+usan (severidad preliminar del parser y severidad y OWASP del intérprete):
+
+- cadenas:       `any(word in desc for word in [...])` por regla
+                 (comportamiento anterior)
+- clasificador:  scanagent.classifier.KeywordClassifier, una alternancia
+                 compilada por clasificador y caché de textos repetidos
+
+Mide hallazgos con descripciones repetidas (como en Nikto), textos
+distintos sin caché y, con reglas sintéticas, cómo crece cada método con
+el número de palabras clave.
+
+Antes de medir comprueba que ambos clasifican igual sobre las descripciones
+medidas y sobre textos aleatorios construidos con las palabras clave.
+
+Uso:
+    python benchmarks/bench_classifier.py
+    python benchmarks/bench_classifier.py --findings 200000 --words 40
+    python benchmarks/bench_classifier.py --keywords 10,100,1000
+
+Autor: Scan Agent Team
+Versión: 1.0.0
+"""
+
+import argparse
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from scanagent.classifier import KeywordClassifier, load_rules
+from scanagent.interpreter import NIKTO_RULES
+from scanagent.parser import NIKTO_SEVERITY
+
+import synthetic
+
+FILLER = ["the", "server", "file", "found", "may", "be", "remote", "code", "injection",
+          "this", "path", "default", "allows", "http", "method", "is", "set", "xx"]
+
+
+def parser_chain(desc: str) -> str:
+    """ScanParser: nikto_severity anterior"""
+    desc = desc.lower()
+    if any(word in desc for word in ['critical', 'sql injection', 'rce', 'remote code']):
+        return "critica"
+    if any(word in desc for word in ['high', 'xss', 'csrf', 'authentication']):
+        return "alta"
+    if any(word in desc for word in ['info', 'information', 'disclosure']):
+        return "baja"
+    return "media"
+
+
+def interpreter_chain(desc: str) -> tuple:
+    """VulnerabilityInterpreter: _determine_nikto_severity y _map_nikto_to_owasp anteriores"""
+    desc_lower = desc.lower()
+    if any(word in desc_lower for word in ['critical', 'sql injection', 'rce', 'remote code', 'authentication bypass']):
+        severidad = "critica"
+    elif any(word in desc_lower for word in ['high', 'xss', 'csrf', 'password', 'credential']):
+        severidad = "alta"
+    elif any(word in desc_lower for word in ['medium', 'disclosure', 'misconfiguration']):
+        severidad = "media"
+    else:
+        severidad = "baja"
+
+    desc_lower = desc.lower()
+    if any(word in desc_lower for word in ['sql injection', 'xss', 'injection']):
+        owasp = "A03:2021 - Injection"
+    elif any(word in desc_lower for word in ['authentication', 'password', 'login']):
+        owasp = "A07:2021 - Identification and Authentication Failures"
+    elif any(word in desc_lower for word in ['directory', 'admin', 'access']):
+        owasp = "A01:2021 - Broken Access Control"
+    elif any(word in desc_lower for word in ['configuration', 'header', 'server']):
+        owasp = "A05:2021 - Security Misconfiguration"
+    elif any(word in desc_lower for word in ['outdated', 'version', 'vulnerable']):
+        owasp = "A06:2021 - Vulnerable and Outdated Components"
+    else:
+        owasp = "A05:2021 - Security Misconfiguration"
+    return severidad, owasp
+
+
+def with_chains(descriptions: list) -> list:
+    return [(parser_chain(d), interpreter_chain(d)) for d in descriptions]
+
+
+def with_classifier(descriptions: list) -> list:
+    return [(NIKTO_SEVERITY.classify(d)[0], NIKTO_RULES.classify(d)) for d in descriptions]
+
+
+def without_cache(descriptions: list) -> list:
+    """El clasificador sin la caché de textos repetidos"""
+    return [(NIKTO_SEVERITY._match(d)[0], NIKTO_RULES._match(d)) for d in descriptions]
+
+
+def scaling(keywords: int, descriptions: list, repeat: int, rng: random.Random) -> tuple:
+    """Cadenas frente a alternancia con `keywords` palabras sintéticas en 5 reglas"""
+    words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 12)))
+             for _ in range(keywords)]
+    rules = [{"label": str(i), "keywords": words[i::5]} for i in range(5)]
+    classifier = KeywordClassifier({"sintetico": {"default": "-", "rules": rules}}, cache_size=0)
+
+    def chain(desc: str) -> str:
+        desc = desc.lower()
+        for rule in rules:
+            if any(word in desc for word in rule["keywords"]):
+                return rule["label"]
+        return "-"
+
+    chains_ms = measure(lambda: [chain(d) for d in descriptions], repeat)
+    classifier_ms = measure(lambda: [classifier.classify(d) for d in descriptions], repeat)
+    return chains_ms, classifier_ms
+
+
+def random_texts(count: int, words: int, rng: random.Random) -> list:
+    """Textos con palabras clave, fragmentos y relleno, sin separar a veces"""
+    keywords = sorted({word for ruleset in load_rules().values()
+                       for rule in ruleset["rules"] for word in rule["keywords"]})
+    vocabulary = keywords + FILLER + [word[:len(word) // 2] for word in keywords]
+    texts = []
+    for _ in range(count):
+        parts = [rng.choice(vocabulary) for _ in range(rng.randint(0, words))]
+        texts.append("".join(part.upper() if rng.random() < 0.1 else part
+                             for pair in zip(parts, [rng.choice(["", " ", "-"]) for _ in parts])
+                             for part in pair))
+    return texts
+
+
+def measure(func, repeat: int) -> float:
+    """Retorna el mejor tiempo en milisegundos de `repeat` ejecuciones"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de la clasificación por palabras clave")
+    parser.add_argument("--findings", type=int, default=100000, help="Hallazgos de Nikto a clasificar")
+    parser.add_argument("--words", type=int, default=12, help="Palabras máximas de los textos aleatorios")
+    parser.add_argument("--keywords", default="10,100,1000",
+                        help="Palabras clave de las reglas sintéticas, separadas por comas")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por medición")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    descriptions = [f"/{rng.choice(synthetic.PATHS)}/: {rng.choice(synthetic.NIKTO_FINDINGS)}"
+                    for _ in range(args.findings)]
+    texts = random_texts(args.findings, args.words, rng)
+
+    for name, sample in (("hallazgos", descriptions), ("textos aleatorios", texts)):
+        for text, old, new, uncached in zip(sample, with_chains(sample), with_classifier(sample),
+                                            without_cache(sample)):
+            if not old == new == uncached:
+                print(f"[ERROR] Clasificación distinta ({name}): {text!r}\n  anterior: {old}\n  nueva:    {new}")
+                return 1
+
+    rows = [
+        ("hallazgos nikto", with_chains, with_classifier, descriptions),
+        ("hallazgos sin caché", with_chains, without_cache, descriptions),
+        ("textos sin caché", with_chains, without_cache, texts),
+    ]
+    print(f"{args.findings} hallazgos - mejor de {args.repeat}\n")
+    print(f"{'':<24} {'cadenas':>10} {'clasificador':>13} {'mejora':>8}")
+    for name, chains, classifier, sample in rows:
+        chains_ms = measure(lambda: chains(sample), args.repeat)
+        classifier_ms = measure(lambda: classifier(sample), args.repeat)
+        print(f"{name:<24} {chains_ms:>8.1f}ms {classifier_ms:>11.1f}ms {chains_ms / classifier_ms:>7.2f}x")
+
+    print(f"\n{'palabras clave (textos)':<24} {'cadenas':>10} {'clasificador':>13} {'mejora':>8}")
+    for keywords in (int(k) for k in args.keywords.split(",")):
+        chains_ms, classifier_ms = scaling(keywords, texts, args.repeat, rng)
+        print(f"{keywords:<24} {chains_ms:>8.1f}ms {classifier_ms:>11.1f}ms {chains_ms / classifier_ms:>7.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Registro de expresiones regulares
+==============================================
+Compara el coste de las expresiones regulares de los parsers sobre miles
+de directorios de escaneo en un mismo proceso:
+
+- cadenas:  patrones como cadenas en re.search/re.finditer/re.match en cada
+            llamada (comportamiento anterior, con la caché interna de re)
+- registro: patrones precompilados de scanagent.patterns
+
+Las salidas se leen a memoria antes de medir, para aislar el coste de las
+expresiones regulares. Además se mide el parseo completo actual
+(ScanParser.parse_all y ScanResultParser.parse_all_files) por directorio.
+
+Uso:
+    python benchmarks/bench_patterns.py
+    python benchmarks/bench_patterns.py --dirs 5000 --lines 60
+
+Autor: Scan Agent Team
+Versión: 1.0.0
+"""
+
+import argparse
+import contextlib
+import io
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from scanagent import patterns
+from scanagent.parser import ScanParser
+from webapp.utils.report_parser import ScanResultParser
+
+import synthetic
+
+NSE_PATTERNS = [r'VULNERABLE:', r'CVE-\d{4}-\d+', r'http-sql-injection', r'http-csrf', r'ssl-.*-vulnerable']
+OS_PATTERNS = [r'Service Info: OS: ([^;]+)', r'Running: ([^,\n]+)', r'OS details: ([^\n]+)']
+
+
+def with_strings(files: dict) -> int:
+    """Expresiones regulares como antes: cadenas en cada llamada"""
+    found = 0
+    service, nse, headers = files["nmap_service"], files["nmap_nse"], files["headers"]
+    curl, nikto = files["curl_verbose"], files["nikto"]
+
+    for pattern in NSE_PATTERNS:
+        found += sum(1 for _ in re.finditer(pattern, nse, re.IGNORECASE))
+    found += bool(re.search(r'(TLSv\d\.\d|SSLv\d)', nse))
+    for line in headers.split('\n'):
+        found += bool(re.match(r'^([A-Za-z0-9-]+):\s*(.+)$', line.strip()))
+    found += bool(re.search(r'HTTP/[\d.]+\s+(\d+)\s+(.+)', curl))
+    found += bool(re.search(r'(TLSv[\d.]+)', curl))
+    found += bool(re.search(r'Cipher:\s*(.+)', curl))
+    found += bool(re.search(r'Location:\s*(.+)', curl))
+    found += bool(re.search(r'Server:\s*(.+)', nikto))
+
+    found += bool(re.search(r'Host is up \(([0-9.]+)s latency\)', service))
+    for match in re.finditer(r'(\d+)/(tcp|udp)\s+(open|filtered|closed)\s+(\S+)\s*(.*)?', service):
+        if match.group(5):
+            found += bool(re.search(r'([A-Za-z0-9\-\.]+)\s+([\d\.]+)', match.group(5)))
+    for pattern in OS_PATTERNS:
+        if re.search(pattern, service):
+            found += 1
+            break
+    found += bool(re.search(r'CPE: (cpe:[^\s]+)', service))
+    return found
+
+
+def with_registry(files: dict) -> int:
+    """Las mismas búsquedas con los patrones de scanagent.patterns"""
+    found = 0
+    service, nse, headers = files["nmap_service"], files["nmap_nse"], files["headers"]
+    curl, nikto = files["curl_verbose"], files["nikto"]
+
+    for pattern in patterns.NSE_INDICATORS:
+        found += sum(1 for _ in pattern.finditer(nse))
+    found += bool(patterns.SSL_VERSION.search(nse))
+    found += sum(1 for _ in patterns.HEADER_LINE.finditer(headers))
+    found += bool(patterns.HTTP_STATUS.search(curl))
+    found += bool(patterns.TLS_VERSION.search(curl))
+    found += bool(patterns.CIPHER.search(curl))
+    found += bool(patterns.LOCATION.search(curl))
+    found += bool(patterns.SERVER.search(nikto))
+
+    found += bool(patterns.NMAP_LATENCY.search(service))
+    for match in patterns.NMAP_PORT.finditer(service):
+        if match.group(5):
+            found += bool(patterns.PRODUCT_VERSION.search(match.group(5)))
+    for pattern in patterns.NMAP_OS:
+        if pattern.search(service):
+            found += 1
+            break
+    found += bool(patterns.NMAP_CPE.search(service))
+    return found
+
+
+def measure(func, repeat: int) -> float:
+    """Retorna el mejor tiempo en milisegundos de `repeat` ejecuciones"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark del registro de expresiones regulares")
+    parser.add_argument("--dirs", type=int, default=2000, help="Directorios de escaneo")
+    parser.add_argument("--lines", type=int, default=60, help="Líneas aproximadas por directorio")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por medición")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_patterns_") as tmp:
+        scans = []
+        for i in range(args.dirs):
+            scan_dir = Path(tmp) / f"scan_{i}"
+            ip = synthetic.generate(str(scan_dir), 1, args.lines, seed=i)[0]
+            files = {kind: (scan_dir / f"{kind}_{ip}.txt").read_text(encoding="utf-8")
+                     for kind in ("nmap_service", "nmap_nse", "headers", "curl_verbose", "nikto")}
+            scans.append((scan_dir, ip, files))
+
+        if sum(with_strings(f) for _, _, f in scans) != sum(with_registry(f) for _, _, f in scans):
+            print("[ERROR] Los patrones del registro no encuentran lo mismo que las cadenas")
+            return 1
+
+        strings_ms = measure(lambda: [with_strings(f) for _, _, f in scans], args.repeat)
+        registry_ms = measure(lambda: [with_registry(f) for _, _, f in scans], args.repeat)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            scan_parser_ms = measure(
+                lambda: [ScanParser(str(d)).parse_all(ip) for d, ip, _ in scans], args.repeat)
+            result_parser_ms = measure(
+                lambda: [ScanResultParser().parse_all_files(d, ip) for d, ip, _ in scans], args.repeat)
+
+    print(f"{args.dirs} directorios x {args.lines} líneas - mejor de {args.repeat}\n")
+    print(f"{'expresiones regulares':<28} {'ms':>9} {'µs/dir':>9}")
+    print(f"{'cadenas (anterior)':<28} {strings_ms:>7.1f}ms {strings_ms * 1000 / args.dirs:>9.1f}")
+    print(f"{'registro precompilado':<28} {registry_ms:>7.1f}ms {registry_ms * 1000 / args.dirs:>9.1f}")
+    print(f"{'mejora':<28} {strings_ms / registry_ms:>8.2f}x\n")
+    print(f"{'parseo completo':<28} {'ms':>9} {'µs/dir':>9}")
+    print(f"{'ScanParser.parse_all':<28} {scan_parser_ms:>7.1f}ms {scan_parser_ms * 1000 / args.dirs:>9.1f}")
+    print(f"{'ScanResultParser':<28} {result_parser_ms:>7.1f}ms {result_parser_ms * 1000 / args.dirs:>9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
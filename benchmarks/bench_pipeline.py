@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Pipeline de análisis
+=================================
+Mide cada etapa del pipeline sobre salidas sintéticas (ver synthetic.py):
+
+- parse:        ScanParser.parse_all, un host cada vez
+- analyze:      VulnerabilityInterpreter.analyze
+- report.<fmt>: ReportGenerator en txt, json, html y md
+- db.save_scan: DatabaseManager.save_scan sobre una BD vacía
+- db.queries:   get_all_scans, get_scan_detail, get_targets, get_statistics
+- dashboard:    DashboardGenerator.generate con los datos de la BD
+
+Cada etapa reporta el mejor tiempo total de `--repeat` ejecuciones sobre
+todos los hosts. Las referencias se guardan en baselines/pipeline.json por
+escala (hosts x líneas); con --check, una etapa más lenta que su referencia
+por encima de --tolerance hace que el script termine con código 1.
+
+Uso:
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --hosts 100 --lines 1000 --repeat 1
+    python benchmarks/bench_pipeline.py --check
+    python benchmarks/bench_pipeline.py --save-baseline
+
+Autor: Scan Agent Team
+Versión: 1.0.0
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from scanagent.dashboard_generator import DashboardGenerator
+from scanagent.database import DatabaseManager
+from scanagent.interpreter import VulnerabilityInterpreter
+from scanagent.parser import ScanParser
+from scanagent.report_generator import ReportGenerator
+
+import synthetic
+
+BASELINES_FILE = Path(__file__).resolve().parent / "baselines" / "pipeline.json"
+
+REPORT_FORMATS = {
+    "txt": ("generate_txt_report", "informe_tecnico.txt"),
+    "json": ("generate_json_report", "informe_tecnico.json"),
+    "html": ("generate_html_report", "informe_tecnico.html"),
+    "md": ("generate_markdown_report", "informe_tecnico.md"),
+}
+
+
+def measure(func, repeat: int) -> float:
+    """Retorna el mejor tiempo en milisegundos de `repeat` ejecuciones"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+@contextlib.contextmanager
+def quiet():
+    """Descarta los mensajes de progreso del pipeline mientras se mide"""
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def run_stages(work_dir: Path, hosts: int, lines: int, repeat: int, seed: int) -> dict:
+    """Genera las salidas y mide cada etapa. Retorna {etapa: ms}"""
+    outputs_dir = work_dir / "outputs"
+    reports_dir = work_dir / "reports"
+    reports_dir.mkdir()
+    ips = synthetic.generate(str(outputs_dir), hosts, lines, seed)
+    results = {}
+
+    parsed = {}
+
+    def parse():
+        for ip in ips:
+            parsed[ip] = ScanParser(str(outputs_dir)).parse_all(ip)
+
+    analyses = {}
+
+    def analyze():
+        for ip in ips:
+            analyses[ip] = VulnerabilityInterpreter(parsed[ip]).analyze()
+
+    with quiet():
+        results["parse"] = measure(parse, repeat)
+        results["analyze"] = measure(analyze, repeat)
+
+        for fmt, (method, filename) in REPORT_FORMATS.items():
+            output_file = str(reports_dir / filename)
+
+            def report():
+                for ip in ips:
+                    getattr(ReportGenerator(analyses[ip]), method)(output_file)
+
+            results[f"report.{fmt}"] = measure(report, repeat)
+
+        # Cada repetición parte de una BD vacía; las consultas usan la última
+        databases = []
+
+        def save_scans():
+            db = DatabaseManager(db_path=str(work_dir / f"bench_{len(databases)}.db"))
+            databases.append(db)
+            for ip in ips:
+                db.save_scan(
+                    target_ip=ip,
+                    profile_used="standard",
+                    duration_seconds=60,
+                    status="completed",
+                    analysis_data=analyses[ip],
+                    parsed_data=parsed[ip],
+                    files_processed=6,
+                    tools_used=["nmap", "nikto", "gobuster", "curl"]
+                )
+
+        results["db.save_scan"] = measure(save_scans, repeat)
+        db = databases[-1]
+
+        def queries():
+            scans = db.get_all_scans(limit=1000)
+            for scan in scans:
+                db.get_scan_detail(scan["id"])
+            db.get_targets()
+            db.get_statistics()
+
+        results["db.queries"] = measure(queries, repeat)
+
+        dashboard = DashboardGenerator(output_dir=str(reports_dir))
+        targets = db.get_targets()
+        all_scans = db.get_all_scans(limit=1000)
+        results["dashboard"] = measure(
+            lambda: dashboard.generate(targets=targets, all_scans=all_scans, output_file="dashboard.html"),
+            repeat
+        )
+
+        for database in databases:
+            database.close()
+
+    return results
+
+
+def load_baselines() -> dict:
+    if BASELINES_FILE.exists():
+        return json.loads(BASELINES_FILE.read_text(encoding="utf-8"))
+    return {}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline de análisis")
+    parser.add_argument("--hosts", type=int, default=10, help="Hosts sintéticos")
+    parser.add_argument("--lines", type=int, default=1000, help="Líneas aproximadas por host")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por medición")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla del generador")
+    parser.add_argument("--check", action="store_true",
+                        help="Comparar con la referencia guardada y fallar si hay regresiones")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Margen sobre la referencia antes de considerar regresión (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Guardar los resultados como referencia de esta escala")
+    parser.add_argument("--output", help="Guardar resultados en un archivo JSON")
+    args = parser.parse_args()
+
+    scale = f"{args.hosts}x{args.lines}"
+    with tempfile.TemporaryDirectory(prefix="bench_pipeline_") as tmp:
+        results = run_stages(Path(tmp), args.hosts, args.lines, args.repeat, args.seed)
+
+    baselines = load_baselines()
+    baseline = baselines.get(scale, {})
+
+    print(f"Escala: {args.hosts} hosts x {args.lines} líneas - mejor de {args.repeat}\n")
+    print(f"{'etapa':<14} {'ms':>10} {'ms/host':>10} {'referencia':>11} {'cambio':>8}")
+
+    regressions = []
+    for stage, ms in results.items():
+        reference = baseline.get(stage)
+        if reference:
+            change = ms / reference - 1
+            if change > args.tolerance:
+                regressions.append(stage)
+            compared = f"{reference:>9.1f}ms {change:>+7.0%}"
+        else:
+            compared = f"{'-':>11} {'-':>8}"
+        print(f"{stage:<14} {ms:>8.1f}ms {ms / args.hosts:>8.2f}ms {compared}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"scale": scale, "stages_ms": results}, indent=2),
+                                     encoding="utf-8")
+        print(f"\nResultados guardados en: {args.output}")
+
+    if args.save_baseline:
+        baselines[scale] = {stage: round(ms, 3) for stage, ms in results.items()}
+        BASELINES_FILE.parent.mkdir(exist_ok=True)
+        BASELINES_FILE.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n",
+                                  encoding="utf-8")
+        print(f"\nReferencia guardada en: {BASELINES_FILE} [{scale}]")
+
+    if args.check:
+        if not baseline:
+            print(f"\n[WARN] No hay referencia para la escala {scale}")
+        elif regressions:
+            print(f"\n[ERROR] Regresiones (> {args.tolerance:.0%}): {', '.join(regressions)}")
+            return 1
+        else:
+            print(f"\n[OK] Sin regresiones respecto a la referencia")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
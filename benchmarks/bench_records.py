@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Memoria por hallazgo
+=================================
+Compara la memoria de los hallazgos como dicts (formato anterior) y como
+registros de scanagent.records.
+
+Uso:
+    python benchmarks/bench_records.py
+    python benchmarks/bench_records.py --count 200000
+
+Autor: Scan Agent Team
+Versión: 1.0.0
+"""
+
+import argparse
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from scanagent.records import NiktoFinding, PathRecord, PortRecord, Vulnerability
+
+
+def port_dict(i: int) -> dict:
+    return {"puerto": i, "protocolo": "tcp", "servicio": "http", "estado": "open", "version": "Apache"}
+
+
+def port_record(i: int) -> PortRecord:
+    return PortRecord(puerto=i, protocolo="tcp", servicio="http", estado="open", version="Apache")
+
+
+def path_dict(i: int) -> dict:
+    return {"ruta": "/admin", "codigo_http": 200, "tamano": i}
+
+
+def path_record(i: int) -> PathRecord:
+    return PathRecord(ruta="/admin", codigo_http=200, tamano=i)
+
+
+def nikto_dict(i: int) -> dict:
+    return {"id_osvdb": "N/A", "ubicacion": "/", "descripcion": "Server leaks inodes", "fuente": "nikto"}
+
+
+def nikto_record(i: int) -> NiktoFinding:
+    return NiktoFinding(id_osvdb="N/A", ubicacion="/", descripcion="Server leaks inodes")
+
+
+def vuln_dict(i: int) -> dict:
+    return {
+        "id": "IND-1", "titulo": "Ruta expuesta", "descripcion": "", "severidad": "alta",
+        "cvss_score": 7.5, "owasp_category": "A01:2021 - Broken Access Control",
+        "fuente": "gobuster", "evidencia": None, "recomendacion": "Restringir acceso"
+    }
+
+
+def vuln_record(i: int) -> Vulnerability:
+    return Vulnerability(
+        id="IND-1", titulo="Ruta expuesta", descripcion="", severidad="alta",
+        cvss_score=7.5, owasp_category="A01:2021 - Broken Access Control",
+        fuente="gobuster", evidencia=None, recomendacion="Restringir acceso"
+    )
+
+
+def allocated(factory, count: int) -> int:
+    """Bytes asignados para crear `count` objetos (cadenas compartidas excluidas)"""
+    tracemalloc.start()
+    items = [factory(i) for i in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return size
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de memoria de registros")
+    parser.add_argument("--count", type=int, default=100000, help="Hallazgos por tipo")
+    args = parser.parse_args()
+
+    cases = [
+        ("puerto", port_dict, port_record),
+        ("ruta", path_dict, path_record),
+        ("nikto", nikto_dict, nikto_record),
+        ("vulnerabilidad", vuln_dict, vuln_record),
+    ]
+
+    print(f"{'tipo':<16} {'dict B/obj':>11} {'registro B/obj':>15} {'reducción':>10}")
+    for name, as_dict, as_record in cases:
+        dict_bytes = allocated(as_dict, args.count) / args.count
+        record_bytes = allocated(as_record, args.count) / args.count
+        print(f"{name:<16} {dict_bytes:>11.0f} {record_bytes:>15.0f} {dict_bytes / record_bytes:>9.1f}x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Serialización JSON
+===============================
+Compara los backends de scanagent.serialization sobre un análisis grande.
+
+La referencia es el comportamiento anterior del pipeline:
+json.dump(..., indent=2, ensure_ascii=False).
+
+Uso:
+    python benchmarks/bench_serialization.py
+    python benchmarks/bench_serialization.py --input analysis.json
+    python benchmarks/bench_serialization.py --vulns 20000 --output resultados.json
+
+Autor: Scan Agent Team
+Versión: 1.0.0
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from scanagent import serialization
+
+SEVERIDADES = ["critica", "alta", "media", "baja", "info"]
+
+
+def build_analysis(vulns: int) -> dict:
+    """Genera un análisis sintético con la forma de VulnerabilityInterpreter.analyze()"""
+    vulnerabilidades = []
+    for i in range(vulns):
+        contexto = (
+            f"PORT   STATE SERVICE\n{80 + i % 1000}/tcp open  http\n"
+            f"| http-vuln-cve2021-{41773 + i}:\n|   VULNERABLE:\n"
+            f"|   Path traversal CVE-2021-{41773 + i} en /cgi-bin/ñ{i}"
+        )
+        vulnerabilidades.append({
+            "id": f"VULN-{i + 1}",
+            "titulo": f"Vulnerabilidad detectada #{i}",
+            "descripcion": contexto,
+            "severidad": SEVERIDADES[i % len(SEVERIDADES)],
+            "cvss_score": round((i % 100) / 10, 1),
+            "owasp_category": "A05:2021 - Security Misconfiguration",
+            "fuente": "nmap_nse" if i % 2 else "nikto",
+            "evidencia": {"fuente": "nmap_nse", "tipo": "VULNERABLE:", "contexto": contexto},
+            "recomendacion": "Revisar y remediar según mejores prácticas de seguridad"
+        })
+
+    return {
+        "metadata": {"target_ip": "10.0.0.5", "total_vulnerabilities": vulns},
+        "resumen_ejecutivo": {"total_vulnerabilidades": vulns, "nivel_riesgo_general": "ALTO"},
+        "superficie_ataque": {
+            "puertos_abiertos": [{"puerto": p, "servicio": "http", "version": "Apache 2.4.49"}
+                                 for p in range(0, vulns // 10)]
+        },
+        "tecnologias_detectadas": {"servidor_web": "Apache/2.4.49", "lenguajes": ["PHP/7.4"]},
+        "vulnerabilidades": vulnerabilidades,
+        "resumen_riesgos": {s: vulns // len(SEVERIDADES) for s in SEVERIDADES},
+        "recomendaciones": {"inmediatas": ["Actualizar Apache"] * 10}
+    }
+
+
+def measure(func, repeat: int) -> float:
+    """Retorna el mejor tiempo en milisegundos de `repeat` ejecuciones"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de serialización JSON")
+    parser.add_argument("--input", help="Análisis JSON real a usar en lugar del sintético")
+    parser.add_argument("--vulns", type=int, default=5000, help="Vulnerabilidades del análisis sintético")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por medición")
+    parser.add_argument("--output", help="Guardar resultados en un archivo JSON")
+    args = parser.parse_args()
+
+    if args.input:
+        data = json.loads(Path(args.input).read_text(encoding="utf-8"))
+        source = args.input
+    else:
+        data = build_analysis(args.vulns)
+        source = f"sintético ({args.vulns} vulnerabilidades)"
+
+    reference = json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+    baseline = measure(lambda: json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8"), args.repeat)
+
+    print(f"Análisis: {source} - {len(reference) / 1024:.0f} KiB indentado")
+    print(f"Referencia json.dumps(indent=2): {baseline:.1f} ms\n")
+    print(f"{'backend':<10} {'compacto':>10} {'indentado':>10} {'lectura':>10} {'KiB':>8} {'mejora':>8}")
+
+    results = {"source": source, "baseline_ms": baseline, "backends": {}}
+    for name in serialization.BACKENDS:
+        serialization.set_backend(name)
+        compact = serialization.dumps(data)
+        compact_ms = measure(lambda: serialization.dumps(data), args.repeat)
+        pretty_ms = measure(lambda: serialization.dumps(data, pretty=True), args.repeat)
+        loads_ms = measure(lambda: serialization.loads(compact), args.repeat)
+
+        results["backends"][name] = {
+            "dumps_compact_ms": compact_ms,
+            "dumps_pretty_ms": pretty_ms,
+            "loads_ms": loads_ms,
+            "compact_bytes": len(compact)
+        }
+        print(f"{name:<10} {compact_ms:>9.1f}ms {pretty_ms:>9.1f}ms {loads_ms:>9.1f}ms "
+              f"{len(compact) / 1024:>8.0f} {baseline / compact_ms:>7.1f}x")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nResultados guardados en: {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Arranque de la CLI
+===============================
+Mide el tiempo de arranque de los subcomandos ligeros de la CLI
+(--version, --list-profiles, --show-profile) y de `import scanagent`,
+cada uno en un proceso nuevo, y lo compara con el arranque del intérprete.
+
+Además comprueba que esos subcomandos no cargan los componentes pesados
+del pipeline (parser, intérprete, informes, BD, dashboard): si alguno se
+importa, o si se supera --max-ms, el script termina con código 1.
+
+Uso:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 30 --max-ms 80
+
+Autor: Scan Agent Team
+Versión: 1.0.0
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+# Módulos que no deben cargarse sin ejecutar el pipeline
+HEAVY_MODULES = [
+    "scanagent.interpreter",
+    "scanagent.report_generator",
+    "scanagent.database",
+    "scanagent.dashboard_generator",
+    "scanagent.pipeline",
+    "sqlite3",
+]
+
+COMMANDS = {
+    "python (referencia)": ["-c", "pass"],
+    "import scanagent": ["-c", "import scanagent"],
+    "--version": ["-m", "scanagent.agent", "--version"],
+    "--list-profiles": ["-m", "scanagent.agent", "--list-profiles"],
+    "--show-profile": ["-m", "scanagent.agent", "--show-profile", "quick"],
+}
+
+# Ejecuta --list-profiles en el proceso y lista los módulos pesados cargados
+LOADED_CHECK = """
+import json, sys, runpy
+sys.argv = ["agent", "--list-profiles"]
+try:
+    runpy.run_module("scanagent.agent", run_name="__main__")
+except SystemExit:
+    pass
+print(json.dumps([name for name in {modules!r} if name in sys.modules]), file=sys.stderr)
+"""
+
+
+def environment() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC), env.get("PYTHONPATH")]))
+    return env
+
+
+def measure(args: list, repeat: int, env: dict) -> float:
+    """Retorna el mejor tiempo en milisegundos de `repeat` procesos"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def loaded_heavy_modules(env: dict) -> list:
+    result = subprocess.run(
+        [sys.executable, "-c", LOADED_CHECK.format(modules=HEAVY_MODULES)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True
+    )
+    return json.loads(result.stderr.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de arranque de la CLI")
+    parser.add_argument("--repeat", type=int, default=15, help="Procesos por medición")
+    parser.add_argument("--max-ms", type=float,
+                        help="Máximo sobre el arranque del intérprete para los subcomandos ligeros")
+    parser.add_argument("--output", help="Guardar resultados en un archivo JSON")
+    args = parser.parse_args()
+
+    env = environment()
+    results = {name: measure(command, args.repeat, env) for name, command in COMMANDS.items()}
+    reference = results["python (referencia)"]
+
+    print(f"Mejor de {args.repeat} procesos\n")
+    print(f"{'comando':<22} {'ms':>8} {'sobre python':>13}")
+    for name, ms in results.items():
+        print(f"{name:<22} {ms:>6.1f}ms {ms - reference:>11.1f}ms")
+
+    failed = False
+    loaded = loaded_heavy_modules(env)
+    if loaded:
+        print(f"\n[ERROR] --list-profiles carga módulos del pipeline: {', '.join(loaded)}")
+        failed = True
+    else:
+        print(f"\n[OK] --list-profiles no carga módulos del pipeline")
+
+    if args.max_ms is not None:
+        slow = [name for name, ms in results.items()
+                if name != "python (referencia)" and ms - reference > args.max_ms]
+        if slow:
+            print(f"[ERROR] Más de {args.max_ms:.0f}ms sobre el intérprete: {', '.join(slow)}")
+            failed = True
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"startup_ms": results, "heavy_loaded": loaded},
+                                                indent=2), encoding="utf-8")
+        print(f"\nResultados guardados en: {args.output}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
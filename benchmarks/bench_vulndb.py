@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Base de versiones vulnerables
+==========================================
+Mide scanagent.vulndb con conjuntos sintéticos de distintos tamaños
+(productos con rangos de versiones y CVEs al estilo NVD):
+
+- compilación: fuente JSON -> árbol de segmentos por producto en SQLite
+- consulta:    VulnerabilityDatabase.lookup (dos búsquedas en índices)
+- anterior:    recorrido de la tabla producto -> versión -> CVEs con
+               comprobaciones de subcadena, como el antiguo
+               VulnerabilityAnalyzer._analyze_versions
+
+Antes de medir comprueba, para cada tamaño, que las consultas coinciden con
+una búsqueda exhaustiva sobre los rangos originales.
+
+Uso:
+    python benchmarks/bench_vulndb.py
+    python benchmarks/bench_vulndb.py --sizes 1000,100000,500000 --queries 20000
+
+Autor: Scan Agent Team
+Versión: 1.0.0
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from scanagent.vulndb import VulnerabilityDatabase, build_file, version_bounds, version_key
+
+PRODUCTS = 500
+
+
+def random_version(rng: random.Random) -> str:
+    version = f"{rng.randint(0, 9)}.{rng.randint(0, 20)}.{rng.randint(0, 60)}"
+    return version + f"p{rng.randint(1, 3)}" if rng.random() < 0.1 else version
+
+
+def random_range(rng: random.Random) -> dict:
+    """Rango con los campos de NVD: versión exacta, intervalo o cota superior"""
+    low, high = sorted((random_version(rng), random_version(rng)), key=version_key)
+    kind = rng.random()
+    if kind < 0.2:
+        return {"version": low}
+    if kind < 0.5:
+        return {"versionEndExcluding": high}
+    return {"versionStartIncluding": low, "versionEndIncluding": high}
+
+
+def dataset(size: int, rng: random.Random) -> dict:
+    """`size` CVEs repartidos entre PRODUCTS productos"""
+    products = [{"cpe": f"cpe:2.3:a:vendor{i}:product{i}", "name": f"Product{i}",
+                 "aliases": [f"product{i}"], "ranges": []} for i in range(PRODUCTS)]
+    for n in range(size):
+        product = products[rng.randrange(PRODUCTS)]
+        product["ranges"].append({"cves": [f"CVE-2000-{n}"], **random_range(rng)})
+    return {"products": products}
+
+
+def brute_force(product: dict, version: str) -> list:
+    """CVEs de los rangos que contienen la versión (sin índice)"""
+    key = version_key(version)
+    cves = set()
+    for version_range in product["ranges"]:
+        bounds = version_bounds(version_range)
+        if bounds and bounds[0] <= key < bounds[1]:
+            cves.update(version_range["cves"])
+    return sorted(cves)
+
+
+def legacy_table(data: dict) -> dict:
+    """Tabla producto -> versión -> CVEs del analizador anterior (solo versiones exactas)"""
+    table = {}
+    for product in data["products"]:
+        versions = table.setdefault(product["name"], {})
+        for version_range in product["ranges"]:
+            version = version_range.get("version") or version_range.get("versionStartIncluding") \
+                or version_range.get("versionEndExcluding")
+            versions.setdefault(version, []).extend(version_range["cves"])
+    return table
+
+
+def legacy_match(table: dict, version_info: str) -> list:
+    found = []
+    for product, vuln_versions in table.items():
+        if product in version_info:
+            for version, cves in vuln_versions.items():
+                if version in version_info:
+                    found.extend(cves)
+    return found
+
+
+def measure(func, repeat: int) -> float:
+    """Retorna el mejor tiempo en milisegundos de `repeat` ejecuciones"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de la base de versiones vulnerables")
+    parser.add_argument("--sizes", default="1000,10000,100000,300000", help="CVEs por conjunto, separados por comas")
+    parser.add_argument("--queries", type=int, default=10000, help="Consultas por medición")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por medición")
+    args = parser.parse_args()
+
+    print(f"{PRODUCTS} productos, {args.queries} consultas - mejor de {args.repeat}\n")
+    print(f"{'CVEs':>8} {'nodos':>9} {'compilación':>12} {'MB':>6} "
+          f"{'consulta µs':>12} {'banner µs':>10} {'anterior µs':>12}")
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        rng = random.Random(size)
+        data = dataset(size, rng)
+
+        with tempfile.TemporaryDirectory(prefix="bench_vulndb_") as tmp:
+            source = Path(tmp) / "source.json"
+            source.write_text(json.dumps(data), encoding="utf-8")
+            db_path = Path(tmp) / "vulndb.sqlite"
+
+            start = time.perf_counter()
+            stats = build_file(db_path, source)
+            build_ms = (time.perf_counter() - start) * 1000
+            size_mb = db_path.stat().st_size / 1e6
+
+            db = VulnerabilityDatabase(str(db_path), str(source))
+            queries = [(data["products"][rng.randrange(PRODUCTS)], random_version(rng))
+                       for _ in range(args.queries)]
+
+            for product, version in queries[:2000]:
+                if sorted(db.lookup(product["cpe"], version)) != brute_force(product, version):
+                    print(f"[ERROR] {product['cpe']} {version}: la consulta no coincide con la búsqueda exhaustiva")
+                    return 1
+
+            lookup_ms = measure(lambda: [db.lookup(p["cpe"], v) for p, v in queries], args.repeat)
+            banners = [f"{p['aliases'][0]}/{v} (Ubuntu)" for p, v in queries]
+            match_ms = measure(lambda: [db.match(b) for b in banners], args.repeat)
+
+            table = legacy_table(data)
+            legacy_banners = [f"{p['name']} {v}" for p, v in queries[:max(1, args.queries // 10)]]
+            legacy_ms = measure(lambda: [legacy_match(table, b) for b in legacy_banners], 1)
+
+        per_query = 1000 / args.queries
+        print(f"{size:>8} {stats['nodes']:>9} {build_ms:>10.0f}ms {size_mb:>6.1f} "
+              f"{lookup_ms * per_query:>12.1f} {match_ms * per_query:>10.1f} "
+              f"{legacy_ms * 1000 / len(legacy_banners):>12.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
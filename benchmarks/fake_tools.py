@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Herramientas simuladas
+===================================
+Sustitutos de nmap, nikto, gobuster y curl para medir el escaneo completo
+(VulnerabilityScanner.run_scan, ScanAgent, la API web) sin red.
+
+`install` crea en un directorio un ejecutable por herramienta; basta con
+ponerlo al principio del PATH del proceso que lanza el escáner. Cada
+ejecutable deduce de sus argumentos qué salida produciría la herramienta
+real (descubrimiento, servicios o NSE de nmap, headers o verbose de curl...)
+y la emite repartida a lo largo de la latencia configurada, como una
+herramienta que escribe según avanza.
+
+Configuración por variables de entorno del proceso que lanza el escáner:
+    FAKE_TOOL_LATENCY          Segundos por comando (defecto 0.5)
+    FAKE_TOOL_LATENCY_<TOOL>   Latencia de una herramienta (p. ej. _NMAP)
+    FAKE_TOOL_LINES            Líneas aproximadas por host (defecto 200),
+                               repartidas como en synthetic.py
+    FAKE_TOOL_RECORDINGS       Directorio con salidas grabadas
+                               (<tipo>_<ip>.txt, p. ej. un outputs/ real):
+                               se reproducen en lugar de las sintéticas
+
+Uso:
+    python benchmarks/fake_tools.py install /tmp/fakebin
+    PATH=/tmp/fakebin:$PATH FAKE_TOOL_LATENCY=2 python -m scanagent.agent --target 10.0.0.5
+
+Autor: Scan Agent Team
+Versión: 1.0.0
+"""
+
+import argparse
+import os
+import random
+import stat
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import synthetic
+
+TOOLS = ("nmap", "nikto", "gobuster", "curl")
+
+# Trozos en los que se reparte la salida a lo largo de la latencia
+CHUNKS = 10
+
+STUB = """#!{python}
+import sys
+sys.path.insert(0, {bench_dir!r})
+import fake_tools
+sys.exit(fake_tools.run({tool!r}, sys.argv[1:]))
+"""
+
+
+def install(bin_dir: str) -> List[str]:
+    """
+    Crea los ejecutables simulados en bin_dir.
+
+    Returns:
+        Rutas de los ejecutables creados
+    """
+    target = Path(bin_dir)
+    target.mkdir(parents=True, exist_ok=True)
+    bench_dir = str(Path(__file__).resolve().parent)
+
+    paths = []
+    for tool in TOOLS:
+        path = target / tool
+        path.write_text(STUB.format(python=sys.executable, bench_dir=bench_dir, tool=tool),
+                        encoding="utf-8")
+        path.chmod(path.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+        paths.append(str(path))
+    return paths
+
+
+def _target(tool: str, args: List[str]) -> str:
+    """Host objetivo: último argumento posicional o host de la URL"""
+    for arg in reversed(args):
+        if arg.startswith("http://") or arg.startswith("https://"):
+            return urlparse(arg).hostname or "127.0.0.1"
+    positional = [arg for arg in args if not arg.startswith("-")]
+    return positional[-1] if positional else "127.0.0.1"
+
+
+def _kind(tool: str, args: List[str]) -> str:
+    """Tipo de salida, con el prefijo de archivo que usan los perfiles"""
+    if tool == "nmap":
+        if any(arg.startswith("--script") for arg in args):
+            return "nmap_nse"
+        if "--open" in args or "-p-" in args:
+            return "nmap_discovery"
+        return "nmap_service"
+    if tool == "curl":
+        return "headers" if "-I" in args else "curl_verbose"
+    return tool
+
+
+def _recorded(kind: str, target: str) -> Optional[str]:
+    recordings = os.environ.get("FAKE_TOOL_RECORDINGS")
+    if not recordings:
+        return None
+    directory = Path(recordings)
+    candidates = [directory / f"{kind}_{target}.txt"] + sorted(directory.glob(f"{kind}_*.txt"))
+    for path in candidates:
+        if path.is_file():
+            return path.read_text(encoding="utf-8", errors="replace")
+    return None
+
+
+def _synthetic(kind: str, target: str, lines: int) -> Tuple[str, str]:
+    """Salida sintética como (stdout, stderr), estable para cada target"""
+    rng = random.Random(target)
+    if kind in ("nmap_service", "nmap_discovery"):
+        return synthetic.nmap_service(target, synthetic.share(lines, "nmap_service"), rng), ""
+    if kind == "nmap_nse":
+        return synthetic.nmap_nse(target, synthetic.share(lines, "nmap_nse"), rng), ""
+    if kind == "gobuster":
+        return synthetic.gobuster(target, synthetic.share(lines, "gobuster"), rng), ""
+    if kind == "nikto":
+        return synthetic.nikto(target, synthetic.share(lines, "nikto"), rng), ""
+    if kind == "headers":
+        return synthetic.headers(target), ""
+    # curl -v: el cuerpo va a stdout y la traza a stderr
+    return "<html><body>It works</body></html>\n", synthetic.curl_verbose(target)
+
+
+def _latency(tool: str) -> float:
+    value = os.environ.get(f"FAKE_TOOL_LATENCY_{tool.upper()}",
+                           os.environ.get("FAKE_TOOL_LATENCY", "0.5"))
+    return max(0.0, float(value))
+
+
+def _emit(stream, content: str, latency: float) -> None:
+    """Escribe content en CHUNKS trozos separados por latency / CHUNKS"""
+    lines = content.splitlines(keepends=True)
+    size = max(1, -(-len(lines) // CHUNKS))
+    for start in range(0, max(len(lines), 1), size):
+        stream.write("".join(lines[start:start + size]))
+        stream.flush()
+        time.sleep(latency / CHUNKS)
+
+
+def run(tool: str, args: List[str]) -> int:
+    """Punto de entrada de los ejecutables simulados"""
+    target = _target(tool, args)
+    kind = _kind(tool, args)
+    lines = int(os.environ.get("FAKE_TOOL_LINES", "200"))
+
+    recorded = _recorded(kind, target)
+    stdout, stderr = (recorded, "") if recorded is not None else _synthetic(kind, target, lines)
+
+    try:
+        if stderr:
+            sys.stderr.write(stderr)
+            sys.stderr.flush()
+        _emit(sys.stdout, stdout, _latency(tool))
+    except BrokenPipeError:
+        # El lector cerró la salida (cancelación, head...): como SIGPIPE
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 141
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Herramientas simuladas para benchmarks sin red")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    install_parser = subparsers.add_parser("install", help="Crear los ejecutables simulados")
+    install_parser.add_argument("bin_dir", help="Directorio donde crearlos (añadir al PATH)")
+    args = parser.parse_args()
+
+    for path in install(args.bin_dir):
+        print(f"[OK] {path}")
+    print(f"\nexport PATH={Path(args.bin_dir).resolve()}:$PATH")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Carga de la API de escaneos
+========================================
+Arranca el servicio web con las herramientas simuladas de fake_tools.py en
+el PATH, lanza N escaneos concurrentes con POST /api/scans/start y espera a
+que terminen consultando /api/scans/status/{id}.
+
+Reporta:
+- escaneos por minuto (terminados / tiempo total)
+- latencia p50/p99 de POST /api/scans/start
+- latencia p50/p99 de los escaneos (started_at -> completed_at del servicio)
+- memoria del servidor: RSS máximo (VmHWM) y final
+
+El servidor corre en un directorio temporal (outputs/, reports/, storage)
+y cada escaneo apunta a un host de una /24 distinta, para que los límites
+por subred del planificador no serialicen la carga.
+
+Uso:
+    python benchmarks/load_scans.py
+    python benchmarks/load_scans.py --scans 50 --profile standard --latency 1
+    python benchmarks/load_scans.py --scans 20 --lines 5000 --output carga.json
+
+Autor: Scan Agent Team
+Versión: 1.0.0
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import fake_tools
+import synthetic
+
+ROOT = Path(__file__).resolve().parent.parent
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentil por rango más cercano (0 si no hay valores)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def request_json(url: str, payload: Optional[Dict] = None, timeout: float = 30) -> Dict:
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def memory_kb(pid: int) -> Dict[str, int]:
+    """RSS actual y máximo de un proceso (Linux, /proc); vacío si no está disponible"""
+    usage = {}
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith(("VmRSS:", "VmHWM:")):
+                    key, value = line.split(":", 1)
+                    usage[key] = int(value.split()[0])
+    except OSError:
+        pass
+    return usage
+
+
+def start_server(work_dir: Path, port: int, env: Dict[str, str]) -> subprocess.Popen:
+    log = open(work_dir / "server.log", "w", encoding="utf-8")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "webapp.main:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=str(work_dir), env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+
+
+def wait_healthy(base_url: str, server: subprocess.Popen, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"El servidor terminó al arrancar (código {server.returncode})")
+        try:
+            request_json(f"{base_url}/health", timeout=1)
+            return
+        except (urllib.error.URLError, ConnectionError, OSError):
+            time.sleep(0.2)
+    raise RuntimeError("El servidor no respondió a /health a tiempo")
+
+
+def run_load(base_url: str, scans: int, profile: str, poll: float, timeout: float) -> Dict:
+    """Lanza los escaneos a la vez y espera a que terminen"""
+    submit_latencies = []
+    scan_ids = []
+    lock = threading.Lock()
+
+    def submit(index: int) -> None:
+        payload = {
+            "target": synthetic.host_ip(index << 8),
+            "profile": profile,
+            "output_formats": ["json"],
+            "save_to_db": False
+        }
+        start = time.perf_counter()
+        status = request_json(f"{base_url}/api/scans/start", payload)
+        elapsed = time.perf_counter() - start
+        with lock:
+            submit_latencies.append(elapsed)
+            scan_ids.append(status["scan_id"])
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(scans, 64)) as pool:
+        list(pool.map(submit, range(scans)))
+
+    finished: Dict[str, Dict] = {}
+    deadline = time.monotonic() + timeout
+    while len(finished) < len(scan_ids) and time.monotonic() < deadline:
+        for scan_id in scan_ids:
+            if scan_id in finished:
+                continue
+            status = request_json(f"{base_url}/api/scans/status/{scan_id}")
+            if status["status"] in TERMINAL_STATUSES:
+                finished[scan_id] = status
+        time.sleep(poll)
+    wall = time.perf_counter() - started
+
+    scan_latencies = [
+        (datetime.fromisoformat(s["completed_at"]) - datetime.fromisoformat(s["started_at"])).total_seconds()
+        for s in finished.values() if s.get("completed_at") and s.get("started_at")
+    ]
+    by_status: Dict[str, int] = {}
+    for status in finished.values():
+        by_status[status["status"]] = by_status.get(status["status"], 0) + 1
+
+    return {
+        "submitted": len(scan_ids),
+        "finished": len(finished),
+        "by_status": by_status,
+        "wall_seconds": wall,
+        "scans_per_minute": len(finished) / wall * 60 if wall else 0.0,
+        "submit_p50_ms": percentile(submit_latencies, 50) * 1000,
+        "submit_p99_ms": percentile(submit_latencies, 99) * 1000,
+        "scan_p50_s": percentile(scan_latencies, 50),
+        "scan_p99_s": percentile(scan_latencies, 99)
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Prueba de carga de POST /api/scans/start")
+    parser.add_argument("--scans", type=int, default=10, help="Escaneos concurrentes")
+    parser.add_argument("--profile", default="quick", choices=["quick", "standard", "full", "web-full"])
+    parser.add_argument("--latency", type=float, default=0.5, help="Segundos por comando simulado")
+    parser.add_argument("--lines", type=int, default=200, help="Líneas por host de las salidas simuladas")
+    parser.add_argument("--recordings", help="Directorio con salidas grabadas a reproducir")
+    parser.add_argument("--port", type=int, default=8765, help="Puerto del servidor de prueba")
+    parser.add_argument("--poll", type=float, default=0.25, help="Intervalo de consulta de estado")
+    parser.add_argument("--timeout", type=float, default=600, help="Tiempo máximo de espera")
+    parser.add_argument("--work-dir", help="Directorio de trabajo (por defecto, uno temporal)")
+    parser.add_argument("--output", help="Guardar resultados en un archivo JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="load_scans_") as tmp:
+        work_dir = Path(args.work_dir or tmp).resolve()
+        work_dir.mkdir(parents=True, exist_ok=True)
+        bin_dir = work_dir / "bin"
+        fake_tools.install(str(bin_dir))
+
+        env = dict(os.environ)
+        env["PATH"] = f"{bin_dir}{os.pathsep}{env.get('PATH', '')}"
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")]))
+        env["FAKE_TOOL_LATENCY"] = str(args.latency)
+        env["FAKE_TOOL_LINES"] = str(args.lines)
+        if args.recordings:
+            env["FAKE_TOOL_RECORDINGS"] = str(Path(args.recordings).resolve())
+
+        base_url = f"http://127.0.0.1:{args.port}"
+        server = start_server(work_dir, args.port, env)
+        try:
+            wait_healthy(base_url, server)
+            idle = memory_kb(server.pid)
+            results = run_load(base_url, args.scans, args.profile, args.poll, args.timeout)
+            memory = memory_kb(server.pid)
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+                server.wait()
+
+    results.update({
+        "profile": args.profile,
+        "latency": args.latency,
+        "lines": args.lines,
+        "rss_idle_kb": idle.get("VmRSS"),
+        "rss_peak_kb": memory.get("VmHWM"),
+        "rss_final_kb": memory.get("VmRSS")
+    })
+
+    print(f"Escaneos: {results['finished']}/{results['submitted']} terminados "
+          f"({', '.join(f'{k}: {v}' for k, v in sorted(results['by_status'].items())) or '-'})")
+    print(f"Perfil: {args.profile} - latencia simulada {args.latency}s/comando - {args.lines} líneas/host")
+    print(f"Tiempo total: {results['wall_seconds']:.1f}s - {results['scans_per_minute']:.1f} escaneos/min")
+    print(f"POST /api/scans/start: p50 {results['submit_p50_ms']:.1f}ms - p99 {results['submit_p99_ms']:.1f}ms")
+    print(f"Duración del escaneo:  p50 {results['scan_p50_s']:.2f}s - p99 {results['scan_p99_s']:.2f}s")
+    if results["rss_peak_kb"]:
+        print(f"Memoria del servidor:  reposo {results['rss_idle_kb'] / 1024:.0f} MiB - "
+              f"máximo {results['rss_peak_kb'] / 1024:.0f} MiB - final {results['rss_final_kb'] / 1024:.0f} MiB")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nResultados guardados en: {args.output}")
+
+    return 0 if results["finished"] == results["submitted"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
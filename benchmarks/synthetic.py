@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Salidas sintéticas de herramientas
+===============================================
+Genera salidas de nmap (servicios y NSE), nikto, gobuster, curl y headers
+con los nombres de archivo que espera ScanParser, a la escala pedida:
+de 1 a miles de hosts y de decenas a millones de líneas por host.
+
+Las líneas de cada host se reparten entre herramientas en la proporción
+de LINE_SHARES; curl y headers mantienen su tamaño habitual.
+
+Uso:
+    python benchmarks/synthetic.py --out /tmp/outputs
+    python benchmarks/synthetic.py --out /tmp/outputs --hosts 1000 --lines 500
+
+Autor: Scan Agent Team
+Versión: 1.0.0
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+from typing import List
+
+# Proporción de líneas por herramienta
+LINE_SHARES = {"nmap_service": 0.2, "nmap_nse": 0.1, "gobuster": 0.4, "nikto": 0.3}
+
+SERVICES = [
+    ("ssh", "OpenSSH 6.6.1p1 Ubuntu 2ubuntu2.13"),
+    ("http", "Apache httpd 2.4.49 ((Ubuntu))"),
+    ("https", "nginx 1.18.0"),
+    ("mysql", "MySQL 5.5.62"),
+    ("ftp", "vsftpd 2.3.4"),
+    ("smtp", "Postfix smtpd"),
+    ("http-proxy", "Squid http proxy 3.5.12"),
+    ("microsoft-ds", "Samba smbd 3.X - 4.X"),
+]
+
+PATHS = ["admin", "backup", "config", ".git", "images", "login.php", "uploads",
+         "api", "phpmyadmin", ".env", "test", "old", "static", "wp-admin", "db"]
+
+NIKTO_FINDINGS = [
+    "This might be interesting... possible admin directory access",
+    "Possible SQL injection in login form",
+    "The X-Content-Type-Options header is not set. Header misconfiguration.",
+    "HTTP TRACE method is active, suggesting the host may be vulnerable to XST",
+    "Directory indexing found.",
+    "Server may leak inodes via ETags",
+    "Default file found, may disclose version information",
+]
+
+NSE_SCRIPTS = [
+    ("http-vuln-cve2021-41773", "Path traversal CVE-2021-41773"),
+    ("ssl-heartbleed", "OpenSSL Heartbleed CVE-2014-0160 TLSv1.0"),
+    ("http-shellshock", "Shellshock CVE-2014-6271"),
+    ("smb-vuln-ms17-010", "Remote code execution CVE-2017-0143"),
+    ("ftp-vsftpd-backdoor", "vsFTPd backdoor CVE-2011-2523"),
+]
+
+
+def host_ip(index: int) -> str:
+    """IP del host `index` dentro de 10.0.0.0/8"""
+    index += 1
+    return f"10.{(index >> 16) & 255}.{(index >> 8) & 255}.{index & 255}"
+
+
+def share(lines: int, tool: str) -> int:
+    """Líneas de `tool` en un host de `lines` líneas"""
+    return max(1, int(lines * LINE_SHARES[tool]))
+
+
+def nmap_service(ip: str, lines: int, rng: random.Random) -> str:
+    out = [
+        "Starting Nmap 7.94 ( https://nmap.org )",
+        f"Nmap scan report for {ip}",
+        "Host is up (0.0010s latency).",
+        "PORT     STATE SERVICE VERSION",
+    ]
+    for i in range(lines):
+        service, version = SERVICES[i % len(SERVICES)]
+        state = "open" if rng.random() < 0.8 else rng.choice(("filtered", "closed"))
+        out.append(f"{1 + i % 65535}/tcp {state:<6} {service:<7} {version}")
+    out.append("Service Info: OS: Linux; CPE: cpe:/o:linux:linux_kernel")
+    return "\n".join(out) + "\n"
+
+
+def nmap_nse(ip: str, lines: int, rng: random.Random) -> str:
+    out = ["PORT   STATE SERVICE", "80/tcp open  http"]
+    while len(out) < lines:
+        script, detail = rng.choice(NSE_SCRIPTS)
+        out.append(f"| {script}:")
+        out.append("|   VULNERABLE:")
+        out.append(f"|   {detail}")
+    out.append("|_  ssl-heartbleed-vulnerable TLSv1.0")
+    return "\n".join(out) + "\n"
+
+
+def gobuster(ip: str, lines: int, rng: random.Random) -> str:
+    out = []
+    for i in range(lines):
+        path = PATHS[i % len(PATHS)]
+        if i >= len(PATHS):
+            path = f"{path}{i // len(PATHS)}"
+        status = rng.choice((200, 200, 301, 403))
+        out.append(f"/{path} (Status: {status}) [Size: {rng.randint(100, 50000)}]")
+    return "\n".join(out) + "\n"
+
+
+def nikto(ip: str, lines: int, rng: random.Random) -> str:
+    out = ["- Nikto v2.5.0", "+ Server: Apache/2.4.49 (Ubuntu)"]
+    for i in range(lines):
+        path = rng.choice(PATHS)
+        finding = NIKTO_FINDINGS[i % len(NIKTO_FINDINGS)]
+        prefix = f"OSVDB-{rng.randint(1, 99999)}: " if rng.random() < 0.5 else ""
+        out.append(f"+ {prefix}/{path}/: {finding}")
+    return "\n".join(out) + "\n"
+
+
+def headers(ip: str) -> str:
+    return ("HTTP/1.1 200 OK\n"
+            "Server: Apache/2.4.49 (Ubuntu)\n"
+            "X-Powered-By: PHP/5.6.40\n"
+            "Content-Type: text/html\n")
+
+
+def curl_verbose(ip: str) -> str:
+    return (f"* Connected to {ip} port 443\n"
+            "* SSL connection using TLSv1.2 / ECDHE-RSA-AES128-GCM-SHA256\n"
+            "< HTTP/1.1 302 Found\n"
+            f"< Location: https://{ip}/login\n")
+
+
+def generate(out_dir: str, hosts: int = 1, lines: int = 100, seed: int = 0) -> List[str]:
+    """
+    Escribe las salidas de `hosts` hosts con unas `lines` líneas cada uno.
+
+    Returns:
+        IPs generadas, en orden
+    """
+    rng = random.Random(seed)
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+
+    ips = []
+    for index in range(hosts):
+        ip = host_ip(index)
+        files = {
+            f"nmap_service_{ip}.txt": nmap_service(ip, share(lines, "nmap_service"), rng),
+            f"nmap_nse_{ip}.txt": nmap_nse(ip, share(lines, "nmap_nse"), rng),
+            f"gobuster_{ip}.txt": gobuster(ip, share(lines, "gobuster"), rng),
+            f"nikto_{ip}.txt": nikto(ip, share(lines, "nikto"), rng),
+            f"headers_{ip}.txt": headers(ip),
+            f"curl_verbose_{ip}.txt": curl_verbose(ip),
+        }
+        for name, content in files.items():
+            (out / name).write_text(content, encoding="utf-8")
+        ips.append(ip)
+    return ips
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Genera salidas sintéticas de herramientas")
+    parser.add_argument("--out", required=True, help="Directorio de salida")
+    parser.add_argument("--hosts", type=int, default=1, help="Número de hosts")
+    parser.add_argument("--lines", type=int, default=100, help="Líneas aproximadas por host")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla del generador")
+    args = parser.parse_args()
+
+    ips = generate(args.out, args.hosts, args.lines, args.seed)
+    print(f"{len(ips)} hosts generados en {args.out} ({ips[0]} - {ips[-1]})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
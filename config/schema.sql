@@ -138,6 +138,61 @@ CREATE TABLE IF NOT EXISTS scan_files (
     FOREIGN KEY (scan_id) REFERENCES scans(id) ON DELETE CASCADE
 );
 
+-- ========================================
+-- Table: partial_findings
+-- ========================================
+-- Preliminary findings parsed while the tools are still running.
+-- scan_ref identifies the run; scan_id is set once the scan is saved.
+CREATE TABLE IF NOT EXISTS partial_findings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scan_ref TEXT NOT NULL,
+    scan_id INTEGER,
+    target_ip TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    finding_type TEXT NOT NULL,
+    severity TEXT,
+    json_data TEXT NOT NULL,
+    found_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (scan_id) REFERENCES scans(id) ON DELETE CASCADE
+);
+
+-- ========================================
+-- Table: command_runs
+-- ========================================
+-- Timing and resource usage of every tool command (profiling).
+-- status: ok, failed, timeout, cancelled, cached, resumed
+CREATE TABLE IF NOT EXISTS command_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scan_id INTEGER,
+    scan_ref TEXT,
+    target_ip TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    command TEXT NOT NULL,
+    status TEXT NOT NULL,
+    returncode INTEGER,
+    started_at TIMESTAMP,
+    duration_seconds REAL DEFAULT 0.0,
+    cpu_user_seconds REAL,
+    cpu_system_seconds REAL,
+    max_rss_kb INTEGER,
+    output_bytes INTEGER,
+    FOREIGN KEY (scan_id) REFERENCES scans(id) ON DELETE CASCADE
+);
+
+-- ========================================
+-- Table: phase_timings
+-- ========================================
+-- Duration of each analysis phase (parsing, interpretation, reports, database).
+CREATE TABLE IF NOT EXISTS phase_timings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scan_id INTEGER,
+    scan_ref TEXT,
+    phase TEXT NOT NULL,
+    duration_seconds REAL NOT NULL,
+    recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (scan_id) REFERENCES scans(id) ON DELETE CASCADE
+);
+
 -- ========================================
 -- Table: targets
 -- ========================================
@@ -185,6 +240,14 @@ CREATE INDEX IF NOT EXISTS idx_headers_scan_id ON headers(scan_id);
 CREATE INDEX IF NOT EXISTS idx_scan_files_scan_id ON scan_files(scan_id);
 CREATE INDEX IF NOT EXISTS idx_scan_files_type ON scan_files(file_type);
 
+-- Partial findings indexes
+CREATE INDEX IF NOT EXISTS idx_partial_findings_scan_ref ON partial_findings(scan_ref);
+
+-- Profiling tables indexes
+CREATE INDEX IF NOT EXISTS idx_command_runs_scan ON command_runs(scan_id);
+CREATE INDEX IF NOT EXISTS idx_command_runs_tool ON command_runs(tool);
+CREATE INDEX IF NOT EXISTS idx_phase_timings_scan ON phase_timings(scan_id);
+
 -- Targets table indexes
 CREATE INDEX IF NOT EXISTS idx_targets_ip ON targets(ip_address);
 CREATE INDEX IF NOT EXISTS idx_targets_last_scanned ON targets(last_scanned DESC);
@@ -10,20 +10,32 @@ __version__ = "2.1.0"
 __author__ = "Scan Agent Team"
 __license__ = "MIT"
 
-from .agent import ScanAgent
-from .scanner import VulnerabilityScanner
-from .parser import ScanParser
-from .interpreter import VulnerabilityInterpreter
-from .report_generator import ReportGenerator
-from .dashboard_generator import DashboardGenerator
-from .database import DatabaseManager
-
-__all__ = [
-    'ScanAgent',
-    'VulnerabilityScanner', 
-    'ScanParser',
-    'VulnerabilityInterpreter',
-    'ReportGenerator',
-    'DashboardGenerator',
-    'DatabaseManager'
-]
+import importlib
+
+# Clase exportada -> módulo que la define. Se importan al primer acceso
+# (PEP 562) para que `python -m scanagent.agent --list-profiles` no cargue
+# parser, intérprete, informes, BD ni dashboard.
+_EXPORTS = {
+    'ScanAgent': 'agent',
+    'VulnerabilityScanner': 'scanner',
+    'ScanParser': 'parser',
+    'VulnerabilityInterpreter': 'interpreter',
+    'ReportGenerator': 'report_generator',
+    'DashboardGenerator': 'dashboard_generator',
+    'DatabaseManager': 'database',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
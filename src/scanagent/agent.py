@@ -17,24 +17,28 @@ Licencia: MIT
 
 import argparse
 import sys
-import json
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Callable, Dict, Optional
 
-# Importar módulos del agente
+# Importar módulos del agente. Los componentes del pipeline (escáner,
+# parser, intérprete, informes, BD y dashboard) se importan y crean al
+# usarlos: --list-profiles, --show-profile o --version no los cargan.
 try:
-    from scanagent.parser import ScanParser
-    from scanagent.interpreter import VulnerabilityInterpreter
-    from scanagent.report_generator import ReportGenerator
-    from scanagent.scanner import VulnerabilityScanner  # NUEVO v2.0
-    from scanagent.database import DatabaseManager  # NUEVO v2.1
-    from scanagent.dashboard_generator import DashboardGenerator  # NUEVO v2.1
+    from scanagent import profiling
 except ImportError as e:
     print(f"[ERROR] No se pudieron importar los módulos necesarios: {e}")
     print("Asegúrate de ejecutar desde la raíz del proyecto: python3 -m src.scanagent.agent")
     sys.exit(1)
 
+if TYPE_CHECKING:
+    from scanagent.dashboard_generator import DashboardGenerator
+    from scanagent.database import DatabaseManager
+    from scanagent.pipeline import PipelineContext
+    from scanagent.scanner import VulnerabilityScanner
+
 
 class ScanAgent:
     """
@@ -51,22 +55,47 @@ class ScanAgent:
     
     VERSION = "2.1.0"
     
-    def __init__(self, verbose: bool = False, use_database: bool = True):
+    def __init__(self, verbose: bool = False, use_database: bool = True,
+                 save_intermediate: bool = False,
+                 on_event: Optional[Callable[[Dict], None]] = None,
+                 on_output: Optional[Callable[[str, str, str], None]] = None,
+                 max_age: int = 0):
         """
         Inicializa el agente con todos sus componentes.
         
         Args:
             verbose: Activar modo verboso para debug
             use_database: Guardar resultados en base de datos (default: True)
+            save_intermediate: Escribir parsed_data.json y analysis.json (debug)
+            on_event: Callback para eventos de progreso (comandos y fases)
+            on_output: Callback para la salida en vivo de las herramientas
+            max_age: Reutilizar salidas de herramientas en caché con esta
+                antigüedad máxima en segundos (0 = sin caché)
         """
         self.verbose = verbose
         self.use_database = use_database
-        self.scanner = VulnerabilityScanner(verbose=verbose)  # v2.0
+        self.save_intermediate = save_intermediate
+        self.on_event = on_event
+        self.on_output = on_output
+        self.context = None  # PipelineContext de la última ejecución
+        self.max_age = max_age
+        
+        # Componentes creados al primer uso (ver las propiedades)
+        self._scanner = None
+        self._db_manager = None
+        self._dashboard_generator = None
+        self._components_lock = threading.Lock()
+        
+        # Parseo incremental durante el escaneo (ver execute_scan)
+        self.scan_ref = None
+        self.streaming_parser = None
+        self._scan_target = None
+        self._pending_findings = []
+        self._last_findings_flush = 0.0
+        self._findings_lock = threading.Lock()
         self.parser = None  # Se inicializará cuando sea necesario
         self.interpreter = None  # Se inicializará cuando sea necesario
         self.report_generator = None
-        self.db_manager = DatabaseManager() if use_database else None  # v2.1
-        self.dashboard_generator = DashboardGenerator() if use_database else None  # v2.1
         
         # Estadísticas de ejecución
         self.stats = {
@@ -77,15 +106,56 @@ class ScanAgent:
             'scan_id': None  # ID del escaneo en BD
         }
     
+    @property
+    def scanner(self) -> "VulnerabilityScanner":
+        """Escáner de herramientas (v2.0), creado al primer uso"""
+        with self._components_lock:
+            if self._scanner is None:
+                from scanagent.scanner import VulnerabilityScanner
+                self._scanner = VulnerabilityScanner(verbose=self.verbose, on_event=self.on_event,
+                                                     on_output=self._handle_output,
+                                                     max_age=self.max_age)
+            return self._scanner
+    
+    @property
+    def db_manager(self) -> Optional["DatabaseManager"]:
+        """Base de datos (v2.1), abierta al primer uso; None con use_database=False"""
+        if not self.use_database:
+            return None
+        with self._components_lock:
+            if self._db_manager is None:
+                from scanagent.database import DatabaseManager
+                self._db_manager = DatabaseManager()
+            return self._db_manager
+    
+    @property
+    def dashboard_generator(self) -> Optional["DashboardGenerator"]:
+        """Generador del dashboard (v2.1); None con use_database=False"""
+        if not self.use_database:
+            return None
+        with self._components_lock:
+            if self._dashboard_generator is None:
+                from scanagent.dashboard_generator import DashboardGenerator
+                self._dashboard_generator = DashboardGenerator()
+            return self._dashboard_generator
     
-    def execute_scan(self, target: str, profile: str, outputs_dir: str = "./outputs") -> bool:
+    def execute_scan(self, target: str, profile: str, outputs_dir: str = "./outputs",
+                     scan_ref: Optional[str] = None, resume: bool = False) -> bool:
         """
         NUEVA FUNCIONALIDAD v2.0: Ejecuta un escaneo de vulnerabilidades.
         
+        Mientras las herramientas se ejecutan, su salida se parsea de forma
+        incremental: los hallazgos preliminares se notifican como eventos
+        "finding" y se guardan en la tabla partial_findings de la BD.
+        
         Args:
             target: IP o dominio del objetivo
             profile: Perfil de escaneo a utilizar
             outputs_dir: Directorio donde guardar resultados
+            scan_ref: Identificador de la ejecución para los hallazgos
+                preliminares (se genera uno si no se provee)
+            resume: Reanudar una ejecución interrumpida en outputs_dir,
+                saltando los comandos que ya terminaron
         
         Returns:
             True si el escaneo fue exitoso, False en caso contrario
@@ -96,8 +166,19 @@ class ScanAgent:
         print(f"[*] Perfil: {profile}")
         print(f"[*] Directorio de salida: {outputs_dir}\n")
         
+        self.scan_ref = scan_ref or f"{target}-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        from scanagent.parser import StreamingParser
+        self.streaming_parser = StreamingParser()
+        self._scan_target = target
+        
         # Ejecutar escaneo
-        success, scan_files = self.scanner.run_scan(target, profile, outputs_dir)
+        try:
+            success, scan_files = self.scanner.run_scan(target, profile, outputs_dir, resume=resume)
+        finally:
+            self._flush_partial_findings(force=True)
+        
+        if self.streaming_parser.findings:
+            print(f"[*] Hallazgos preliminares durante el escaneo: {len(self.streaming_parser.findings)}")
         
         if success:
             print(f"\n[✓] Escaneo completado exitosamente")
@@ -105,28 +186,130 @@ class ScanAgent:
             for file in scan_files:
                 print(f"    - {file}")
             return True
+        elif self.cancelled:
+            print(f"\n[✗] Escaneo cancelado: {len(scan_files)} archivos con resultados parciales")
+            return False
         else:
             print(f"\n[✗] El escaneo falló o fue interrumpido")
             return False
     
-    def run(self, target_ip: Optional[str] = None, output_format: str = "all", 
+    @property
+    def cancelled(self) -> bool:
+        return self.scanner.cancelled
+    
+    def cancel(self) -> None:
+        """
+        Cancela el escaneo en curso (desde cualquier hilo).
+        
+        Termina el comando en ejecución y sus procesos hijos; la salida ya
+        generada se conserva en scanner.results['outputs_generated'] para
+        analizarla con run().
+        """
+        self.scanner.cancel()
+    
+    # Hallazgos preliminares acumulados antes de escribir en BD
+    FINDINGS_FLUSH_SIZE = 25
+    FINDINGS_FLUSH_INTERVAL = 2.0
+    
+    def _handle_output(self, tool: str, stream: str, text: str) -> None:
+        """
+        Recibe la salida en vivo del escáner (desde sus hilos de lectura),
+        la reenvía al callback on_output y extrae hallazgos preliminares.
+        """
+        if self.on_output:
+            self.on_output(tool, stream, text)
+        
+        if self.streaming_parser is None:
+            return
+        
+        with self._findings_lock:
+            findings = self.streaming_parser.feed(tool, stream, text)
+            self._pending_findings.extend(findings)
+        
+        for finding in findings:
+            if self.verbose:
+                print(f"   [+] Hallazgo preliminar ({tool}): {self._describe_finding(finding)}")
+            self._notify({"type": "finding", "finding": finding})
+        
+        if findings:
+            self._flush_partial_findings()
+    
+    def _flush_partial_findings(self, force: bool = False) -> None:
+        """
+        Escribe en BD los hallazgos preliminares pendientes.
+        
+        Se agrupan por tamaño o tiempo para no abrir una transacción por
+        cada línea de salida; con force=True se escribe todo lo pendiente.
+        """
+        with self._findings_lock:
+            pending = self._pending_findings
+            due = (len(pending) >= self.FINDINGS_FLUSH_SIZE or
+                   time.monotonic() - self._last_findings_flush >= self.FINDINGS_FLUSH_INTERVAL)
+            if not pending or not (force or due):
+                return
+            self._pending_findings = []
+            self._last_findings_flush = time.monotonic()
+        
+        if not self.db_manager:
+            return
+        
+        try:
+            self.db_manager.save_partial_findings(self.scan_ref, self._scan_target, pending)
+        except Exception as e:
+            print(f"[WARN] No se pudieron guardar hallazgos preliminares: {e}")
+    
+    @staticmethod
+    def _describe_finding(finding: dict) -> str:
+        """Texto corto de un hallazgo preliminar para la consola"""
+        tipo = finding.get("tipo")
+        if tipo == "puerto":
+            return f"{finding['puerto']}/{finding['protocolo']} {finding['servicio']} {finding['version']}".strip()
+        if tipo == "ruta":
+            return f"{finding['ruta']} ({finding['codigo_http']})"
+        if tipo == "cve":
+            return finding["cve"]
+        return f"{finding.get('ubicacion')}: {finding.get('descripcion')}"
+    
+    def run(self, target_ip: Optional[str] = None, output_format: Optional[str] = "all", 
             outputs_dir: str = "./outputs", profile_used: str = "manual") -> bool:
         """
         Ejecuta el flujo completo del agente (parsing → análisis → informes → BD → dashboard).
         
         Args:
             target_ip: IP objetivo (se detecta automáticamente si no se provee)
-            output_format: Formato de salida (txt, json, html, md, all)
+            output_format: Formato de salida (txt, json, html, md, all); None
+                no genera informes (el servicio web renderiza los suyos a
+                partir de self.context)
             outputs_dir: Directorio donde buscar archivos de escaneo
             profile_used: Perfil utilizado para el escaneo (para BD)
         
         Returns:
             True si el proceso fue exitoso, False en caso contrario
+            (los resultados quedan en self.context)
         """
+        # Sesión de profiling (solo si se activó con --profiling o
+        # SCAN_AGENT_PROFILING)
+        with profiling.session("agent_run", profile=profile_used):
+            return self._run_pipeline(target_ip, output_format, outputs_dir, profile_used)
+    
+    def _run_pipeline(self, target_ip: Optional[str], output_format: Optional[str],
+                      outputs_dir: str, profile_used: str) -> bool:
+        """Fases del agente (ver run)"""
+        from scanagent.pipeline import PipelineContext
+        
         try:
             self._print_header()
             self.stats['tiempo_inicio'] = datetime.now()
             
+            context = PipelineContext(
+                outputs_dir=outputs_dir,
+                target_ip=target_ip,
+                profile_used=profile_used,
+                output_format=output_format,
+                save_intermediate=self.save_intermediate
+            )
+            self.context = context
+            
             # Validar directorio de salida
             outputs_path = Path(outputs_dir)
             if not outputs_path.exists():
@@ -134,36 +317,32 @@ class ScanAgent:
                 return False
             
             # FASE 1: PARSING
-            self._print_phase("FASE 1: PARSING DE ARCHIVOS")
-            parsed_data = self._execute_parsing(target_ip, outputs_dir)
-            
-            if not parsed_data:
+            self._print_phase("FASE 1: PARSING DE ARCHIVOS", "parsing")
+            if not self._timed_phase(context, "parsing", self._execute_parsing):
                 print("\n[ERROR] No se pudieron parsear los archivos")
                 return False
             
             # FASE 2: INTERPRETACIÓN
-            self._print_phase("FASE 2: ANÁLISIS E INTERPRETACIÓN")
-            analysis = self._execute_interpretation(parsed_data)
-            
-            if not analysis:
+            self._print_phase("FASE 2: ANÁLISIS E INTERPRETACIÓN", "interpretation")
+            if not self._timed_phase(context, "interpretation", self._execute_interpretation):
                 print("\n[ERROR] No se pudo completar el análisis")
                 return False
             
             # FASE 3: GENERACIÓN DE INFORMES
-            self._print_phase("FASE 3: GENERACIÓN DE INFORMES")
-            reports = self._execute_report_generation(analysis, output_format)
-            
-            if not reports:
-                print("\n[ERROR] No se pudieron generar los informes")
-                return False
+            if output_format is not None:
+                self._print_phase("FASE 3: GENERACIÓN DE INFORMES", "reports")
+                if not self._timed_phase(context, "reports", self._execute_report_generation):
+                    print("\n[ERROR] No se pudieron generar los informes")
+                    return False
             
             # FASE 4: PERSISTENCIA EN BASE DE DATOS (v2.1)
             if self.use_database:
-                self._print_phase("FASE 4: ALMACENAMIENTO EN BASE DE DATOS")
-                self._save_to_database(target_ip, profile_used, parsed_data, analysis, outputs_dir)
+                self._print_phase("FASE 4: ALMACENAMIENTO EN BASE DE DATOS", "database")
+                self._timed_phase(context, "database", self._save_to_database)
+                self._save_timings(context)
                 
                 # FASE 5: GENERACIÓN DE DASHBOARD (v2.1)
-                self._print_phase("FASE 5: GENERACIÓN DE DASHBOARD")
+                self._print_phase("FASE 5: GENERACIÓN DE DASHBOARD", "dashboard")
                 self._generate_dashboard()
             
             # Finalizar
@@ -180,44 +359,55 @@ class ScanAgent:
                 traceback.print_exc()
             return False
     
-    def _execute_parsing(self, target_ip: Optional[str] = None, outputs_dir: str = "./outputs") -> dict:
+    @staticmethod
+    def _timed_phase(context: "PipelineContext", phase: str,
+                     execute: Callable[["PipelineContext"], object]) -> object:
+        """Ejecuta una fase y anota su duración en context.phase_timings"""
+        start = time.perf_counter()
+        try:
+            with profiling.span(f"phase.{phase}"):
+                return execute(context)
+        finally:
+            context.phase_timings[phase] = round(time.perf_counter() - start, 4)
+    
+    def _execute_parsing(self, context: "PipelineContext") -> dict:
         """
         Ejecuta la fase de parsing de archivos.
         
         Args:
-            target_ip: IP objetivo
-            outputs_dir: Directorio con archivos de escaneo
+            context: Contexto del pipeline (usa outputs_dir y target_ip)
         
         Returns:
             Datos parseados o None si falló
         """
         try:
-            # Inicializar parser si no existe
-            if not self.parser:
-                self.parser = ScanParser(outputs_dir)
+            from scanagent.parser import ScanParser
+            self.parser = ScanParser(context.outputs_dir)
             
             # Detectar archivos disponibles
-            outputs_path = Path(outputs_dir)
+            outputs_path = Path(context.outputs_dir)
             txt_files = list(outputs_path.glob("*.txt"))
             
             if not txt_files:
-                print(f"[WARN] No se encontraron archivos .txt en {outputs_dir}")
+                print(f"[WARN] No se encontraron archivos .txt en {context.outputs_dir}")
                 return None
             
             print(f"[*] Archivos encontrados: {len(txt_files)}")
             
             # Parsear todos los archivos
-            parsed_data = self.parser.parse_all(target_ip)
+            parsed_data = self.parser.parse_all(context.target_ip)
             
             if not parsed_data:
                 return None
             
-            # Guardar JSON intermedio
-            json_output = Path("parsed_data.json")
-            with open(json_output, 'w', encoding='utf-8') as f:
-                json.dump(parsed_data, f, indent=2, ensure_ascii=False)
+            context.parsed_data = parsed_data
+            context.files_processed = len(txt_files)
+            
+            # JSON intermedio solo en modo debug
+            json_output = context.persist(parsed_data, "parsed_data.json")
+            if json_output:
+                print(f"[✓] Datos parseados guardados en: {json_output}")
             
-            print(f"[✓] Datos parseados guardados en: {json_output}")
             self.stats['archivos_procesados'] = len(txt_files)
             return parsed_data
             
@@ -228,34 +418,33 @@ class ScanAgent:
                 traceback.print_exc()
             return None
     
-    def _execute_interpretation(self, parsed_data: dict) -> dict:
+    def _execute_interpretation(self, context: "PipelineContext") -> dict:
         """
         Ejecuta la fase de interpretación y análisis de vulnerabilidades.
         
         Args:
-            parsed_data: Datos parseados de los archivos
+            context: Contexto del pipeline con los datos parseados
         
         Returns:
             Análisis completo o None si falló
         """
         try:
-            # Inicializar interpreter si no existe
-            if not self.interpreter:
-                self.interpreter = VulnerabilityInterpreter(parsed_data)
+            from scanagent.interpreter import VulnerabilityInterpreter
+            self.interpreter = VulnerabilityInterpreter(context.parsed_data)
             
             analysis = self.interpreter.analyze()
             
             if analysis:
-                # Guardar análisis intermedio
-                analysis_file = Path("analysis.json")
-                with open(analysis_file, 'w', encoding='utf-8') as f:
-                    json.dump(analysis, f, indent=2, ensure_ascii=False)
+                context.analysis = analysis
                 
-                vulns = analysis.get("vulnerabilidades", [])
-                self.stats['vulnerabilidades_encontradas'] = len(vulns)
+                # Análisis intermedio solo en modo debug
+                analysis_file = context.persist(analysis, "analysis.json")
                 
-                print(f"[✓] Vulnerabilidades detectadas: {len(vulns)}")
-                print(f"[✓] Análisis guardado en: {analysis_file}")
+                self.stats['vulnerabilidades_encontradas'] = context.vulnerability_count
+                
+                print(f"[✓] Vulnerabilidades detectadas: {context.vulnerability_count}")
+                if analysis_file:
+                    print(f"[✓] Análisis guardado en: {analysis_file}")
             
             return analysis
             
@@ -266,44 +455,46 @@ class ScanAgent:
                 traceback.print_exc()
             return None
     
-    def _execute_report_generation(self, analysis: dict, output_format: str) -> list:
+    def _execute_report_generation(self, context: "PipelineContext") -> list:
         """
         Ejecuta la fase de generación de informes.
         
         Args:
-            analysis: Análisis de vulnerabilidades
-            output_format: Formato(s) de salida (txt, json, html, md, all)
+            context: Contexto del pipeline con el análisis y el formato
+                (txt, json, html, md, all)
         
         Returns:
             Lista de archivos generados o None si falló
         """
         try:
-            self.report_generator = ReportGenerator(analysis)
+            from scanagent.report_generator import ReportGenerator
+            self.report_generator = ReportGenerator(context.analysis)
             
-            generated_files = []
+            generated_files = context.reports
             
-            if output_format == "all":
+            if context.output_format == "all":
                 formats = ["txt", "json", "html", "md"]
             else:
-                formats = [output_format]
+                formats = [context.output_format]
             
             # Generar cada formato
             for fmt in formats:
                 output_file = f"informe_tecnico.{fmt}"
                 
-                if fmt == "txt":
-                    self.report_generator.generate_txt_report(output_file)
-                elif fmt == "json":
-                    self.report_generator.generate_json_report(output_file)
-                elif fmt == "html":
-                    # Pasar scan_id si está disponible para renombrar
-                    scan_id = self.stats.get('scan_id')
-                    self.report_generator.generate_html_report(output_file, scan_id=scan_id)
-                elif fmt == "md":
-                    self.report_generator.generate_markdown_report(output_file)
-                else:
-                    print(f"[WARN] Formato desconocido: {fmt}")
-                    continue
+                with profiling.span(f"report.{fmt}"):
+                    if fmt == "txt":
+                        self.report_generator.generate_txt_report(output_file)
+                    elif fmt == "json":
+                        self.report_generator.generate_json_report(output_file)
+                    elif fmt == "html":
+                        # Pasar scan_id si está disponible para renombrar
+                        scan_id = self.stats.get('scan_id')
+                        self.report_generator.generate_html_report(output_file, scan_id=scan_id)
+                    elif fmt == "md":
+                        self.report_generator.generate_markdown_report(output_file)
+                    else:
+                        print(f"[WARN] Formato desconocido: {fmt}")
+                        continue
                 
                 generated_files.append(output_file)
                 print(f"[✓] Informe generado: {output_file}")
@@ -317,17 +508,12 @@ class ScanAgent:
                 traceback.print_exc()
             return None
     
-    def _save_to_database(self, target_ip: str, profile_used: str, 
-                         parsed_data: dict, analysis: dict, outputs_dir: str) -> None:
+    def _save_to_database(self, context: "PipelineContext") -> None:
         """
         Guarda el escaneo en la base de datos.
         
         Args:
-            target_ip: IP objetivo
-            profile_used: Perfil utilizado
-            parsed_data: Datos parseados
-            analysis: Análisis de vulnerabilidades
-            outputs_dir: Directorio de outputs
+            context: Contexto del pipeline con datos parseados y análisis
         """
         try:
             if not self.db_manager:
@@ -340,22 +526,30 @@ class ScanAgent:
                 duration = int(delta.total_seconds())
             
             # Determinar target_ip si no se proporcionó
+            target_ip = context.target_ip
             if not target_ip:
-                target_ip = analysis.get('metadata', {}).get('target_ip', 'unknown')
+                target_ip = context.analysis.get('metadata', {}).get('target_ip', 'unknown')
             
             # Guardar en BD
-            scan_id = self.db_manager.save_scan(
-                target_ip=target_ip,
-                profile_used=profile_used,
-                duration_seconds=duration,
-                status='completed',
-                analysis_data=analysis,
-                parsed_data=parsed_data,
-                files_processed=self.stats['archivos_procesados'],
-                tools_used=['nmap', 'nikto', 'gobuster', 'curl']  # Detectar automáticamente
-            )
+            with profiling.span("db.save_scan"):
+                scan_id = self.db_manager.save_scan(
+                    target_ip=target_ip,
+                    profile_used=context.profile_used,
+                    duration_seconds=duration,
+                    status='completed',
+                    analysis_data=context.analysis,
+                    parsed_data=context.parsed_data,
+                    files_processed=context.files_processed,
+                    tools_used=['nmap', 'nikto', 'gobuster', 'curl']  # Detectar automáticamente
+                )
             
             self.stats['scan_id'] = scan_id
+            context.db_scan_id = scan_id
+            
+            # Asociar los hallazgos preliminares del escaneo a su registro final
+            if self.scan_ref:
+                with profiling.span("db.link_partial_findings"):
+                    self.db_manager.link_partial_findings(self.scan_ref, scan_id)
             print(f"[✓] Escaneo guardado en BD con ID: {scan_id}")
             
         except Exception as e:
@@ -364,6 +558,26 @@ class ScanAgent:
                 import traceback
                 traceback.print_exc()
     
+    def _save_timings(self, context: "PipelineContext") -> None:
+        """
+        Guarda en BD el tiempo y los recursos de cada comando del escaneo
+        (tablas command_runs y phase_timings) y la duración de cada fase.
+        """
+        try:
+            if not self.db_manager:
+                return
+            
+            target_ip = context.target_ip or self.scanner.results.get('target') or 'unknown'
+            with profiling.span("db.save_timings"):
+                self.db_manager.save_command_runs(
+                    context.db_scan_id, self.scan_ref, target_ip,
+                    self.scanner.results['commands_executed']
+                )
+                self.db_manager.save_phase_timings(context.db_scan_id, self.scan_ref,
+                                                   context.phase_timings)
+        except Exception as e:
+            print(f"[WARN] No se pudieron guardar los tiempos de ejecución: {e}")
+    
     def _generate_dashboard(self) -> None:
         """
         Genera el dashboard HTML con el histórico de escaneos.
@@ -428,13 +642,25 @@ class ScanAgent:
         print(" " + "=" * 78)
         print()
     
-    def _print_phase(self, phase_name: str) -> None:
+    def _print_phase(self, phase_name: str, phase_id: Optional[str] = None) -> None:
         """
-        Imprime el nombre de una fase.
+        Imprime el nombre de una fase y la notifica al callback de progreso.
         """
         print("\n" + "-" * 80)
         print(f"🔍 {phase_name}")
         print("-" * 80)
+        
+        if phase_id:
+            self._notify({"type": "phase", "phase": phase_id, "message": phase_name})
+    
+    def _notify(self, event: dict) -> None:
+        """Envía un evento al callback de progreso"""
+        if not self.on_event:
+            return
+        try:
+            self.on_event(event)
+        except Exception as e:
+            print(f"[WARN] Error notificando progreso: {e}")
     
     def _print_summary(self) -> None:
         """
@@ -450,6 +676,10 @@ class ScanAgent:
         print(f"  • Archivos procesados:         {self.stats['archivos_procesados']}")
         print(f"  • Vulnerabilidades detectadas: {self.stats['vulnerabilidades_encontradas']}")
         print(f"  • Tiempo de ejecución:         {elapsed:.2f} segundos")
+        if self.context and self.context.phase_timings:
+            phases = ", ".join(f"{phase} {seconds:.2f}s"
+                               for phase, seconds in self.context.phase_timings.items())
+            print(f"  • Tiempo por fase:             {phases}")
         
         if self.use_database and self.stats.get('scan_id'):
             print(f"  • ID de escaneo en BD:          {self.stats['scan_id']}")
@@ -467,6 +697,44 @@ class ScanAgent:
             print("  3. Implementa las recomendaciones de corto plazo inmediatamente")
         
         print("\n" + "=" * 80)
+    
+    def show_timings(self) -> bool:
+        """
+        Imprime el tiempo y los recursos acumulados por herramienta y por
+        fase del análisis (tablas command_runs y phase_timings).
+        
+        Returns:
+            bool: False si la base de datos está deshabilitada
+        """
+        if not self.db_manager:
+            print("[ERROR] Los tiempos se guardan en la base de datos (no usar --no-db)")
+            return False
+        
+        summary = self.db_manager.get_timing_summary()
+        
+        print("\n" + "=" * 80)
+        print("⏱️  TIEMPOS DE EJECUCIÓN ACUMULADOS")
+        print("=" * 80)
+        
+        print("\n🔧 Por herramienta (sin comandos cacheados ni reanudados):")
+        if not summary['tools']:
+            print("  (sin ejecuciones registradas)")
+        for row in summary['tools']:
+            print(f"  • {row['tool']:<10} {row['runs']:>4} ejecuciones, {row['failures'] or 0} fallidas | "
+                  f"total {row['total_seconds'] or 0:.1f}s, media {row['avg_seconds'] or 0:.1f}s, "
+                  f"máx {row['max_seconds'] or 0:.1f}s | CPU {row['cpu_seconds'] or 0:.1f}s, "
+                  f"RSS máx {row['max_rss_kb'] or 0} KB, salida {row['output_bytes'] or 0} bytes")
+        
+        print("\n🧩 Por fase del análisis:")
+        if not summary['phases']:
+            print("  (sin análisis registrados)")
+        for row in summary['phases']:
+            print(f"  • {row['phase']:<16} {row['runs']:>4} ejecuciones | "
+                  f"total {row['total_seconds'] or 0:.2f}s, media {row['avg_seconds'] or 0:.2f}s, "
+                  f"máx {row['max_seconds'] or 0:.2f}s")
+        
+        print("\n" + "=" * 80)
+        return True
 
 
 def main():
@@ -491,12 +759,17 @@ Ejemplos de uso:
   python3 agent.py --scan --target 192.168.1.100 --profile quick
   python3 agent.py --scan --target example.com --profile web
   python3 agent.py --scan --target 10.0.0.5 --profile full --outputs-dir ./mi_escaneo
+  python3 agent.py --scan --target 10.0.0.5 --profile standard --max-age 86400
   
   LISTAR PERFILES DE ESCANEO:
   ───────────────────────────
   python3 agent.py --list-profiles
   python3 agent.py --show-profile web
   
+  TIEMPOS DE EJECUCIÓN ACUMULADOS:
+  ────────────────────────────────
+  python3 agent.py --timings
+  
   WORKFLOW COMPLETO (escaneo + análisis):
   ───────────────────────────────────────
   python3 agent.py --scan --target 192.168.1.100 --profile standard
@@ -536,6 +809,21 @@ Perfiles de escaneo disponibles:
         '--profile',
         help='Perfil de escaneo a utilizar (usa --list-profiles para ver opciones)'
     )
+    scan_group.add_argument(
+        '--max-age',
+        type=int,
+        default=0,
+        metavar='SEGUNDOS',
+        help='Reutilizar salidas de sondas cacheables (cabeceras HTTP, certificados '
+             'TLS) en caché (mismo objetivo, comando y versión) con esta antigüedad '
+             'máxima (default: 0, sin caché)'
+    )
+    scan_group.add_argument(
+        '--resume',
+        action='store_true',
+        help='Reanudar un escaneo interrumpido en --outputs-dir sin repetir '
+             'los comandos ya completados'
+    )
     scan_group.add_argument(
         '--list-profiles',
         action='store_true',
@@ -576,6 +864,28 @@ Perfiles de escaneo disponibles:
         action='store_true',
         help='Deshabilitar almacenamiento en base de datos y dashboard (v2.1)'
     )
+    parser.add_argument(
+        '--timings',
+        action='store_true',
+        help='Mostrar el tiempo y los recursos acumulados por herramienta y por '
+             'fase del análisis (base de datos) y salir'
+    )
+    parser.add_argument(
+        '--profiling',
+        metavar='BACKENDS',
+        help='Perfilar el pipeline con estos backends separados por comas: '
+             'cprofile, sampling, spans (también SCAN_AGENT_PROFILING)'
+    )
+    parser.add_argument(
+        '--profiling-dir',
+        default=None,
+        help='Directorio de los resultados de profiling (default: ./profiling)'
+    )
+    parser.add_argument(
+        '--save-intermediate',
+        action='store_true',
+        help='Guardar parsed_data.json y analysis.json entre fases (debug)'
+    )
     parser.add_argument(
         '--version',
         action='version',
@@ -584,8 +894,21 @@ Perfiles de escaneo disponibles:
     
     args = parser.parse_args()
     
+    # La CLI tiene prioridad sobre SCAN_AGENT_PROFILING
+    if args.profiling or args.profiling_dir:
+        backends = args.profiling.split(',') if args.profiling else profiling.profiler.backends
+        try:
+            profiling.configure([name.strip() for name in backends], args.profiling_dir)
+        except ValueError as e:
+            parser.error(str(e))
+    
     # Crear agente
-    agent = ScanAgent(verbose=args.verbose, use_database=not args.no_db)
+    agent = ScanAgent(
+        verbose=args.verbose,
+        use_database=not args.no_db,
+        save_intermediate=args.save_intermediate,
+        max_age=args.max_age
+    )
     
     # Manejar comandos de información
     if args.list_profiles:
@@ -596,6 +919,9 @@ Perfiles de escaneo disponibles:
         agent.scanner.show_profile_details(args.show_profile)
         sys.exit(0)
     
+    if args.timings:
+        sys.exit(0 if agent.show_timings() else 1)
+    
     # Modo escaneo
     if args.scan:
         if not args.target:
@@ -612,7 +938,8 @@ Perfiles de escaneo disponibles:
         success = agent.execute_scan(
             target=args.target,
             profile=args.profile,
-            outputs_dir=args.outputs_dir
+            outputs_dir=args.outputs_dir,
+            resume=args.resume
         )
         
         if success:
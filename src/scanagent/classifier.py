@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Classifier Module - Scan Agent
+==============================
+Clasificación de hallazgos por palabras clave (severidad, categoría OWASP)
+a partir de las reglas de config/keyword_rules.json.
+
+Cada conjunto de reglas es una lista ordenada de etiquetas con sus
+palabras clave: gana la primera regla con alguna palabra contenida en el
+texto (sin distinguir mayúsculas) y, si ninguna coincide, el valor por
+defecto del conjunto. Es la semántica de las cadenas de
+`any(word in desc for word in [...])` que sustituye.
+
+KeywordClassifier compila todas las palabras de uno o varios conjuntos en
+una sola alternancia y recorre el texto una vez para todos ellos, en lugar
+de una búsqueda por palabra y por conjunto.
+
+Las reglas se pueden sustituir con SCAN_AGENT_KEYWORD_RULES=/ruta/reglas.json
+
+Autor: Scan Agent Team
+Versión: 1.0.0
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+RULES_FILE = Path(__file__).parent.parent.parent / "config" / "keyword_rules.json"
+
+
+def load_rules(path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Lee el archivo de reglas.
+
+    Args:
+        path: Archivo de reglas (por defecto SCAN_AGENT_KEYWORD_RULES o
+            config/keyword_rules.json)
+    """
+    path = path or os.environ.get("SCAN_AGENT_KEYWORD_RULES") or RULES_FILE
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _trie_pattern(words) -> str:
+    """
+    Alternancia con forma de trie: "a(?:dmin|ccess)" en lugar de
+    "admin|access". El motor de re descarta cada rama por su primer
+    carácter, de modo que el coste por posición depende de la longitud de
+    las palabras y no de cuántas haya. En cada nodo se intenta seguir antes
+    que terminar, con lo que coincide la palabra más larga.
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:%s)" % "|".join(branches)
+        return "(?:%s)?" % body if "" in node else body
+
+    return build(trie)
+
+
+class KeywordClassifier:
+    """Clasifica un texto con varios conjuntos de reglas en una pasada"""
+
+    def __init__(self, rulesets: Dict[str, Dict[str, Any]], cache_size: int = 4096):
+        """
+        Args:
+            rulesets: {nombre: {"default": etiqueta, "rules": [{"label", "keywords"}]}}
+            cache_size: Textos distintos recordados (Nikto repite la misma
+                descripción en cada ruta y host); 0 lo desactiva
+        """
+        self.names = tuple(rulesets)
+        self.cache_size = cache_size
+        self._cache: Dict[str, Tuple[str, ...]] = {}
+        self._labels = tuple(tuple(rule["label"] for rule in ruleset["rules"]) + (ruleset["default"],)
+                             for ruleset in rulesets.values())
+        # Prioridad "sin coincidencia" de cada conjunto: índice del valor por defecto
+        self._unmatched = tuple(len(labels) - 1 for labels in self._labels)
+
+        # palabra -> prioridad (índice de regla) en cada conjunto
+        ranks: Dict[str, list] = {}
+        for index, ruleset in enumerate(rulesets.values()):
+            for priority, rule in enumerate(ruleset["rules"]):
+                for word in rule["keywords"]:
+                    word = word.lower()
+                    if word:
+                        rank = ranks.setdefault(word, list(self._unmatched))
+                        rank[index] = min(rank[index], priority)
+
+        # Cada palabra hereda la prioridad de las palabras que son prefijo
+        # suyo: en una posición solo se captura la más larga que coincide
+        self._ranks = {
+            word: tuple(min(ranks[other][index] for other in ranks if word.startswith(other))
+                        for index in range(len(self.names)))
+            for word in ranks
+        }
+        # El lookahead no consume texto, así que findall prueba todas las
+        # posiciones y ve también las palabras que empiezan dentro de otra
+        self._findall = re.compile("(?=(%s))" % _trie_pattern(ranks)).findall if ranks else None
+        self._defaults = tuple(labels[-1] for labels in self._labels)
+
+    @classmethod
+    def from_rules(cls, *names: str, path: Optional[str] = None) -> "KeywordClassifier":
+        """Clasificador con los conjuntos `names` del archivo de reglas"""
+        rules = load_rules(path)
+        return cls({name: rules[name] for name in names})
+
+    def classify(self, text: str) -> Tuple[str, ...]:
+        """Etiqueta de cada conjunto de reglas, en el orden de self.names"""
+        labels = self._cache.get(text)
+        if labels is None:
+            labels = self._match(text)
+            if self.cache_size:
+                if len(self._cache) >= self.cache_size:
+                    self._cache.clear()
+                self._cache[text] = labels
+        return labels
+
+    def _match(self, text: str) -> Tuple[str, ...]:
+        """Clasifica un texto recorriéndolo con la alternancia"""
+        found = self._findall(text.lower()) if self._findall else None
+        if not found:
+            return self._defaults
+        # Mejor prioridad (menor índice de regla) de cada conjunto
+        best = map(min, zip(*map(self._ranks.__getitem__, found)))
+        return tuple(labels[rank] for labels, rank in zip(self._labels, best))
@@ -19,12 +19,14 @@ Date: 2025-11-12
 """
 
 import sqlite3
-import json
 import os
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
 
+from scanagent import serialization
+
 
 class DatabaseManager:
     """Manages all database operations for Scan Agent."""
@@ -41,10 +43,15 @@ class DatabaseManager:
         base_dir = Path(__file__).parent.parent.parent
         self.db_path = db_path or str(base_dir / "data" / "scan_agent.db")
         self.schema_file = schema_file or str(base_dir / "config" / "schema.sql")
-        self.conn: Optional[sqlite3.Connection] = None
+        # One connection per thread: sqlite3 connections can only be used by
+        # the thread that opened them, and the manager is shared between the
+        # event loop, the threadpool workers and the scanner threads
+        self._local = threading.local()
         
         # Initialize database if it doesn't exist
         self._initialize_database()
+        self._ensure_partial_findings_table()
+        self._ensure_timing_tables()
     
     def _initialize_database(self) -> None:
         """Initialize database with schema if it doesn't exist."""
@@ -53,17 +60,9 @@ class DatabaseManager:
         if not db_exists:
             print(f"[*] Creando base de datos: {self.db_path}")
             
-            # Create database connection
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.row_factory = sqlite3.Row
-            
             # Always use basic schema (avoid SQL parsing issues)
             print(f"[*] Inicializando esquema de base de datos...")
             self._create_basic_schema()
-        else:
-            # Connect to existing database
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.row_factory = sqlite3.Row
     
     def _create_basic_schema(self) -> None:
         """Create basic schema if schema.sql is not found."""
@@ -172,18 +171,81 @@ class DatabaseManager:
         self.conn.commit()
         print("[✓] Esquema básico creado")
     
+    def _ensure_partial_findings_table(self) -> None:
+        """Create the partial_findings table (also on databases created before it existed)."""
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS partial_findings (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                scan_ref TEXT NOT NULL,
+                scan_id INTEGER,
+                target_ip TEXT NOT NULL,
+                tool TEXT NOT NULL,
+                finding_type TEXT NOT NULL,
+                severity TEXT,
+                json_data TEXT NOT NULL,
+                found_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_partial_findings_scan_ref ON partial_findings(scan_ref)"
+        )
+        self.conn.commit()
+    
+    def _ensure_timing_tables(self) -> None:
+        """Create the command_runs and phase_timings tables (also on existing databases)."""
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS command_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                scan_id INTEGER,
+                scan_ref TEXT,
+                target_ip TEXT NOT NULL,
+                tool TEXT NOT NULL,
+                command TEXT NOT NULL,
+                status TEXT NOT NULL,
+                returncode INTEGER,
+                started_at TIMESTAMP,
+                duration_seconds REAL DEFAULT 0.0,
+                cpu_user_seconds REAL,
+                cpu_system_seconds REAL,
+                max_rss_kb INTEGER,
+                output_bytes INTEGER
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS phase_timings (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                scan_id INTEGER,
+                scan_ref TEXT,
+                phase TEXT NOT NULL,
+                duration_seconds REAL NOT NULL,
+                recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_command_runs_scan ON command_runs(scan_id)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_command_runs_tool ON command_runs(tool)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_phase_timings_scan ON phase_timings(scan_id)")
+        self.conn.commit()
+    
     def get_connection(self) -> sqlite3.Connection:
-        """Get database connection."""
-        if self.conn is None:
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.row_factory = sqlite3.Row
-        return self.conn
+        """Get the calling thread's database connection (opened on first use)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+    
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Connection of the calling thread."""
+        return self.get_connection()
     
     def close(self) -> None:
-        """Close database connection."""
-        if self.conn:
-            self.conn.close()
-            self.conn = None
+        """Close the calling thread's database connection."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
     
     # =========================================
     # SAVE OPERATIONS
@@ -255,13 +317,13 @@ class DatabaseManager:
             cursor.execute("""
                 INSERT INTO parsed_data (scan_id, data_type, json_data)
                 VALUES (?, ?, ?)
-            """, (scan_id, 'parsed', json.dumps(parsed_data)))
+            """, (scan_id, 'parsed', serialization.dumps(parsed_data).decode('utf-8')))
             
             # Save analysis data as JSON
             cursor.execute("""
                 INSERT INTO parsed_data (scan_id, data_type, json_data)
                 VALUES (?, ?, ?)
-            """, (scan_id, 'analysis', json.dumps(analysis_data)))
+            """, (scan_id, 'analysis', serialization.dumps(analysis_data).decode('utf-8')))
             
             # Save individual vulnerabilities
             for vuln in vulns:
@@ -383,10 +445,202 @@ class DatabaseManager:
         
         conn.commit()
     
+    def save_partial_findings(self, scan_ref: str, target_ip: str, findings: List[Dict]) -> None:
+        """
+        Save preliminary findings produced while the tools are still running.
+        
+        Uses its own short-lived connection so it can be called from the
+        scanner threads (sqlite3 connections are bound to their thread).
+        
+        Args:
+            scan_ref: Identifier of the running scan (no scans row exists yet)
+            target_ip: IP or hostname being scanned
+            findings: Findings from StreamingParser
+        """
+        if not findings:
+            return
+        
+        rows = [
+            (
+                scan_ref,
+                target_ip,
+                finding.get('herramienta', 'unknown'),
+                finding.get('tipo', 'unknown'),
+                finding.get('severidad'),
+                serialization.dumps(finding).decode('utf-8')
+            )
+            for finding in findings
+        ]
+        
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            conn.executemany("""
+                INSERT INTO partial_findings (
+                    scan_ref, target_ip, tool, finding_type, severity, json_data
+                ) VALUES (?, ?, ?, ?, ?, ?)
+            """, rows)
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def link_partial_findings(self, scan_ref: str, scan_id: int) -> None:
+        """
+        Attach the preliminary findings of a run to its final scans row.
+        
+        Args:
+            scan_ref: Identifier used while the scan was running
+            scan_id: ID returned by save_scan
+        """
+        conn = self.get_connection()
+        conn.execute(
+            "UPDATE partial_findings SET scan_id = ? WHERE scan_ref = ?",
+            (scan_id, scan_ref)
+        )
+        conn.commit()
+    
+    @staticmethod
+    def _command_status(run: Dict) -> str:
+        """Outcome of a command as recorded by the scanner."""
+        for flag in ('cached', 'resumed', 'cancelled', 'timed_out'):
+            if run.get(flag):
+                return 'timeout' if flag == 'timed_out' else flag
+        return 'ok' if run.get('returncode') == 0 else 'failed'
+    
+    def save_command_runs(self, scan_id: Optional[int], scan_ref: Optional[str],
+                          target_ip: str, runs: List[Dict]) -> None:
+        """
+        Save timing and resource usage of the commands of a scan.
+        
+        Args:
+            scan_id: ID returned by save_scan (None if the scan was not saved)
+            scan_ref: Identifier used while the scan was running
+            target_ip: IP or hostname scanned
+            runs: Entries of VulnerabilityScanner.results['commands_executed']
+        """
+        if not runs:
+            return
+        
+        rows = [
+            (
+                scan_id,
+                scan_ref,
+                target_ip,
+                run.get('tool', 'unknown'),
+                run.get('command', ''),
+                self._command_status(run),
+                run.get('returncode'),
+                run.get('started_at'),
+                run.get('duration', 0.0),
+                run.get('cpu_user'),
+                run.get('cpu_system'),
+                run.get('max_rss_kb'),
+                run.get('output_bytes')
+            )
+            for run in runs
+        ]
+        
+        conn = self.get_connection()
+        conn.executemany("""
+            INSERT INTO command_runs (
+                scan_id, scan_ref, target_ip, tool, command, status, returncode,
+                started_at, duration_seconds, cpu_user_seconds, cpu_system_seconds,
+                max_rss_kb, output_bytes
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        conn.commit()
+    
+    def save_phase_timings(self, scan_id: Optional[int], scan_ref: Optional[str],
+                           timings: Dict[str, float]) -> None:
+        """
+        Save the duration of each analysis phase of a run.
+        
+        Args:
+            scan_id: ID returned by save_scan (None if the scan was not saved)
+            scan_ref: Identifier used while the scan was running
+            timings: Seconds per phase (parsing, interpretation, reports, database)
+        """
+        if not timings:
+            return
+        
+        conn = self.get_connection()
+        conn.executemany("""
+            INSERT INTO phase_timings (scan_id, scan_ref, phase, duration_seconds)
+            VALUES (?, ?, ?, ?)
+        """, [(scan_id, scan_ref, phase, duration) for phase, duration in timings.items()])
+        conn.commit()
+    
     # =========================================
     # QUERY OPERATIONS
     # =========================================
     
+    def get_timing_summary(self) -> Dict[str, List[Dict]]:
+        """
+        Aggregate time and resource usage per tool and per analysis phase.
+        
+        Cached and resumed commands are excluded: they did not run the tool.
+        
+        Returns:
+            Dictionary with 'tools' and 'phases' lists, slowest first
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT tool,
+                   COUNT(*) AS runs,
+                   SUM(status != 'ok') AS failures,
+                   SUM(duration_seconds) AS total_seconds,
+                   AVG(duration_seconds) AS avg_seconds,
+                   MAX(duration_seconds) AS max_seconds,
+                   SUM(COALESCE(cpu_user_seconds, 0) + COALESCE(cpu_system_seconds, 0)) AS cpu_seconds,
+                   MAX(max_rss_kb) AS max_rss_kb,
+                   SUM(output_bytes) AS output_bytes
+            FROM command_runs
+            WHERE status NOT IN ('cached', 'resumed')
+            GROUP BY tool
+            ORDER BY total_seconds DESC
+        """)
+        tools = [dict(row) for row in cursor.fetchall()]
+        
+        cursor.execute("""
+            SELECT phase,
+                   COUNT(*) AS runs,
+                   SUM(duration_seconds) AS total_seconds,
+                   AVG(duration_seconds) AS avg_seconds,
+                   MAX(duration_seconds) AS max_seconds
+            FROM phase_timings
+            GROUP BY phase
+            ORDER BY total_seconds DESC
+        """)
+        phases = [dict(row) for row in cursor.fetchall()]
+        
+        return {'tools': tools, 'phases': phases}
+    
+    def get_partial_findings(self, scan_ref: str) -> List[Dict]:
+        """
+        Get the preliminary findings of a scan in discovery order.
+        
+        Uses its own short-lived connection so it can be called from the
+        web server's threadpool workers.
+        
+        Args:
+            scan_ref: Identifier used while the scan was running
+        
+        Returns:
+            List of findings
+        """
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            rows = conn.execute("""
+                SELECT json_data FROM partial_findings
+                WHERE scan_ref = ?
+                ORDER BY id
+            """, (scan_ref,)).fetchall()
+        finally:
+            conn.close()
+        
+        return [serialization.loads(json_data) for (json_data,) in rows]
+    
     def get_all_scans(self, limit: int = 100, offset: int = 0) -> List[Dict]:
         """
         Get all scans ordered by date (most recent first).
@@ -483,7 +737,7 @@ class DatabaseManager:
         
         for row in cursor.fetchall():
             data_type = row['data_type']
-            scan_dict[f'{data_type}_data'] = json.loads(row['json_data'])
+            scan_dict[f'{data_type}_data'] = serialization.loads(row['json_data'])
         
         return scan_dict
     
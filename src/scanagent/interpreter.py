@@ -9,10 +9,17 @@ Autor: Scan Agent Team
 Versión: 1.0.0
 """
 
-import json
 from typing import Dict, List, Any, Tuple
 from datetime import datetime
 
+from scanagent import profiling, serialization
+from scanagent.classifier import KeywordClassifier
+from scanagent.records import ExposedPort, NiktoVulnerability, Vulnerability
+from scanagent.vulndb import vulnerability_db
+
+# Severidad y categoría OWASP de Nikto (config/keyword_rules.json)
+NIKTO_RULES = KeywordClassifier.from_rules("severidad", "owasp")
+
 
 class VulnerabilityInterpreter:
     """
@@ -42,6 +49,23 @@ class VulnerabilityInterpreter:
         "critica": (9.0, 10.0)
     }
     
+    # Puertos críticos y su riesgo (la CLI y el servicio web los clasifican
+    # con esta misma tabla)
+    CRITICAL_PORTS = {
+        21: "FTP - Protocolo sin cifrado, credenciales en texto plano",
+        22: "SSH - Objetivo común de ataques de fuerza bruta",
+        23: "Telnet - Protocolo inseguro sin cifrado",
+        25: "SMTP - Potencial relay",
+        110: "POP3 - Sin cifrado",
+        143: "IMAP - Sin cifrado",
+        445: "SMB - Vulnerable a ataques",
+        3306: "MySQL - Base de datos expuesta directamente",
+        3389: "RDP - Objetivo de ransomware y ataques remotos",
+        5432: "PostgreSQL - Base de datos expuesta directamente",
+        27017: "MongoDB - Base de datos NoSQL expuesta",
+        6379: "Redis - Cache/DB en memoria sin autenticación por defecto"
+    }
+    
     def __init__(self, parsed_data: Dict[str, Any]):
         """
         Inicializa el intérprete con datos parseados.
@@ -73,19 +97,24 @@ class VulnerabilityInterpreter:
         print("=" * 60)
         
         # 1. Analizar superficie de ataque
-        self._analyze_attack_surface()
+        with profiling.span("interpret.attack_surface"):
+            self._analyze_attack_surface()
         
         # 2. Detectar tecnologías
-        self._detect_technologies()
+        with profiling.span("interpret.technologies"):
+            self._detect_technologies()
         
         # 3. Procesar vulnerabilidades
-        self._process_vulnerabilities()
+        with profiling.span("interpret.vulnerabilities"):
+            self._process_vulnerabilities()
         
         # 4. Clasificar riesgos
-        self._classify_risks()
+        with profiling.span("interpret.risks"):
+            self._classify_risks()
         
         # 5. Generar recomendaciones
-        recommendations = self._generate_recommendations()
+        with profiling.span("interpret.recommendations"):
+            recommendations = self._generate_recommendations()
         
         # 6. Compilar análisis completo
         analysis = {
@@ -129,19 +158,17 @@ class VulnerabilityInterpreter:
         }
         
         # Analizar puertos críticos
-        puertos_criticos = [21, 22, 23, 3306, 3389, 5432, 27017, 6379]
-        
         for puerto in puertos:
             puerto_num = puerto.get("puerto")
-            es_critico = puerto_num in puertos_criticos
+            es_critico = puerto_num in self.CRITICAL_PORTS
             
-            self.attack_surface["detalles_puertos"].append({
-                "puerto": puerto_num,
-                "servicio": puerto.get("servicio"),
-                "version": puerto.get("version"),
-                "critico": es_critico,
-                "razon": self._get_port_risk_reason(puerto_num) if es_critico else None
-            })
+            self.attack_surface["detalles_puertos"].append(ExposedPort(
+                puerto=puerto_num,
+                servicio=puerto.get("servicio"),
+                version=puerto.get("version"),
+                critico=es_critico,
+                razon=self._get_port_risk_reason(puerto_num) if es_critico else None
+            ))
         
         # Analizar rutas críticas
         rutas_sensibles = ['/admin', '/api', '/config', '/.git', '/backup', '/database']
@@ -257,6 +284,11 @@ class VulnerabilityInterpreter:
             if vuln:
                 self.vulnerabilities.append(vuln)
         
+        # Procesar versiones de software con CVEs conocidos
+        for puerto in self.data.get("puertos", []):
+            for match in vulnerability_db.match(puerto.get("version", "")):
+                self.vulnerabilities.append(self._create_vulnerability_from_version(puerto, match))
+        
         # Procesar vulnerabilidades de Nikto
         for nikto_vuln in self.data.get("vulnerabilidades_nikto", []):
             vuln = self._create_vulnerability_from_nikto(nikto_vuln)
@@ -266,59 +298,87 @@ class VulnerabilityInterpreter:
         # Procesar errores HTTP
         for error in self.data.get("errores_http", []):
             if error.get("codigo") in [500, 501, 502, 503]:
-                vuln = {
-                    "id": f"HTTP-ERROR-{error.get('codigo')}",
-                    "titulo": f"Error HTTP {error.get('codigo')}",
-                    "descripcion": f"El servidor retorna error {error.get('codigo')}: {error.get('mensaje')}",
-                    "severidad": "baja",
-                    "cvss_score": 2.0,
-                    "owasp_category": "A05:2021 - Security Misconfiguration",
-                    "fuente": "curl_verbose",
-                    "evidencia": error,
-                    "recomendacion": "Configurar páginas de error personalizadas que no revelen información del servidor"
-                }
+                vuln = Vulnerability(
+                    id=f"HTTP-ERROR-{error.get('codigo')}",
+                    titulo=f"Error HTTP {error.get('codigo')}",
+                    descripcion=f"El servidor retorna error {error.get('codigo')}: {error.get('mensaje')}",
+                    severidad="baja",
+                    cvss_score=2.0,
+                    owasp_category="A05:2021 - Security Misconfiguration",
+                    fuente="curl_verbose",
+                    evidencia=error,
+                    recomendacion="Configurar páginas de error personalizadas que no revelen información del servidor"
+                )
                 self.vulnerabilities.append(vuln)
     
-    def _create_vulnerability_from_indicator(self, indicator: Dict[str, Any]) -> Dict[str, Any]:
+    def _create_vulnerability_from_indicator(self, indicator: Dict[str, Any]) -> Vulnerability:
         """
         Crea una vulnerabilidad estructurada desde un indicador OWASP.
         """
         tipo = indicator.get("tipo", "unknown")
         severidad = indicator.get("severidad", "media")
         
-        vuln = {
-            "id": f"IND-{len(self.vulnerabilities) + 1}",
-            "titulo": self._get_vulnerability_title(tipo),
-            "descripcion": indicator.get("descripcion", indicator.get("contexto", "")),
-            "severidad": severidad,
-            "cvss_score": self._calculate_cvss_score(severidad, tipo),
-            "owasp_category": indicator.get("owasp_category", "A05:2021 - Security Misconfiguration"),
-            "fuente": indicator.get("fuente", "unknown"),
-            "evidencia": indicator,
-            "recomendacion": self._get_recommendation_for_type(tipo)
-        }
+        vuln = Vulnerability(
+            id=f"IND-{len(self.vulnerabilities) + 1}",
+            titulo=self._get_vulnerability_title(tipo),
+            descripcion=indicator.get("descripcion", indicator.get("contexto", "")),
+            severidad=severidad,
+            cvss_score=self._calculate_cvss_score(severidad, tipo),
+            owasp_category=indicator.get("owasp_category", "A05:2021 - Security Misconfiguration"),
+            fuente=indicator.get("fuente", "unknown"),
+            evidencia=indicator,
+            recomendacion=self._get_recommendation_for_type(tipo)
+        )
+        
+        return vuln
+    
+    def _create_vulnerability_from_version(self, puerto: Dict[str, Any],
+                                           match: Dict[str, Any]) -> Vulnerability:
+        """
+        Crea una vulnerabilidad desde una versión con CVEs conocidos (scanagent.vulndb).
+        """
+        producto, version = match["producto"], match["version"]
+        
+        vuln = Vulnerability(
+            id=f"VER-{len(self.vulnerabilities) + 1}",
+            titulo=f"Versión Vulnerable: {producto} {version}",
+            descripcion=f"Se detectó {producto} {version} que tiene vulnerabilidades conocidas: "
+                        f"{', '.join(match['cves'])}",
+            severidad="critica",
+            cvss_score=self._calculate_cvss_score("critica", "version"),
+            owasp_category="A06:2021 - Vulnerable and Outdated Components",
+            fuente="nmap_service",
+            evidencia={
+                "puerto": puerto.get("puerto"),
+                "servicio": puerto.get("servicio"),
+                "banner": puerto.get("version"),
+                "cves": match["cves"]
+            },
+            recomendacion=f"Actualizar {producto} a la última versión estable y aplicar los parches de seguridad"
+        )
         
         return vuln
     
-    def _create_vulnerability_from_nikto(self, nikto_vuln: Dict[str, Any]) -> Dict[str, Any]:
+    def _create_vulnerability_from_nikto(self, nikto_vuln: Dict[str, Any]) -> Vulnerability:
         """
         Crea una vulnerabilidad estructurada desde hallazgo de Nikto.
         """
         descripcion = nikto_vuln.get("descripcion", "")
-        severidad = self._determine_nikto_severity(descripcion)
-        
-        vuln = {
-            "id": nikto_vuln.get("id_osvdb", f"NIKTO-{len(self.vulnerabilities) + 1}"),
-            "titulo": descripcion[:100] + "..." if len(descripcion) > 100 else descripcion,
-            "descripcion": descripcion,
-            "severidad": severidad,
-            "cvss_score": self._calculate_cvss_score(severidad, "nikto"),
-            "owasp_category": self._map_nikto_to_owasp(descripcion),
-            "fuente": "nikto",
-            "ubicacion": nikto_vuln.get("ubicacion", ""),
-            "evidencia": nikto_vuln,
-            "recomendacion": "Revisar y remediar según la naturaleza específica de la vulnerabilidad"
-        }
+        # Severidad y categoría OWASP en una sola pasada sobre la descripción
+        severidad, owasp_category = NIKTO_RULES.classify(descripcion)
+        
+        vuln = NiktoVulnerability(
+            id=nikto_vuln.get("id_osvdb", f"NIKTO-{len(self.vulnerabilities) + 1}"),
+            titulo=descripcion[:100] + "..." if len(descripcion) > 100 else descripcion,
+            descripcion=descripcion,
+            severidad=severidad,
+            cvss_score=self._calculate_cvss_score(severidad, "nikto"),
+            owasp_category=owasp_category,
+            fuente="nikto",
+            ubicacion=nikto_vuln.get("ubicacion", ""),
+            evidencia=nikto_vuln,
+            recomendacion="Revisar y remediar según la naturaleza específica de la vulnerabilidad"
+        )
         
         return vuln
     
@@ -435,34 +495,12 @@ class VulnerabilityInterpreter:
     
     def _get_port_risk_reason(self, port: int) -> str:
         """Retorna la razón por la cual un puerto es considerado crítico."""
-        port_risks = {
-            21: "FTP - Protocolo sin cifrado, credenciales en texto plano",
-            22: "SSH - Objetivo común de ataques de fuerza bruta",
-            23: "Telnet - Protocolo inseguro sin cifrado",
-            3306: "MySQL - Base de datos expuesta directamente",
-            3389: "RDP - Objetivo de ransomware y ataques remotos",
-            5432: "PostgreSQL - Base de datos expuesta directamente",
-            27017: "MongoDB - Base de datos NoSQL expuesta",
-            6379: "Redis - Cache/DB en memoria sin autenticación por defecto"
-        }
-        return port_risks.get(port, "Puerto potencialmente sensible")
+        return self.CRITICAL_PORTS.get(port, "Puerto potencialmente sensible")
     
     def _check_version_vulnerability(self, software: str, version: str) -> bool:
-        """Verifica si una versión de software es potencialmente vulnerable."""
-        # Lógica simplificada - en producción integrar con CVE databases
-        version_lower = version.lower()
-        
-        if "apache" in software.lower():
-            # Versiones antiguas de Apache
-            if any(old in version_lower for old in ["2.2", "2.0", "1."]):
-                return True
-        
-        if "nginx" in software.lower():
-            # Versiones antiguas de Nginx
-            if any(old in version_lower for old in ["1.0", "1.1", "1.2", "1.3", "1.4"]):
-                return True
-        
-        return False
+        """Verifica si una versión de software tiene CVEs conocidos (scanagent.vulndb)."""
+        return any(software.lower() == match["producto"].lower()
+                   for match in vulnerability_db.match(version))
     
     def _get_vulnerability_title(self, tipo: str) -> str:
         """Genera un título descriptivo para un tipo de vulnerabilidad."""
@@ -506,33 +544,11 @@ class VulnerabilityInterpreter:
     
     def _determine_nikto_severity(self, description: str) -> str:
         """Determina severidad de vulnerabilidad de Nikto basado en descripción."""
-        desc_lower = description.lower()
-        
-        if any(word in desc_lower for word in ['critical', 'sql injection', 'rce', 'remote code', 'authentication bypass']):
-            return "critica"
-        elif any(word in desc_lower for word in ['high', 'xss', 'csrf', 'password', 'credential']):
-            return "alta"
-        elif any(word in desc_lower for word in ['medium', 'disclosure', 'misconfiguration']):
-            return "media"
-        else:
-            return "baja"
+        return NIKTO_RULES.classify(description)[0]
     
     def _map_nikto_to_owasp(self, description: str) -> str:
         """Mapea vulnerabilidad de Nikto a categoría OWASP Top 10."""
-        desc_lower = description.lower()
-        
-        if any(word in desc_lower for word in ['sql injection', 'xss', 'injection']):
-            return "A03:2021 - Injection"
-        elif any(word in desc_lower for word in ['authentication', 'password', 'login']):
-            return "A07:2021 - Identification and Authentication Failures"
-        elif any(word in desc_lower for word in ['directory', 'admin', 'access']):
-            return "A01:2021 - Broken Access Control"
-        elif any(word in desc_lower for word in ['configuration', 'header', 'server']):
-            return "A05:2021 - Security Misconfiguration"
-        elif any(word in desc_lower for word in ['outdated', 'version', 'vulnerable']):
-            return "A06:2021 - Vulnerable and Outdated Components"
-        else:
-            return "A05:2021 - Security Misconfiguration"
+        return NIKTO_RULES.classify(description)[1]
     
     def _get_top_risks(self, limit: int = 3) -> List[str]:
         """Retorna los principales riesgos detectados."""
@@ -567,12 +583,16 @@ if __name__ == "__main__":
     print("SCAN AGENT - INTERPRETER MODULE")
     print("=" * 60)
     
-    # Cargar datos parseados
-    json_file = "parsed_data.json"
+    # Datos parseados: desde un JSON indicado como argumento o, por
+    # defecto, parseando ./outputs en memoria
+    json_file = sys.argv[1] if len(sys.argv) > 1 else None
     
     try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            parsed_data = json.load(f)
+        if json_file:
+            parsed_data = serialization.load(json_file)
+        else:
+            from scanagent.parser import ScanParser
+            parsed_data = ScanParser("./outputs").parse_all()
         
         # Crear intérprete y analizar
         interpreter = VulnerabilityInterpreter(parsed_data)
@@ -580,8 +600,7 @@ if __name__ == "__main__":
         
         # Guardar análisis
         output_file = "analysis.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(analysis, f, indent=2, ensure_ascii=False)
+        serialization.dump(analysis, output_file)
         
         print(f"\n[OK] Análisis guardado en: {output_file}")
         
@@ -596,8 +615,8 @@ if __name__ == "__main__":
         print(f"Altas: {resumen.get('vulnerabilidades_altas')}")
         
     except FileNotFoundError:
-        print(f"\n[ERROR] No se encontró el archivo {json_file}")
-        print("Ejecuta primero parser.py para generar los datos")
+        print(f"\n[ERROR] No se encontró {json_file or './outputs'}")
+        print("Indica un JSON de datos parseados o ejecuta desde el directorio con ./outputs")
         sys.exit(1)
     except Exception as e:
         print(f"\n[ERROR] {str(e)}")
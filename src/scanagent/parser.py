@@ -16,11 +16,42 @@ Autor: Scan Agent Team
 Versión: 1.0.0
 """
 
-import re
-import json
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Set, Tuple
 from pathlib import Path
 
+from scanagent import patterns, profiling, serialization
+from scanagent.classifier import KeywordClassifier
+from scanagent.records import NiktoFinding, PathRecord, PortRecord, ServiceRecord
+
+
+# Patrones compartidos por el parseo de archivos y el parseo incremental
+# (nombres anteriores de los patrones de scanagent.patterns)
+NMAP_PORT_PATTERN = patterns.NMAP_PORT
+GOBUSTER_PATH_PATTERN = patterns.GOBUSTER_PATH
+NIKTO_VULN_PATTERN = patterns.NIKTO_VULN
+CVE_PATTERN = patterns.CVE
+
+# Severidad preliminar de Nikto (config/keyword_rules.json)
+NIKTO_SEVERITY = KeywordClassifier.from_rules("nikto_severity")
+
+# Rutas sensibles (OWASP Top 10 - Broken Access Control)
+RUTAS_SENSIBLES = [
+    '/admin', '/administrator', '/wp-admin', '/phpmyadmin',
+    '/config', '/backup', '/database', '/db', '/.git', '/.env',
+    '/api', '/swagger', '/graphql'
+]
+
+
+def is_sensitive_path(path: str) -> bool:
+    """Indica si una ruta descubierta es sensible"""
+    path = path.lower()
+    return any(sensitive in path for sensitive in RUTAS_SENSIBLES)
+
+
+def nikto_severity(description: str) -> str:
+    """Clasifica la severidad de un hallazgo de Nikto por palabras clave"""
+    return NIKTO_SEVERITY.classify(description)[0]
+
 
 class ScanParser:
     """
@@ -43,7 +74,13 @@ class ScanParser:
             "errores_http": [],
             "vulnerabilidades_nikto": [],
             "indicadores_owasp_top10": [],
-            "metadata_http": {}
+            "metadata_http": {},
+            "host": {
+                "activo": False,
+                "latencia_ms": None,
+                "sistema_operativo": None,
+                "cpe": None
+            }
         }
     
     def parse_all(self, target_ip: str = None) -> Dict[str, Any]:
@@ -66,12 +103,10 @@ class ScanParser:
         self.parsed_data["target_ip"] = target_ip
         
         # Parsear cada tipo de archivo
-        self._parse_nmap_service(target_ip)
-        self._parse_nmap_nse(target_ip)
-        self._parse_headers(target_ip)
-        self._parse_curl_verbose(target_ip)
-        self._parse_gobuster(target_ip)
-        self._parse_nikto(target_ip)
+        for parse in (self._parse_nmap_service, self._parse_nmap_nse, self._parse_headers,
+                      self._parse_curl_verbose, self._parse_gobuster, self._parse_nikto):
+            with profiling.span(f"parse.{parse.__name__[len('_parse_'):]}"):
+                parse(target_ip)
         
         return self.parsed_data
     
@@ -84,7 +119,7 @@ class ScanParser:
         """
         for file in self.outputs_dir.glob("*.txt"):
             # Buscar patrón de IP en el nombre del archivo
-            match = re.search(r'(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})', file.name)
+            match = patterns.IP_ADDRESS.search(file.name)
             if match:
                 return match.group(1)
         return "unknown"
@@ -104,11 +139,10 @@ class ScanParser:
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
                 content = f.read()
             
-            # Parsear puertos abiertos
-            # Formato típico: 80/tcp   open  http    Apache httpd 2.4.41
-            port_pattern = r'(\d+)/(tcp|udp)\s+(open|filtered|closed)\s+(\S+)\s*(.*)?'
+            self._parse_host(content)
             
-            for match in re.finditer(port_pattern, content):
+            # Parsear puertos abiertos
+            for match in NMAP_PORT_PATTERN.finditer(content):
                 port_num = match.group(1)
                 protocol = match.group(2)
                 state = match.group(3)
@@ -116,20 +150,20 @@ class ScanParser:
                 version_info = match.group(5).strip() if match.group(5) else ""
                 
                 if state == "open":
-                    port_entry = {
-                        "puerto": int(port_num),
-                        "protocolo": protocol,
-                        "servicio": service,
-                        "estado": state,
-                        "version": version_info
-                    }
+                    port_entry = PortRecord(
+                        puerto=int(port_num),
+                        protocolo=protocol,
+                        servicio=service,
+                        estado=state,
+                        version=version_info
+                    )
                     
                     self.parsed_data["puertos"].append(port_entry)
-                    self.parsed_data["servicios_detectados"].append({
-                        "nombre": service,
-                        "puerto": int(port_num),
-                        "version": version_info
-                    })
+                    self.parsed_data["servicios_detectados"].append(ServiceRecord(
+                        nombre=service,
+                        puerto=port_entry.puerto,
+                        version=version_info
+                    ))
                     
                     # Extraer versiones
                     if version_info:
@@ -140,6 +174,31 @@ class ScanParser:
         except Exception as e:
             print(f"[ERROR] Al parsear {file_pattern}: {str(e)}")
     
+    def _parse_host(self, content: str) -> None:
+        """
+        Extrae estado, latencia, sistema operativo y CPE del host desde la
+        salida de nmap (sobre el contenido ya leído de nmap_service_*.txt).
+        """
+        host = self.parsed_data["host"]
+        
+        if "Host is up" in content:
+            host["activo"] = True
+            
+            latency_match = patterns.NMAP_LATENCY.search(content)
+            if latency_match:
+                host["latencia_ms"] = int(float(latency_match.group(1)) * 1000)
+        
+        # Sistema operativo, en orden de prioridad
+        for pattern in patterns.NMAP_OS:
+            os_match = pattern.search(content)
+            if os_match:
+                host["sistema_operativo"] = os_match.group(1).strip()
+                break
+        
+        cpe_match = patterns.NMAP_CPE.search(content)
+        if cpe_match:
+            host["cpe"] = cpe_match.group(1)
+    
     def _parse_nmap_nse(self, target_ip: str) -> None:
         """
         Parsea el archivo nmap_nse_*.txt que contiene resultados de scripts NSE.
@@ -156,17 +215,8 @@ class ScanParser:
                 content = f.read()
             
             # Buscar vulnerabilidades detectadas por NSE scripts
-            vuln_patterns = [
-                r'VULNERABLE:',
-                r'CVE-\d{4}-\d+',
-                r'http-sql-injection',
-                r'http-csrf',
-                r'ssl-.*-vulnerable'
-            ]
-            
-            for pattern in vuln_patterns:
-                matches = re.finditer(pattern, content, re.IGNORECASE)
-                for match in matches:
+            for pattern in patterns.NSE_INDICATORS:
+                for match in pattern.finditer(content):
                     # Extraer contexto alrededor de la vulnerabilidad
                     start = max(0, match.start() - 100)
                     end = min(len(content), match.end() + 200)
@@ -174,13 +224,13 @@ class ScanParser:
                     
                     self.parsed_data["indicadores_owasp_top10"].append({
                         "fuente": "nmap_nse",
-                        "tipo": pattern,
+                        "tipo": pattern.pattern,
                         "contexto": context[:500]  # Limitar tamaño
                     })
             
             # Buscar información de SSL/TLS
             if "ssl" in content.lower() or "tls" in content.lower():
-                ssl_match = re.search(r'(TLSv\d\.\d|SSLv\d)', content)
+                ssl_match = patterns.SSL_VERSION.search(content)
                 if ssl_match:
                     self.parsed_data["metadata_http"]["ssl_version"] = ssl_match.group(1)
             
@@ -207,15 +257,9 @@ class ScanParser:
             headers = {}
             
             # Parsear headers HTTP
-            # Formato: Header-Name: Value
-            header_pattern = r'^([A-Za-z0-9-]+):\s*(.+)$'
-            
-            for line in content.split('\n'):
-                match = re.match(header_pattern, line.strip())
-                if match:
-                    header_name = match.group(1)
-                    header_value = match.group(2).strip()
-                    headers[header_name] = header_value
+            # Formato: Header-Name: Value (una pasada sobre todas las líneas)
+            for match in patterns.HEADER_LINE.finditer(content):
+                headers[match.group(1)] = match.group(2).strip()
             
             self.parsed_data["metadata_http"]["headers"] = headers
             
@@ -226,17 +270,13 @@ class ScanParser:
                 
                 # Detectar tipo de servidor
                 if "apache" in server_info.lower():
-                    self.parsed_data["servicios_detectados"].append({
-                        "nombre": "Apache",
-                        "puerto": 80,
-                        "version": server_info
-                    })
+                    self.parsed_data["servicios_detectados"].append(
+                        ServiceRecord(nombre="Apache", puerto=80, version=server_info)
+                    )
                 elif "nginx" in server_info.lower():
-                    self.parsed_data["servicios_detectados"].append({
-                        "nombre": "Nginx",
-                        "puerto": 80,
-                        "version": server_info
-                    })
+                    self.parsed_data["servicios_detectados"].append(
+                        ServiceRecord(nombre="Nginx", puerto=80, version=server_info)
+                    )
             
             # Detectar headers de seguridad faltantes (OWASP Top 10)
             security_headers = [
@@ -289,7 +329,7 @@ class ScanParser:
                 content = f.read()
             
             # Extraer código de respuesta HTTP
-            http_code_match = re.search(r'HTTP/[\d.]+\s+(\d+)\s+(.+)', content)
+            http_code_match = patterns.HTTP_STATUS.search(content)
             if http_code_match:
                 code = int(http_code_match.group(1))
                 message = http_code_match.group(2).strip()
@@ -307,17 +347,17 @@ class ScanParser:
             
             # Detectar información SSL/TLS
             if "SSL connection" in content or "TLS" in content:
-                tls_match = re.search(r'(TLSv[\d.]+)', content)
+                tls_match = patterns.TLS_VERSION.search(content)
                 if tls_match:
                     self.parsed_data["metadata_http"]["tls_version"] = tls_match.group(1)
                 
-                cipher_match = re.search(r'Cipher:\s*(.+)', content)
+                cipher_match = patterns.CIPHER.search(content)
                 if cipher_match:
                     self.parsed_data["metadata_http"]["cipher"] = cipher_match.group(1).strip()
             
             # Detectar redirects
             if "Location:" in content:
-                location_match = re.search(r'Location:\s*(.+)', content)
+                location_match = patterns.LOCATION.search(content)
                 if location_match:
                     self.parsed_data["metadata_http"]["redirect_location"] = location_match.group(1).strip()
             
@@ -342,30 +382,17 @@ class ScanParser:
                 content = f.read()
             
             # Parsear rutas descubiertas
-            # Formato típico: /admin (Status: 200) [Size: 1234]
-            path_pattern = r'(/[\w\-/._]*)\s+\(Status:\s*(\d+)\)\s*(?:\[Size:\s*(\d+)\])?'
-            
-            for match in re.finditer(path_pattern, content):
+            for match in GOBUSTER_PATH_PATTERN.finditer(content):
                 path = match.group(1)
                 status_code = int(match.group(2))
                 size = int(match.group(3)) if match.group(3) else None
                 
-                ruta_entry = {
-                    "ruta": path,
-                    "codigo_http": status_code,
-                    "tamano": size
-                }
+                ruta_entry = PathRecord(ruta=path, codigo_http=status_code, tamano=size)
                 
                 self.parsed_data["rutas_descubiertas"].append(ruta_entry)
                 
                 # Detectar rutas sensibles (OWASP Top 10 - Broken Access Control)
-                rutas_sensibles = [
-                    '/admin', '/administrator', '/wp-admin', '/phpmyadmin',
-                    '/config', '/backup', '/database', '/db', '/.git', '/.env',
-                    '/api', '/swagger', '/graphql'
-                ]
-                
-                if any(sensitive in path.lower() for sensitive in rutas_sensibles):
+                if is_sensitive_path(path):
                     self.parsed_data["indicadores_owasp_top10"].append({
                         "fuente": "gobuster",
                         "tipo": "ruta_sensible_expuesta",
@@ -396,31 +423,21 @@ class ScanParser:
                 content = f.read()
             
             # Parsear líneas de vulnerabilidades de Nikto
-            # Formato típico: + OSVDB-XXXX: /path: Description
-            vuln_pattern = r'\+\s+(OSVDB-\d+)?:?\s*([^\:]+):\s*(.+)'
-            
-            for match in re.finditer(vuln_pattern, content):
+            for match in NIKTO_VULN_PATTERN.finditer(content):
                 osvdb_id = match.group(1) if match.group(1) else "N/A"
                 location = match.group(2).strip()
                 description = match.group(3).strip()
                 
-                vuln_entry = {
-                    "id_osvdb": osvdb_id,
-                    "ubicacion": location,
-                    "descripcion": description,
-                    "fuente": "nikto"
-                }
+                vuln_entry = NiktoFinding(
+                    id_osvdb=osvdb_id,
+                    ubicacion=location,
+                    descripcion=description
+                )
                 
                 self.parsed_data["vulnerabilidades_nikto"].append(vuln_entry)
                 
                 # Clasificar según severidad basada en palabras clave
-                severidad = "media"
-                if any(word in description.lower() for word in ['critical', 'sql injection', 'rce', 'remote code']):
-                    severidad = "critica"
-                elif any(word in description.lower() for word in ['high', 'xss', 'csrf', 'authentication']):
-                    severidad = "alta"
-                elif any(word in description.lower() for word in ['info', 'information', 'disclosure']):
-                    severidad = "baja"
+                severidad = nikto_severity(description)
                 
                 # Agregar a indicadores OWASP
                 self.parsed_data["indicadores_owasp_top10"].append({
@@ -433,7 +450,7 @@ class ScanParser:
                 })
             
             # Detectar versión del servidor desde Nikto
-            server_match = re.search(r'Server:\s*(.+)', content)
+            server_match = patterns.SERVER.search(content)
             if server_match:
                 self.parsed_data["versiones"]["Server_Nikto"] = server_match.group(1).strip()
             
@@ -455,8 +472,8 @@ class ScanParser:
         output_path = self.outputs_dir.parent / output_file
         
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(self.parsed_data, f, indent=2, ensure_ascii=False)
+            # Artefacto interno: JSON compacto
+            serialization.dump(self.parsed_data, output_path)
             
             print(f"[OK] JSON guardado en: {output_path}")
             return str(output_path)
@@ -475,6 +492,101 @@ class ScanParser:
         return self.parsed_data
 
 
+class StreamingParser:
+    """
+    Parseo incremental de la salida de las herramientas mientras se ejecutan.
+    
+    Recibe la salida línea a línea (callback on_output del escáner) y
+    extrae hallazgos preliminares: puertos abiertos de nmap, CVEs citados
+    por scripts NSE, rutas de gobuster y líneas "+" de Nikto. Cada hallazgo
+    se reporta una sola vez aunque varias herramientas lo repitan.
+    
+    Los hallazgos son orientativos: el análisis final sigue haciéndolo
+    ScanParser sobre los archivos completos.
+    """
+    
+    def __init__(self):
+        self.findings: List[Dict[str, Any]] = []
+        self._seen: Set[Tuple] = set()
+        self._parsers = {
+            "nmap": self._feed_nmap,
+            "gobuster": self._feed_gobuster,
+            "nikto": self._feed_nikto
+        }
+    
+    def feed(self, tool: str, stream: str, line: str) -> List[Dict[str, Any]]:
+        """
+        Procesa una línea de salida.
+        
+        Args:
+            tool: Herramienta que produjo la línea
+            stream: "stdout" o "stderr" (stderr se ignora)
+            line: Línea de salida
+        
+        Returns:
+            Hallazgos nuevos encontrados en la línea
+        """
+        parse = self._parsers.get(tool)
+        if parse is None or stream != "stdout":
+            return []
+        
+        new = []
+        for key, finding in parse(line):
+            if key in self._seen:
+                continue
+            self._seen.add(key)
+            finding["herramienta"] = tool
+            self.findings.append(finding)
+            new.append(finding)
+        return new
+    
+    @staticmethod
+    def _feed_nmap(line: str):
+        match = NMAP_PORT_PATTERN.search(line)
+        if match and match.group(3) == "open":
+            port = PortRecord(
+                puerto=int(match.group(1)),
+                protocolo=match.group(2),
+                servicio=match.group(4),
+                estado="open",
+                version=match.group(5).strip() if match.group(5) else ""
+            )
+            yield ("puerto", port.puerto, port.protocolo), {"tipo": "puerto", **port.to_dict()}
+        
+        for cve in CVE_PATTERN.findall(line):
+            cve = cve.upper()
+            yield ("cve", cve), {"tipo": "cve", "cve": cve, "contexto": line.strip()[:500]}
+    
+    @staticmethod
+    def _feed_gobuster(line: str):
+        match = GOBUSTER_PATH_PATTERN.search(line)
+        if match:
+            path = PathRecord(
+                ruta=match.group(1),
+                codigo_http=int(match.group(2)),
+                tamano=int(match.group(3)) if match.group(3) else None
+            )
+            finding = {"tipo": "ruta", **path.to_dict()}
+            if is_sensitive_path(path.ruta):
+                finding["severidad"] = "alta" if path.codigo_http == 200 else "media"
+            yield ("ruta", path.ruta), finding
+    
+    @staticmethod
+    def _feed_nikto(line: str):
+        match = NIKTO_VULN_PATTERN.match(line.strip())
+        if match:
+            finding = NiktoFinding(
+                id_osvdb=match.group(1) or "N/A",
+                ubicacion=match.group(2).strip(),
+                descripcion=match.group(3).strip()
+            )
+            yield ("nikto", finding.ubicacion, finding.descripcion), {
+                "tipo": "nikto",
+                **finding.to_dict(),
+                "severidad": nikto_severity(finding.descripcion)
+            }
+
+
 if __name__ == "__main__":
     # Ejemplo de uso del parser
     parser = ScanParser("./outputs")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Patterns Module - Scan Agent
+============================
+Registro central de expresiones regulares de los parsers, compiladas una
+sola vez al importar el módulo.
+
+Lo comparten el parseo de archivos (ScanParser), el parseo incremental
+(StreamingParser), el descubrimiento de puertos del escáner y el parser
+del servicio web (webapp/utils/report_parser.ScanResultParser), en lugar
+de pasar cadenas a re.search/re.finditer en cada llamada.
+
+Cada patrón conserva la semántica del que sustituye; donde un parser
+recorría el contenido línea a línea, el patrón equivalente está anclado
+con re.MULTILINE para hacerlo en una sola pasada.
+
+Autor: Scan Agent Team
+Versión: 1.0.0
+"""
+
+import re
+
+# =========================================
+# NMAP
+# =========================================
+
+# Formato típico: 80/tcp   open  http    Apache httpd 2.4.41
+NMAP_PORT = re.compile(r'(\d+)/(tcp|udp)\s+(open|filtered|closed)\s+(\S+)\s*(.*)?')
+
+NMAP_LATENCY = re.compile(r'Host is up \(([0-9.]+)s latency\)')
+
+# Sistema operativo, en orden de prioridad
+NMAP_OS = (
+    re.compile(r'Service Info: OS: ([^;]+)'),
+    re.compile(r'Running: ([^,\n]+)'),
+    re.compile(r'OS details: ([^\n]+)'),
+)
+
+NMAP_CPE = re.compile(r'CPE: (cpe:[^\s]+)')
+
+# Indicadores de vulnerabilidad de los scripts NSE (el patrón original se
+# guarda como "tipo" del indicador)
+NSE_INDICATORS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'VULNERABLE:',
+    r'CVE-\d{4}-\d+',
+    r'http-sql-injection',
+    r'http-csrf',
+    r'ssl-.*-vulnerable',
+))
+
+# Patrón: Apache httpd 2.4.7 ((Ubuntu))
+PRODUCT_VERSION = re.compile(r'([A-Za-z0-9\-\.]+)\s+([\d\.]+)')
+
+# =========================================
+# HTTP (headers, curl)
+# =========================================
+
+# Una cabecera "Nombre: valor" por línea, ignorando espacios alrededor
+HEADER_LINE = re.compile(r'^[^\S\n]*([A-Za-z0-9-]+):[^\S\n]*(\S.*)$', re.MULTILINE)
+
+HTTP_STATUS = re.compile(r'HTTP/[\d.]+\s+(\d+)\s+(.+)')
+SSL_VERSION = re.compile(r'(TLSv\d\.\d|SSLv\d)')
+TLS_VERSION = re.compile(r'(TLSv[\d.]+)')
+CIPHER = re.compile(r'Cipher:\s*(.+)')
+LOCATION = re.compile(r'Location:\s*(.+)')
+SERVER = re.compile(r'Server:\s*(.+)')
+
+# =========================================
+# GOBUSTER / NIKTO
+# =========================================
+
+# Formato típico: /admin (Status: 200) [Size: 1234]
+GOBUSTER_PATH = re.compile(r'(/[\w\-/._]*)\s+\(Status:\s*(\d+)\)\s*(?:\[Size:\s*(\d+)\])?')
+
+# Formato típico: + OSVDB-XXXX: /path: Description
+NIKTO_VULN = re.compile(r'\+\s+(OSVDB-\d+)?:?\s*([^\:]+):\s*(.+)')
+
+# =========================================
+# GENERALES
+# =========================================
+
+CVE = re.compile(r'CVE-\d{4}-\d+', re.IGNORECASE)
+
+IP_ADDRESS = re.compile(r'(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})')
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Pipeline Module - Scan Agent
+=============================
+Contexto en memoria compartido por las fases del agente.
+
+Las fases parsing → interpretación → informes → persistencia se pasan los
+resultados a través de PipelineContext en lugar de escribir y releer
+parsed_data.json y analysis.json. Esos archivos intermedios solo se
+escriben si se activa save_intermediate (--save-intermediate en la CLI).
+
+Autor: Scan Agent Team
+Versión: 1.0.0
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from scanagent import serialization
+
+
+@dataclass
+class PipelineContext:
+    """Estado de una ejecución del pipeline de análisis"""
+
+    outputs_dir: str = "./outputs"
+    target_ip: Optional[str] = None
+    profile_used: str = "manual"
+    output_format: Optional[str] = "all"  # None: sin informes
+    save_intermediate: bool = False
+
+    # Resultados de cada fase
+    parsed_data: Optional[Dict[str, Any]] = None
+    analysis: Optional[Dict[str, Any]] = None
+    reports: List[str] = field(default_factory=list)
+    files_processed: int = 0
+    db_scan_id: Optional[int] = None
+
+    # Segundos que tardó cada fase (parsing, interpretation, reports, database)
+    phase_timings: Dict[str, float] = field(default_factory=dict)
+
+    # Archivos intermedios escritos (solo con save_intermediate)
+    intermediate_files: List[str] = field(default_factory=list)
+
+    @property
+    def vulnerabilities(self) -> List[Dict[str, Any]]:
+        """Vulnerabilidades del análisis (lista vacía si aún no existe)"""
+        if not self.analysis:
+            return []
+        return self.analysis.get("vulnerabilidades", [])
+
+    @property
+    def vulnerability_count(self) -> int:
+        """Número de vulnerabilidades detectadas"""
+        return len(self.vulnerabilities)
+
+    def persist(self, data: Dict[str, Any], filename: str) -> Optional[Path]:
+        """
+        Escribe un artefacto intermedio si el contexto lo pide.
+
+        Returns:
+            Ruta escrita o None si los intermedios están desactivados
+        """
+        if not self.save_intermediate:
+            return None
+
+        path = serialization.dump(data, filename)
+        self.intermediate_files.append(str(path))
+        return path
+
+
+def analyze_outputs(outputs_dir: str = "./outputs",
+                    target_ip: Optional[str] = None) -> PipelineContext:
+    """
+    Ejecuta parsing e interpretación en memoria sobre un directorio de salidas.
+
+    Lo usan los puntos de entrada de los módulos que antes releían
+    parsed_data.json o analysis.json desde disco.
+    """
+    from scanagent.parser import ScanParser
+    from scanagent.interpreter import VulnerabilityInterpreter
+
+    context = PipelineContext(outputs_dir=outputs_dir, target_ip=target_ip)
+    context.parsed_data = ScanParser(outputs_dir).parse_all(target_ip)
+    if context.parsed_data:
+        context.analysis = VulnerabilityInterpreter(context.parsed_data).analyze()
+    return context
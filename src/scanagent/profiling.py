@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Profiling Module - Scan Agent
+=============================
+Instrumentación opcional del pipeline del agente (parsing, interpretación,
+informes y escritura en BD).
+
+El código marca sus pasos con spans:
+
+    with profiling.span("parse.nmap_service"):
+        ...
+
+y ScanAgent.run abre una sesión que activa los backends configurados:
+
+- cprofile: cProfile de toda la sesión → <sesión>.prof (pstats, snakeviz)
+- sampling: muestreo periódico de la pila → <sesión>.folded, en formato
+  "collapsed stacks" (flamegraph.pl, inferno, speedscope)
+- spans: un span por paso al estilo OpenTelemetry → <sesión>.spans.jsonl
+
+Activación (desactivado por defecto):
+    CLI:     --profiling cprofile,sampling,spans [--profiling-dir DIR]
+    Entorno: SCAN_AGENT_PROFILING=cprofile,spans  SCAN_AGENT_PROFILING_DIR=DIR
+
+Sin backends activos, span() y session() devuelven un contexto nulo
+compartido: el coste es una llamada y una comprobación.
+
+Cada hilo tiene su propia sesión (el servicio web ejecuta varios escaneos
+en paralelo en el threadpool): los spans se registran en la sesión del
+hilo que los abre, y los de hilos sin sesión se descartan. cProfile solo
+admite un perfil activo por proceso; si otra sesión lo está usando, la
+nueva se registra sin él.
+
+Autor: Scan Agent Team
+Versión: 1.0.0
+"""
+
+import cProfile
+import contextlib
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+BACKENDS = ('cprofile', 'sampling', 'spans')
+
+# Contexto que se devuelve cuando no hay nada que medir
+_NULL = contextlib.nullcontext()
+
+
+class _Session:
+    """Traza y spans de la sesión de un hilo"""
+
+    def __init__(self):
+        self.trace_id = secrets.token_hex(16)
+        self.spans: List[Dict[str, Any]] = []
+        self.stack: List[str] = []
+
+
+class Profiler:
+    """Backends de profiling activos y sesiones en curso (una por hilo)"""
+
+    # Segundos entre muestras de la pila (backend sampling)
+    SAMPLE_INTERVAL = 0.005
+
+    def __init__(self, backends: Iterable[str] = (), output_dir: str = "./profiling"):
+        self.backends: frozenset = frozenset()
+        self.output_dir = Path(output_dir)
+        self._local = threading.local()
+        self._cprofile_lock = threading.Lock()
+        self.configure(backends, output_dir)
+
+    @classmethod
+    def from_env(cls) -> "Profiler":
+        backends = os.environ.get("SCAN_AGENT_PROFILING", "")
+        return cls(
+            [name.strip() for name in backends.split(",") if name.strip()],
+            os.environ.get("SCAN_AGENT_PROFILING_DIR", "./profiling")
+        )
+
+    def configure(self, backends: Iterable[str], output_dir: Optional[str] = None) -> None:
+        """
+        Selecciona los backends (vacío desactiva el profiling).
+
+        Raises:
+            ValueError: Si algún backend no existe
+        """
+        backends = frozenset(backends)
+        unknown = backends - set(BACKENDS)
+        if unknown:
+            raise ValueError(f"Backend de profiling desconocido: {', '.join(sorted(unknown))}. "
+                             f"Opciones: {', '.join(BACKENDS)}")
+        self.backends = backends
+        if output_dir:
+            self.output_dir = Path(output_dir)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.backends)
+
+    # =========================================
+    # SPANS
+    # =========================================
+
+    def span(self, name: str, **attributes: Any):
+        """Mide un paso del pipeline (solo con el backend spans y una sesión activa en el hilo)"""
+        if 'spans' not in self.backends:
+            return _NULL
+        session = getattr(self._local, "session", None)
+        if session is None:
+            return _NULL
+        return self._span(session, name, attributes)
+
+    @contextmanager
+    def _span(self, session: _Session, name: str, attributes: Dict[str, Any]) -> Iterator[None]:
+        stack = session.stack
+        span_id = secrets.token_hex(8)
+        record = {
+            "trace_id": session.trace_id,
+            "span_id": span_id,
+            "parent_span_id": stack[-1] if stack else None,
+            "name": name,
+            "start_time_unix_nano": time.time_ns(),
+            "attributes": attributes,
+            "status": {"code": "OK"}
+        }
+        stack.append(span_id)
+        try:
+            yield
+        except BaseException as e:
+            record["status"] = {"code": "ERROR", "message": str(e)}
+            raise
+        finally:
+            stack.pop()
+            record["end_time_unix_nano"] = time.time_ns()
+            session.spans.append(record)
+
+    # =========================================
+    # SESIONES
+    # =========================================
+
+    def session(self, name: str, **attributes: Any):
+        """
+        Activa los backends configurados durante el bloque y escribe sus
+        resultados en output_dir al terminar.
+
+        Una sesión dentro de otra del mismo hilo se registra solo como span;
+        las de otros hilos son independientes.
+        """
+        if not self.backends:
+            return _NULL
+        if getattr(self._local, "session", None) is not None:
+            return self.span(name, **attributes)
+        return self._session(name, attributes)
+
+    @contextmanager
+    def _session(self, name: str, attributes: Dict[str, Any]) -> Iterator[None]:
+        session = _Session()
+        # Sesiones concurrentes en el mismo segundo: el prefijo de la traza
+        # distingue sus archivos
+        stem = f"{name}-{datetime.now().strftime('%Y%m%d_%H%M%S')}-{session.trace_id[:8]}"
+
+        profile = None
+        if 'cprofile' in self.backends:
+            if self._cprofile_lock.acquire(blocking=False):
+                profile = cProfile.Profile()
+            else:
+                print(f"[WARN] Profiling: cProfile ya está en uso por otra sesión, {stem} sin .prof")
+        sampler = _StackSampler(threading.get_ident(), self.SAMPLE_INTERVAL) \
+            if 'sampling' in self.backends else None
+
+        self._local.session = session
+        if sampler:
+            sampler.start()
+        if profile:
+            profile.enable()
+        try:
+            with self.span(name, **attributes):
+                yield
+        finally:
+            if profile:
+                profile.disable()
+                self._cprofile_lock.release()
+            if sampler:
+                sampler.stop()
+            self._local.session = None
+            self._write(stem, session, profile, sampler)
+
+    def _write(self, stem: str, session: _Session, profile: Optional[cProfile.Profile],
+               sampler: Optional["_StackSampler"]) -> None:
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            written = []
+
+            if profile:
+                path = self.output_dir / f"{stem}.prof"
+                profile.dump_stats(str(path))
+                written.append(path)
+
+            if sampler:
+                path = self.output_dir / f"{stem}.folded"
+                with open(path, 'w', encoding='utf-8') as f:
+                    for stack, count in sampler.stacks.most_common():
+                        f.write(f"{stack} {count}\n")
+                written.append(path)
+
+            if 'spans' in self.backends:
+                # Al escribir: importar serialization (orjson, records) al
+                # cargar el módulo retrasaría el arranque de la CLI
+                from scanagent import serialization
+                path = self.output_dir / f"{stem}.spans.jsonl"
+                with open(path, 'wb') as f:
+                    for record in sorted(session.spans, key=lambda r: r["start_time_unix_nano"]):
+                        f.write(serialization.dumps(record) + b"\n")
+                written.append(path)
+
+            for path in written:
+                print(f"[*] Profiling: {path}")
+        except OSError as e:
+            print(f"[WARN] No se pudieron escribir los resultados de profiling: {e}")
+
+
+class _StackSampler:
+    """Muestrea la pila de un hilo en segundo plano"""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{Path(code.co_filename).stem}.{code.co_name}")
+                frame = frame.f_back
+            if frames:
+                self.stacks[";".join(reversed(frames))] += 1
+
+
+# Instancia compartida por el proceso (configurada desde el entorno)
+profiler = Profiler.from_env()
+span = profiler.span
+session = profiler.session
+configure = profiler.configure
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Records Module - Scan Agent
+============================
+Registros compactos para los hallazgos que circulan entre fases.
+
+Cada registro es un dataclass con __slots__: ocupa una fracción de lo que
+ocupa un dict con las mismas claves y no se copia entre parser,
+intérprete e informes. Los nombres de campo son las claves que ya usaba
+el pipeline (puerto, servicio, severidad...), y los registros aceptan
+lectura tipo dict (`registro.get("puerto")`, `registro["puerto"]`) para que
+el código que también recibe datos cargados desde JSON funcione igual.
+Los campos que solo tienen algunos hallazgos van en una subclase (p. ej.
+NiktoVulnerability.ubicacion) en lugar de un opcional a None, para que el
+JSON tenga las mismas claves que los dicts de antes.
+
+La conversión a dict solo ocurre al serializar: orjson y msgspec
+serializan los dataclasses directamente y el backend estándar usa
+to_builtin() (ver serialization.py).
+
+Autor: Scan Agent Team
+Versión: 1.0.0
+"""
+
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Optional
+
+
+class Record:
+    """Acceso de solo lectura tipo dict para los registros"""
+
+    __slots__ = ()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self.__dataclass_fields__:
+            return getattr(self, key)
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.__dataclass_fields__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__dataclass_fields__
+
+    def keys(self):
+        return self.__dataclass_fields__.keys()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convierte el registro en dict (los valores anidados no se copian)"""
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
+@dataclass(slots=True)
+class PortRecord(Record):
+    """Puerto abierto detectado por nmap"""
+    puerto: int
+    protocolo: str
+    servicio: str
+    estado: str
+    version: str = ""
+
+
+@dataclass(slots=True)
+class ServiceRecord(Record):
+    """Servicio identificado (nmap o headers HTTP)"""
+    nombre: str
+    puerto: int
+    version: str = ""
+
+
+@dataclass(slots=True)
+class PathRecord(Record):
+    """Ruta descubierta por gobuster"""
+    ruta: str
+    codigo_http: int
+    tamano: Optional[int] = None
+
+
+@dataclass(slots=True)
+class NiktoFinding(Record):
+    """Hallazgo reportado por Nikto"""
+    id_osvdb: str
+    ubicacion: str
+    descripcion: str
+    fuente: str = "nikto"
+
+
+@dataclass(slots=True)
+class ExposedPort(Record):
+    """Puerto en la superficie de ataque con su evaluación de riesgo"""
+    puerto: Optional[int]
+    servicio: Optional[str]
+    version: Optional[str]
+    critico: bool
+    razon: Optional[str] = None
+
+
+@dataclass(slots=True)
+class Vulnerability(Record):
+    """Vulnerabilidad clasificada por el intérprete"""
+    id: str
+    titulo: str
+    descripcion: str
+    severidad: str
+    cvss_score: float
+    owasp_category: str
+    fuente: str
+    evidencia: Any
+    recomendacion: str
+
+
+@dataclass(slots=True)
+class NiktoVulnerability(Vulnerability):
+    """Vulnerabilidad de un hallazgo de Nikto (la única con ubicación)"""
+    ubicacion: str = ""
+
+
+def to_builtin(obj: Any) -> Any:
+    """Hook `default` para serializadores sin soporte de dataclasses"""
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
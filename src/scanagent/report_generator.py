@@ -14,11 +14,12 @@ Autor: Scan Agent Team
 Versión: 1.0.0
 """
 
-import json
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from pathlib import Path
 
+from scanagent import serialization
+
 
 class ReportGenerator:
     """
@@ -287,8 +288,8 @@ class ReportGenerator:
             "recommendations": self.recomendaciones
         }
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=2, ensure_ascii=False)
+        # Informe para lectura humana: se mantiene indentado
+        serialization.dump(report, output_file, pretty=True)
         
         print(f"[OK] Informe JSON generado: {output_file}")
         return output_file
@@ -904,12 +905,16 @@ if __name__ == "__main__":
     print("SCAN AGENT - REPORT GENERATOR MODULE")
     print("=" * 60)
     
-    # Cargar análisis
-    analysis_file = "analysis.json"
+    # Análisis: desde un JSON indicado como argumento o, por defecto,
+    # parseando e interpretando ./outputs en memoria
+    analysis_file = sys.argv[1] if len(sys.argv) > 1 else None
     
     try:
-        with open(analysis_file, 'r', encoding='utf-8') as f:
-            analysis_data = json.load(f)
+        if analysis_file:
+            analysis_data = serialization.load(analysis_file)
+        else:
+            from scanagent.pipeline import analyze_outputs
+            analysis_data = analyze_outputs("./outputs").analysis
         
         # Crear generador de informes
         generator = ReportGenerator(analysis_data)
@@ -924,8 +929,8 @@ if __name__ == "__main__":
             print(f"  {format_type.upper()}: {file_path}")
         
     except FileNotFoundError:
-        print(f"\n[ERROR] No se encontró el archivo {analysis_file}")
-        print("Ejecuta primero interpreter.py para generar el análisis")
+        print(f"\n[ERROR] No se encontró {analysis_file or './outputs'}")
+        print("Indica un JSON de análisis o ejecuta desde el directorio con ./outputs")
         sys.exit(1)
     except Exception as e:
         print(f"\n[ERROR] {str(e)}")
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Result Cache Module - Scan Agent
+================================
+Caché de salidas de herramientas direccionada por contenido.
+
+La clave de cada entrada es el hash de (objetivo, comando completo,
+versión de la herramienta): si cualquiera de los tres cambia, la entrada
+no se reutiliza. Los comandos acotados por el descubrimiento incluyen los
+puertos en sus argumentos, así que un cambio en los puertos abiertos
+también invalida sus entradas.
+
+Una entrada solo se sirve si su antigüedad no supera max_age (--max-age
+en la CLI); con max_age = 0 la caché está desactivada. Solo se cachean
+los comandos marcados con 'cache': True en su perfil (ver ScanProfile), y
+el escáner llama a prune() al iniciar cada escaneo.
+
+Estructura en disco:
+    <cache_dir>/<2 primeros caracteres>/<clave>.out   Salida de la herramienta
+    <cache_dir>/<2 primeros caracteres>/<clave>.json  Metadatos
+
+Autor: Scan Agent Team
+Versión: 1.0.0
+"""
+
+import hashlib
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from scanagent import serialization
+
+
+class ResultCache:
+    """Caché de salidas de comandos con antigüedad máxima"""
+
+    # Antigüedad a partir de la cual prune() elimina entradas (7 días)
+    RETENTION = 7 * 24 * 3600
+
+    def __init__(self, cache_dir: Optional[str] = None, max_age: int = 0):
+        """
+        Inicializa la caché.
+
+        Args:
+            cache_dir: Directorio de la caché (default: data/cache/results)
+            max_age: Antigüedad máxima en segundos de una entrada reutilizable
+        """
+        base_dir = Path(__file__).parent.parent.parent
+        self.cache_dir = Path(cache_dir) if cache_dir else base_dir / "data" / "cache" / "results"
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_age > 0
+
+    @staticmethod
+    def key(target: str, command: str, tool_version: str) -> str:
+        """Clave de una ejecución: hash de objetivo, comando y versión"""
+        material = "\0".join((target, command, tool_version or ""))
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str):
+        folder = self.cache_dir / key[:2]
+        return folder / f"{key}.out", folder / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Busca una entrada vigente.
+
+        Returns:
+            Metadatos de la entrada (con 'output_path' y 'age') o None
+        """
+        if not self.enabled:
+            return None
+
+        output_path, meta_path = self._paths(key)
+        try:
+            meta = serialization.load(meta_path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        age = time.time() - meta.get("created_at", 0)
+        if age > self.max_age or not output_path.exists():
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        meta["output_path"] = str(output_path)
+        meta["age"] = age
+        return meta
+
+    def put(self, key: str, output_file: str, metadata: Dict[str, Any]) -> None:
+        """Guarda la salida de un comando completado"""
+        if not self.enabled:
+            return
+
+        output_path, meta_path = self._paths(key)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Escribir a un temporal y renombrar: nunca se lee una entrada a medias
+        tmp_path = output_path.with_suffix(".tmp")
+        shutil.copyfile(output_file, tmp_path)
+        os.replace(tmp_path, output_path)
+        serialization.dump({**metadata, "created_at": time.time()}, meta_path)
+
+    def prune(self, retention: int = RETENTION) -> int:
+        """
+        Elimina entradas más antiguas que `retention` segundos.
+
+        Returns:
+            Número de entradas eliminadas
+        """
+        if not self.cache_dir.exists():
+            return 0
+
+        removed = 0
+        cutoff = time.time() - retention
+        for meta_path in self.cache_dir.glob("*/*.json"):
+            try:
+                if meta_path.stat().st_mtime >= cutoff:
+                    continue
+                meta_path.with_suffix(".out").unlink(missing_ok=True)
+                meta_path.unlink()
+                removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Métrica de aciertos de la caché en esta ejecución"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "max_age": self.max_age,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0
+        }
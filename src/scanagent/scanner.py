@@ -8,17 +8,47 @@ Autor: Scan Agent Team
 Versión: 2.0.0
 """
 
+import hashlib
 import subprocess
 import os
 import sys
+import time
+import shutil
+import signal
+import threading
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 from pathlib import Path
 import shlex
 
+from scanagent import serialization
+from scanagent import patterns
+from scanagent.result_cache import ResultCache
+from scanagent.toolchain import toolchain
+from scanagent.scheduler import scheduler
+
 
 class ScanProfile:
-    """Define un perfil de escaneo con comandos específicos"""
+    """
+    Define un perfil de escaneo con comandos específicos.
+    
+    Los comandos pueden organizarse por etapas:
+    - 'stage': 'discovery' marca un barrido rápido de puertos cuyo resultado
+      (puertos abiertos) acota los comandos posteriores
+    - 'scope': 'ports' limita el comando a los puertos descubiertos mediante
+      {ports_arg}; se omite si el descubrimiento no encontró puertos
+    - 'scope': 'http' dirige el comando al servicio web descubierto mediante
+      {http_url}; se omite si no hay ningún puerto HTTP abierto
+    
+    Con 'cache': True la salida del comando se puede reutilizar desde la
+    caché de resultados (--max-age). Solo se marcan las sondas cuya salida
+    se puede reutilizar (cabeceras HTTP, certificados y cifrados TLS); los
+    barridos de puertos, los scripts de vulnerabilidades, nikto y gobuster
+    se ejecutan siempre para no reportar resultados de un host que cambió.
+    
+    Sin etapa de descubrimiento, {ports_arg} queda vacío (puertos por
+    defecto de nmap) y {http_url} es http://{target}.
+    """
     
     def __init__(self, name: str, description: str, commands: List[Dict]):
         self.name = name
@@ -27,9 +57,50 @@ class ScanProfile:
         self.requires_sudo = any(cmd.get('sudo', False) for cmd in commands)
 
 
+class ProcessReaper:
+    """
+    Espera a un comando en un hilo propio y recoge su uso de recursos.
+    
+    Con os.wait4 se obtienen el tiempo de CPU y la memoria máxima (RSS) del
+    propio comando y de los hijos que haya esperado; donde no existe
+    (Windows) solo se obtiene el código de salida.
+    """
+    
+    def __init__(self, process: subprocess.Popen):
+        self.process = process
+        self.usage: Dict[str, float] = {}
+        self.done = threading.Event()
+        threading.Thread(target=self._reap, daemon=True).start()
+    
+    def _reap(self) -> None:
+        try:
+            if hasattr(os, 'wait4'):
+                _, status, rusage = os.wait4(self.process.pid, 0)
+                self.process.returncode = os.waitstatus_to_exitcode(status)
+                # ru_maxrss está en KB en Linux y en bytes en macOS
+                max_rss = rusage.ru_maxrss // 1024 if sys.platform == 'darwin' else rusage.ru_maxrss
+                self.usage = {
+                    'cpu_user': round(rusage.ru_utime, 3),
+                    'cpu_system': round(rusage.ru_stime, 3),
+                    'max_rss_kb': max_rss
+                }
+            else:
+                self.process.wait()
+        finally:
+            self.done.set()
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que termine el comando; False si se agotó el timeout"""
+        return self.done.wait(timeout)
+
+
 class VulnerabilityScanner:
     """Ejecutor de escaneos de vulnerabilidades"""
     
+    # Puertos que se consideran web aunque nmap no identifique el servicio
+    HTTP_PORTS = (80, 443, 8080, 8443, 8000, 8888, 3000, 5000)
+    HTTPS_PORTS = (443, 8443)
+    
     # Definición de perfiles de escaneo
     PROFILES = {
         'quick': ScanProfile(
@@ -48,7 +119,8 @@ class VulnerabilityScanner:
                     'args': '-I http://{target}',
                     'output': 'headers_{target}.txt',
                     'timeout': 30,
-                    'required': False
+                    'required': False,
+                    'cache': True
                 }
             ]
         ),
@@ -59,31 +131,45 @@ class VulnerabilityScanner:
             commands=[
                 {
                     'tool': 'nmap',
-                    'args': '-sV -sC -p- {target}',
+                    'args': '-T4 -p- --open {target}',
+                    'output': 'nmap_discovery_{target}.txt',
+                    'timeout': 600,
+                    'required': True,
+                    'stage': 'discovery'
+                },
+                {
+                    'tool': 'nmap',
+                    'args': '-sV -sC {ports_arg} {target}',
                     'output': 'nmap_service_{target}.txt',
                     'timeout': 900,
-                    'required': True
+                    'required': True,
+                    'scope': 'ports'
                 },
                 {
                     'tool': 'nmap',
-                    'args': '--script=vuln,safe {target}',
+                    'args': '--script=vuln,safe {ports_arg} {target}',
                     'output': 'nmap_nse_{target}.txt',
                     'timeout': 600,
-                    'required': True
+                    'required': True,
+                    'scope': 'ports'
                 },
                 {
                     'tool': 'curl',
-                    'args': '-I http://{target}',
+                    'args': '-I {http_url}',
                     'output': 'headers_{target}.txt',
                     'timeout': 30,
-                    'required': False
+                    'required': False,
+                    'cache': True,
+                    'scope': 'http'
                 },
                 {
                     'tool': 'curl',
-                    'args': '-v http://{target}',
+                    'args': '-v {http_url}',
                     'output': 'curl_verbose_{target}.txt',
                     'timeout': 30,
-                    'required': False
+                    'required': False,
+                    'cache': True,
+                    'scope': 'http'
                 }
             ]
         ),
@@ -94,45 +180,61 @@ class VulnerabilityScanner:
             commands=[
                 {
                     'tool': 'nmap',
-                    'args': '-sV -sC -A -p- {target}',
+                    'args': '-T4 -p- --open {target}',
+                    'output': 'nmap_discovery_{target}.txt',
+                    'timeout': 900,
+                    'required': True,
+                    'stage': 'discovery'
+                },
+                {
+                    'tool': 'nmap',
+                    'args': '-sV -sC -A {ports_arg} {target}',
                     'output': 'nmap_service_{target}.txt',
                     'timeout': 1800,
-                    'required': True
+                    'required': True,
+                    'scope': 'ports'
                 },
                 {
                     'tool': 'nmap',
-                    'args': '--script=vuln,exploit,auth,discovery {target}',
+                    'args': '--script=vuln,exploit,auth,discovery {ports_arg} {target}',
                     'output': 'nmap_nse_{target}.txt',
                     'timeout': 1200,
-                    'required': True
+                    'required': True,
+                    'scope': 'ports'
                 },
                 {
                     'tool': 'nikto',
-                    'args': '-h http://{target} -Format txt',
+                    'args': '-h {http_url} -Format txt',
                     'output': 'nikto_{target}.txt',
                     'timeout': 1800,
-                    'required': False
+                    'required': False,
+                    'scope': 'http'
                 },
                 {
                     'tool': 'gobuster',
-                    'args': 'dir -u http://{target} -w /usr/share/wordlists/dirb/common.txt -q',
+                    'args': 'dir -u {http_url} -w /usr/share/wordlists/dirb/common.txt -q',
                     'output': 'gobuster_{target}.txt',
                     'timeout': 600,
-                    'required': False
+                    'required': False,
+                    'scope': 'http'
                 },
                 {
                     'tool': 'curl',
-                    'args': '-I http://{target}',
+                    'args': '-I {http_url}',
                     'output': 'headers_{target}.txt',
                     'timeout': 30,
-                    'required': False
+                    'required': False,
+                    'cache': True,
+                    'scope': 'http'
                 },
                 {
                     'tool': 'curl',
-                    'args': '-v http://{target}',
+                    'args': '-v {http_url}',
                     'output': 'curl_verbose_{target}.txt',
                     'timeout': 30,
-                    'required': False
+                    'required': False,
+                    'cache': True,
+                    'scope': 'http'
                 }
             ]
         ),
@@ -174,14 +276,16 @@ class VulnerabilityScanner:
                     'args': '-I http://{target}',
                     'output': 'headers_{target}.txt',
                     'timeout': 30,
-                    'required': False
+                    'required': False,
+                    'cache': True
                 },
                 {
                     'tool': 'curl',
                     'args': '-v http://{target}',
                     'output': 'curl_verbose_{target}.txt',
                     'timeout': 30,
-                    'required': False
+                    'required': False,
+                    'cache': True
                 }
             ]
         ),
@@ -247,14 +351,16 @@ class VulnerabilityScanner:
                     'args': '--script=http-security-headers,http-headers,ssl-cert,ssl-enum-ciphers {target}',
                     'output': 'nmap_nse_{target}.txt',
                     'timeout': 600,
-                    'required': True
+                    'required': True,
+                    'cache': True
                 },
                 {
                     'tool': 'curl',
                     'args': '-I https://{target}',
                     'output': 'headers_{target}.txt',
                     'timeout': 30,
-                    'required': False
+                    'required': False,
+                    'cache': True
                 }
             ]
         ),
@@ -282,21 +388,46 @@ class VulnerabilityScanner:
                     'args': '-I -H "Accept: application/json" http://{target}',
                     'output': 'headers_{target}.txt',
                     'timeout': 30,
-                    'required': False
+                    'required': False,
+                    'cache': True
                 }
             ]
         )
     }
     
-    def __init__(self, verbose: bool = False):
+    # Manifiesto de comandos completados en el directorio de salida
+    MANIFEST_NAME = 'scan_manifest.json'
+    
+    # Segundos entre SIGTERM y SIGKILL al cancelar un comando
+    CANCEL_GRACE = 5
+    
+    def __init__(self, verbose: bool = False,
+                 on_event: Optional[Callable[[Dict], None]] = None,
+                 on_output: Optional[Callable[[str, str, str], None]] = None,
+                 max_age: int = 0):
         """
         Inicializa el escáner de vulnerabilidades.
         
         Args:
             verbose: Mostrar información detallada
+            on_event: Callback que recibe los eventos de progreso del escaneo
+                (inicio/fin de escaneo y de cada comando)
+            on_output: Callback que recibe la salida de las herramientas a
+                medida que se produce: on_output(tool, stream, text), con
+                stream "stdout" o "stderr"
+            max_age: Antigüedad máxima (segundos) de las salidas en caché que
+                se pueden reutilizar; 0 desactiva la caché
         """
         self.output_dir = None  # Se configurará en run_scan
         self.verbose = verbose
+        self.on_event = on_event
+        self.on_output = on_output
+        self.discovered_ports = None  # [(puerto, servicio)] tras la etapa de descubrimiento
+        self.result_cache = ResultCache(max_age=max_age)
+        self.manifest = None  # Checkpoints de la ejecución (ver run_scan)
+        self._cancel_event = threading.Event()
+        self._running = None  # ProcessReaper del comando en ejecución (para cancel)
+        self._process_lock = threading.Lock()
         self.results = {
             'started_at': None,
             'finished_at': None,
@@ -307,26 +438,57 @@ class VulnerabilityScanner:
             'outputs_generated': []
         }
     
-    def check_tool_availability(self, tool: str) -> bool:
-        """Verifica si una herramienta está disponible en el sistema"""
+    def _emit(self, event_type: str, **data) -> None:
+        """Envía un evento de progreso al callback configurado"""
+        if self.on_event is None:
+            return
         try:
-            result = subprocess.run(
-                ['which', tool],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                timeout=5
-            )
-            available = result.returncode == 0
-            
+            self.on_event({"type": event_type, **data})
+        except Exception as e:
             if self.verbose:
-                status = "✅ Disponible" if available else "❌ No encontrada"
-                print(f"  [{tool}] {status}")
-            
-            return available
+                print(f"   ⚠️  Error notificando progreso: {e}")
+    
+    def _emit_output(self, tool: str, stream: str, text: str) -> None:
+        """Envía un fragmento de salida de una herramienta al callback"""
+        if self.on_output is None:
+            return
+        try:
+            self.on_output(tool, stream, text)
         except Exception as e:
             if self.verbose:
-                print(f"  [{tool}] ❌ Error al verificar: {str(e)}")
-            return False
+                print(f"   ⚠️  Error enviando salida: {e}")
+    
+    def _pump(self, pipe, tool: str, stream: str, sink) -> None:
+        """
+        Lee un pipe línea a línea hasta EOF (en un hilo aparte).
+        
+        Cada línea se entrega a `sink` (archivo o lista) y al callback de
+        salida, de modo que la salida es visible mientras la herramienta
+        sigue ejecutándose.
+        """
+        try:
+            for line in iter(pipe.readline, ''):
+                sink(line)
+                self._emit_output(tool, stream, line)
+        except (OSError, ValueError):
+            # Pipe o archivo cerrados tras un timeout
+            pass
+        finally:
+            pipe.close()
+    
+    def check_tool_availability(self, tool: str) -> bool:
+        """Verifica si una herramienta está disponible en el sistema
+        
+        Usa la caché de herramientas del proceso: no lanza ningún proceso
+        salvo cuando la entrada caduca.
+        """
+        available = toolchain.available(tool)
+        
+        if self.verbose:
+            status = "✅ Disponible" if available else "❌ No encontrada"
+            print(f"  [{tool}] {status}")
+        
+        return available
     
     def check_all_tools(self, profile: ScanProfile) -> Dict[str, bool]:
         """Verifica disponibilidad de todas las herramientas del perfil"""
@@ -341,10 +503,267 @@ class VulnerabilityScanner:
         
         return tools
     
-    def execute_command(self, command: Dict, target: str) -> bool:
-        """Ejecuta un comando individual del escaneo"""
+    def tool_version(self, tool: str) -> str:
+        """Versión de una herramienta (caché de proceso, ver toolchain.py)"""
+        return toolchain.version(tool)
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+    
+    def cancel(self) -> None:
+        """
+        Cancela el escaneo desde cualquier hilo.
+        
+        No se lanzan más comandos, se interrumpe la espera de hueco en el
+        scheduler y el comando en ejecución recibe SIGTERM en todo su grupo
+        de procesos (SIGKILL si sigue vivo tras CANCEL_GRACE segundos).
+        Vuelve cuando el comando ha terminado.
+        """
+        self._cancel_event.set()
+        scheduler.wake()
+        
+        with self._process_lock:
+            reaper = self._running
+        if reaper is None or reaper.done.is_set():
+            return
+        
+        self._signal_process_group(reaper.process, signal.SIGTERM)
+        if not reaper.wait(self.CANCEL_GRACE):
+            self._signal_process_group(reaper.process, signal.SIGKILL)
+            reaper.wait()
+    
+    @staticmethod
+    def _signal_process_group(process: subprocess.Popen, sig: int) -> None:
+        """
+        Envía una señal al comando y a sus hijos.
+        
+        Los comandos se lanzan en su propia sesión, así que su PID es
+        también el de su grupo de procesos.
+        """
+        try:
+            if os.name == 'posix':
+                os.killpg(process.pid, sig)
+            elif sig == signal.SIGTERM:
+                process.terminate()
+            else:
+                process.kill()
+        except ProcessLookupError:
+            pass
+        except PermissionError:
+            # Comandos con sudo lanzados sin privilegios: solo el proceso directo
+            try:
+                process.send_signal(sig)
+            except OSError:
+                pass
+    
+    @staticmethod
+    def _file_sha256(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def _load_manifest(self, target: str, profile_name: str, resume: bool) -> None:
+        """
+        Prepara el manifiesto de la ejecución.
+        
+        Con resume=True se conservan los checkpoints de una ejecución
+        anterior del mismo objetivo y perfil en este directorio.
+        """
+        path = self.output_dir / self.MANIFEST_NAME
+        manifest = None
+        if resume and path.exists():
+            try:
+                manifest = serialization.load(path)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Manifiesto ilegible, se empieza de cero: {e}")
+            else:
+                if manifest.get('target') != target or manifest.get('profile') != profile_name:
+                    print("⚠️  El manifiesto corresponde a otro objetivo o perfil, se empieza de cero")
+                    manifest = None
+        
+        self.manifest = manifest or {'target': target, 'profile': profile_name, 'commands': {}}
+    
+    def _save_manifest(self) -> None:
+        """Escribe el manifiesto de forma atómica"""
+        path = self.output_dir / self.MANIFEST_NAME
+        tmp_path = path.with_suffix('.tmp')
+        serialization.dump(self.manifest, tmp_path)
+        os.replace(tmp_path, path)
+    
+    def _checkpoint(self, base_command: str, tool: str, output_file: str,
+                    returncode: int, duration: float) -> None:
+        """Registra un comando completado en el manifiesto"""
+        if self.manifest is None:
+            return
+        try:
+            self.manifest['commands'][base_command] = {
+                'tool': tool,
+                'output_file': output_file,
+                'sha256': self._file_sha256(output_file),
+                'returncode': returncode,
+                'duration': duration,
+                'completed_at': time.time()
+            }
+            self._save_manifest()
+        except OSError as e:
+            if self.verbose:
+                print(f"   ⚠️  No se pudo actualizar el manifiesto: {e}")
+    
+    def _completed_checkpoint(self, base_command: str, output_file: str) -> Optional[Dict]:
+        """Checkpoint de un comando ya completado cuya salida sigue intacta"""
+        if self.manifest is None:
+            return None
+        entry = self.manifest['commands'].get(base_command)
+        if entry is None or entry.get('output_file') != output_file:
+            return None
+        try:
+            if self._file_sha256(output_file) != entry.get('sha256'):
+                return None
+        except OSError:
+            return None
+        return entry
+    
+    def _replay_output(self, tool: str, output_file: str) -> None:
+        """
+        Reenvía una salida ya escrita por el mismo camino que la salida en
+        vivo (tail, parseo incremental); se omite la sección de stderr
+        """
+        if self.on_output is None:
+            return
+        with open(output_file, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                if line.startswith("=== STDERR ==="):
+                    break
+                self._emit_output(tool, 'stdout', line)
+    
+    def _use_cached(self, entry: Dict, tool: str, full_command: str, output_file: str,
+                    step: int, total: int) -> bool:
+        """Sirve un comando desde la caché de resultados"""
+        shutil.copyfile(entry['output_path'], output_file)
+        self._replay_output(tool, output_file)
+        
+        self.results['commands_executed'].append({
+            'tool': tool,
+            'command': full_command,
+            'output_file': output_file,
+            'duration': 0.0,
+            'returncode': entry.get('returncode', 0),
+            'output_bytes': os.path.getsize(output_file),
+            'cached': True,
+            'cache_age': round(entry['age'], 1)
+        })
+        self.results['outputs_generated'].append(output_file)
+        
+        self._emit("command_finished", step=step, total=total, tool=tool,
+                   success=True, returncode=entry.get('returncode', 0), duration=0.0,
+                   output_bytes=os.path.getsize(output_file), cached=True)
+        
+        if self.verbose:
+            print(f"   ♻️  Servido desde caché (antigüedad: {entry['age'] / 60:.0f} min)")
+        return True
+    
+    @staticmethod
+    def _nmap_dropped_packets(output_file: str) -> bool:
+        """Indica si nmap avisó de puertos abandonados por pérdida de paquetes"""
+        try:
+            with open(output_file, 'r', encoding='utf-8', errors='ignore') as f:
+                return any('retransmission cap hit' in line for line in f)
+        except OSError:
+            return False
+    
+    def _record_discovery(self, output_file: str) -> None:
+        """Extrae los puertos abiertos de la salida de la etapa de descubrimiento"""
+        try:
+            with open(output_file, 'r', encoding='utf-8', errors='ignore') as f:
+                content = f.read()
+        except OSError:
+            return
+        
+        # Línea a línea: sin versión, el patrón aplicado al archivo entero
+        # tomaría la línea siguiente como versión del puerto
+        ports = {}
+        for line in content.splitlines():
+            match = patterns.NMAP_PORT.match(line.strip())
+            if match and match.group(3) == 'open' and match.group(2) == 'tcp':
+                ports[int(match.group(1))] = match.group(4)
+        
+        self.discovered_ports = sorted(ports.items())
+    
+    def _finish_discovery(self, output_file: str, target: str, step: int, total: int) -> None:
+        """
+        Registra los puertos de la etapa de descubrimiento y los notifica.
+        
+        Si la salida no se puede leer, discovered_ports sigue en None y los
+        comandos siguientes usan los puertos por defecto de nmap.
+        """
+        self._record_discovery(output_file)
+        ports = [port for port, _ in self.discovered_ports or []]
+        self._emit("ports_discovered", step=step, total=total,
+                   ports=ports, http_url=self._http_url(target))
+        if self.verbose:
+            print(f"   🔎 Puertos abiertos: {len(ports)} "
+                  f"- servicio web: {self._http_url(target) or 'ninguno'}")
+    
+    def _http_url(self, target: str) -> Optional[str]:
+        """
+        URL del servicio web a analizar.
+        
+        Sin descubrimiento se usa http://{target}; con descubrimiento, el
+        primer puerto web abierto (80 y 443 tienen prioridad).
+        """
+        if self.discovered_ports is None:
+            return f"http://{target}"
+        
+        web = [(port, service) for port, service in self.discovered_ports
+               if 'http' in service or port in self.HTTP_PORTS]
+        if not web:
+            return None
+        
+        web.sort(key=lambda item: (item[0] not in (80, 443), item[0]))
+        port, service = web[0]
+        https = port in self.HTTPS_PORTS or 'https' in service or 'ssl' in service
+        scheme = 'https' if https else 'http'
+        if port == (443 if https else 80):
+            return f"{scheme}://{target}"
+        return f"{scheme}://{target}:{port}"
+    
+    def _scope_command(self, command: Dict, target: str) -> Optional[str]:
+        """
+        Construye los argumentos de un comando según los resultados del
+        descubrimiento.
+        
+        Returns:
+            Argumentos formateados o None si el comando no tiene nada que
+            analizar (sin puertos abiertos o sin servicio web)
+        """
+        scope = command.get('scope')
+        ports_arg = ''
+        if self.discovered_ports is not None:
+            if scope == 'ports' and not self.discovered_ports:
+                return None
+            ports_arg = '-p' + ','.join(str(port) for port, _ in self.discovered_ports)
+        
+        http_url = self._http_url(target)
+        if scope == 'http' and http_url is None:
+            return None
+        
+        return command['args'].format(target=target, ports_arg=ports_arg,
+                                      http_url=http_url or f"http://{target}")
+    
+    def execute_command(self, command: Dict, target: str, step: int = 0, total: int = 0) -> bool:
+        """Ejecuta un comando individual del escaneo
+        
+        Args:
+            command: Definición del comando del perfil
+            target: IP o dominio objetivo
+            step: Posición del comando en el perfil (para eventos de progreso)
+            total: Número de comandos del perfil
+        """
         tool = command['tool']
-        args = command['args'].format(target=target)
+        args = self._scope_command(command, target)
         output_file = os.path.join(
             self.output_dir,
             command['output'].format(target=target)
@@ -353,70 +772,222 @@ class VulnerabilityScanner:
         use_sudo = command.get('sudo', False)
         
         # Construir comando completo
-        full_command = f"{tool} {args}"
+        base_command = f"{tool} {args}"
         if use_sudo:
-            full_command = f"sudo {full_command}"
+            base_command = f"sudo {base_command}"
+        
+        # Temporización de nmap adaptada a los timeouts/pérdidas observados
+        # en la subred (la clave de caché usa el comando sin adaptar)
+        full_command = base_command
+        if tool == 'nmap':
+            adapted = scheduler.adapt_nmap_args(target, args)
+            if adapted != args:
+                full_command = f"sudo {tool} {adapted}" if use_sudo else f"{tool} {adapted}"
         
         if self.verbose:
             print(f"\n⚙️  Ejecutando: {full_command}")
             print(f"   Timeout: {timeout}s")
             print(f"   Salida: {output_file}")
         
+        self._emit("command_started", step=step, total=total, tool=tool,
+                   command=full_command, timeout=timeout)
+        
+        # Reanudación: el comando ya terminó en una ejecución anterior
+        checkpoint = self._completed_checkpoint(base_command, output_file)
+        if checkpoint is not None:
+            self._replay_output(tool, output_file)
+            self.results['commands_executed'].append({
+                'tool': tool,
+                'command': full_command,
+                'output_file': output_file,
+                'duration': checkpoint.get('duration', 0.0),
+                'returncode': checkpoint.get('returncode', 0),
+                'output_bytes': os.path.getsize(output_file),
+                'resumed': True
+            })
+            self.results['outputs_generated'].append(output_file)
+            self._emit("command_finished", step=step, total=total, tool=tool,
+                       success=True, returncode=checkpoint.get('returncode', 0),
+                       duration=0.0, output_bytes=os.path.getsize(output_file), resumed=True)
+            if self.verbose:
+                print("   ⏩ Completado en una ejecución anterior (reanudado)")
+            if command.get('stage') == 'discovery':
+                self._finish_discovery(output_file, target, step, total)
+            return True
+        
+        # Caché de resultados: mismo objetivo, comando y versión de herramienta
+        cache_key = None
+        if self.result_cache.enabled and command.get('cache', False):
+            cache_key = ResultCache.key(target, base_command, self.tool_version(tool))
+            entry = self.result_cache.get(cache_key)
+            if entry is not None:
+                success = self._use_cached(entry, tool, full_command, output_file, step, total)
+                if success:
+                    self._checkpoint(base_command, tool, output_file, entry.get('returncode', 0), 0.0)
+                if command.get('stage') == 'discovery':
+                    self._finish_discovery(output_file, target, step, total)
+                return success
+        
+        slot = None
         try:
+            # Esperar hueco en los límites de concurrencia globales, del
+            # objetivo, de la subred y de la herramienta
+            slot = scheduler.acquire(
+                tool, target,
+                on_wait=lambda: self._emit("command_queued", step=step, total=total, tool=tool),
+                cancel=self._cancel_event
+            )
+            
             # Ejecutar comando
             start_time = datetime.now()
             
-            process = subprocess.Popen(
-                shlex.split(full_command),
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
+            # Sesión propia: cancelar o agotar el timeout termina también los
+            # procesos hijos de la herramienta. La comprobación de cancelación
+            # va dentro del lock para que cancel() no pierda un comando que
+            # está arrancando.
+            with self._process_lock:
+                if slot is None or self.cancelled:
+                    self._emit("command_finished", step=step, total=total, tool=tool,
+                               success=False, reason="cancelled")
+                    return False
+                process = subprocess.Popen(
+                    shlex.split(full_command),
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    errors='replace',
+                    bufsize=1,
+                    start_new_session=True
+                )
+                reaper = self._running = ProcessReaper(process)
             
-            try:
-                stdout, stderr = process.communicate(timeout=timeout)
+            # stdout se escribe al archivo según llega (line-buffered) y
+            # stderr se acumula para añadirlo al final, como antes
+            stderr_lines = []
+            with open(output_file, 'w', buffering=1) as f:
+                readers = [
+                    threading.Thread(target=self._pump, daemon=True,
+                                     args=(process.stdout, tool, 'stdout', f.write)),
+                    threading.Thread(target=self._pump, daemon=True,
+                                     args=(process.stderr, tool, 'stderr', stderr_lines.append))
+                ]
+                for reader in readers:
+                    reader.start()
+                
+                try:
+                    timed_out = not reaper.wait(timeout)
+                    if timed_out:
+                        self._signal_process_group(process, signal.SIGKILL)
+                        reaper.wait()
+                finally:
+                    # Interrupción (Ctrl+C) durante la espera: no dejar huérfanos
+                    if not reaper.done.is_set():
+                        self._signal_process_group(process, signal.SIGKILL)
+                        reaper.wait()
+                    with self._process_lock:
+                        self._running = None
                 returncode = process.returncode
-            except subprocess.TimeoutExpired:
-                process.kill()
-                stdout, stderr = process.communicate()
-                if self.verbose:
-                    print(f"   ⚠️  Comando excedió timeout de {timeout}s")
-                return False
-            
-            end_time = datetime.now()
-            duration = (end_time - start_time).total_seconds()
-            
-            # Guardar salida
-            with open(output_file, 'w') as f:
-                f.write(stdout)
+                
+                for reader in readers:
+                    reader.join(timeout=5)
+                
+                stderr = ''.join(stderr_lines)
                 if stderr:
                     f.write("\n\n=== STDERR ===\n")
                     f.write(stderr)
             
-            # Registrar resultado
-            self.results['commands_executed'].append({
+            # Registro del comando: duración, CPU, memoria máxima y bytes de
+            # salida (también de los cancelados y los que exceden el timeout)
+            duration = (datetime.now() - start_time).total_seconds()
+            output_bytes = os.path.getsize(output_file)
+            record = {
                 'tool': tool,
                 'command': full_command,
                 'output_file': output_file,
+                'started_at': start_time.isoformat(),
                 'duration': duration,
-                'returncode': returncode
-            })
+                'returncode': returncode,
+                'output_bytes': output_bytes,
+                **reaper.usage
+            }
+            cpu_time = round(reaper.usage.get('cpu_user', 0) + reaper.usage.get('cpu_system', 0), 3)
+            
+            if self.cancelled:
+                # La salida parcial queda en el archivo y cuenta para el análisis
+                record['cancelled'] = True
+                self.results['commands_executed'].append(record)
+                self.results['outputs_generated'].append(output_file)
+                self._emit("command_finished", step=step, total=total, tool=tool,
+                           success=False, reason="cancelled", duration=round(duration, 2),
+                           output_bytes=output_bytes, cpu_time=cpu_time)
+                if self.verbose:
+                    print(f"   ⛔ Cancelado tras {duration:.2f}s (salida parcial conservada)")
+                return False
+            
+            # Timeout o paquetes perdidos: los próximos nmap a la subred bajan un escalón
+            degraded = timed_out or (tool == 'nmap' and self._nmap_dropped_packets(output_file))
+            new_step = scheduler.report(tool, target, degraded)
+            if new_step is not None and self.verbose:
+                print(f"   ⏱️  Temporización de nmap para la subred ajustada al escalón {new_step}")
+            
+            if timed_out:
+                # La salida parcial queda en el archivo para poder revisarla
+                record['timed_out'] = True
+                self.results['commands_executed'].append(record)
+                if self.verbose:
+                    print(f"   ⚠️  Comando excedió timeout de {timeout}s")
+                self._emit("command_finished", step=step, total=total, tool=tool,
+                           success=False, reason="timeout", duration=round(duration, 2),
+                           output_bytes=output_bytes, cpu_time=cpu_time)
+                return False
             
+            # Registrar resultado
+            self.results['commands_executed'].append(record)
             self.results['outputs_generated'].append(output_file)
             
+            if returncode == 0:
+                self._checkpoint(base_command, tool, output_file, returncode, duration)
+            
+            if cache_key and returncode == 0:
+                try:
+                    self.result_cache.put(cache_key, output_file, {
+                        'tool': tool,
+                        'command': full_command,
+                        'target': target,
+                        'tool_version': self.tool_version(tool),
+                        'returncode': returncode,
+                        'duration': duration
+                    })
+                except OSError as e:
+                    if self.verbose:
+                        print(f"   ⚠️  No se pudo guardar en caché: {e}")
+            
+            if command.get('stage') == 'discovery' and returncode == 0:
+                self._finish_discovery(output_file, target, step, total)
+            
+            self._emit("command_finished", step=step, total=total, tool=tool,
+                       success=returncode == 0, returncode=returncode,
+                       duration=round(duration, 2), output_bytes=output_bytes,
+                       cpu_time=cpu_time)
+            
             if self.verbose:
                 status = "✅" if returncode == 0 else "⚠️"
-                print(f"   {status} Completado en {duration:.2f}s (código: {returncode})")
+                print(f"   {status} Completado en {duration:.2f}s (código: {returncode}, "
+                      f"CPU: {cpu_time:.2f}s)")
             
             return returncode == 0
             
         except FileNotFoundError:
+            # La caché de herramientas la daba por disponible: volver a comprobarla
+            toolchain.invalidate(tool)
             if self.verbose:
                 print(f"   ❌ Herramienta '{tool}' no encontrada")
             self.results['commands_failed'].append({
                 'tool': tool,
                 'reason': 'Tool not found'
             })
+            self._emit("command_finished", step=step, total=total, tool=tool,
+                       success=False, reason="Tool not found")
             return False
             
         except Exception as e:
@@ -426,15 +997,26 @@ class VulnerabilityScanner:
                 'tool': tool,
                 'reason': str(e)
             })
+            self._emit("command_finished", step=step, total=total, tool=tool,
+                       success=False, reason=str(e))
             return False
+        
+        finally:
+            scheduler.release(slot)
     
-    def run_scan(self, target: str, profile_name: str, output_dir: str = "./outputs") -> tuple:
+    def run_scan(self, target: str, profile_name: str, output_dir: str = "./outputs",
+                 resume: bool = False) -> tuple:
         """Ejecuta un perfil de escaneo completo
         
+        Cada comando completado se registra en scan_manifest.json dentro del
+        directorio de salida (archivo, sha256, código de salida, duración).
+        
         Args:
             target: IP o dominio objetivo
             profile_name: Nombre del perfil a ejecutar
             output_dir: Directorio donde guardar los archivos (default: ./outputs)
+            resume: Saltar los comandos que el manifiesto da por completados
+                y cuya salida no ha cambiado
         
         Returns:
             tuple: (success: bool, generated_files: list)
@@ -451,6 +1033,13 @@ class VulnerabilityScanner:
         profile = self.PROFILES[profile_name]
         
         # Inicializar resultados
+        self.discovered_ports = None
+        self.result_cache.hits = self.result_cache.misses = 0
+        # Retención de la caché: las entradas de más de RETENTION se eliminan
+        pruned = self.result_cache.prune()
+        if pruned and self.verbose:
+            print(f"[*] Caché de resultados: {pruned} entradas antiguas eliminadas")
+        self._load_manifest(target, profile_name, resume)
         self.results['started_at'] = datetime.now()
         self.results['profile_used'] = profile_name
         self.results['target'] = target
@@ -484,7 +1073,9 @@ class VulnerabilityScanner:
                     print("  sudo apt-get install nikto")
                 elif tool == 'gobuster':
                     print("  sudo apt-get install gobuster")
-            return self.results
+            self._emit("scan_finished", success=False, successful=0, failed=0,
+                       duration=0, missing_tools=missing_required)
+            return False, []
         
         # Advertencia sobre sudo
         if profile.requires_sudo:
@@ -493,6 +1084,8 @@ class VulnerabilityScanner:
         
         # Ejecutar comandos
         print(f"\n🚀 Iniciando escaneo...")
+        self._emit("scan_started", target=target, profile=profile_name,
+                   total=len(profile.commands))
         
         successful = 0
         failed = 0
@@ -500,20 +1093,37 @@ class VulnerabilityScanner:
         for i, command in enumerate(profile.commands, 1):
             tool = command['tool']
             
+            if self.cancelled:
+                break
+            
             # Verificar si la herramienta está disponible
             if not tools_status.get(tool, False):
                 if self.verbose:
                     print(f"\n[{i}/{len(profile.commands)}] ⏭️  Saltando '{tool}' (no disponible)")
+                self._emit("command_skipped", step=i, total=len(profile.commands), tool=tool)
                 failed += 1
                 continue
             
+            # Comandos acotados por el descubrimiento sin nada que analizar
+            if command.get('scope') and self._scope_command(command, target) is None:
+                reason = 'sin puertos abiertos' if command['scope'] == 'ports' else 'sin servicio web'
+                if self.verbose:
+                    print(f"\n[{i}/{len(profile.commands)}] ⏭️  Saltando '{tool}' ({reason})")
+                self._emit("command_skipped", step=i, total=len(profile.commands),
+                           tool=tool, reason=reason)
+                continue
+            
             if self.verbose:
                 print(f"\n[{i}/{len(profile.commands)}] Ejecutando {tool}...")
             
-            success = self.execute_command(command, target)
+            success = self.execute_command(command, target, step=i, total=len(profile.commands))
             
             if success:
                 successful += 1
+            elif self.cancelled:
+                # Interrumpido por cancel(): ni fallido ni error de un comando requerido
+                print(f"\n⛔ Comando cancelado: {tool}")
+                break
             else:
                 failed += 1
                 if command.get('required', False):
@@ -524,13 +1134,22 @@ class VulnerabilityScanner:
         self.results['finished_at'] = datetime.now()
         duration = (self.results['finished_at'] - self.results['started_at']).total_seconds()
         
+        self.results['cancelled'] = self.cancelled
+        
         print("\n" + "=" * 80)
-        print("✅ ESCANEO COMPLETADO")
+        print("⛔ ESCANEO CANCELADO" if self.cancelled else "✅ ESCANEO COMPLETADO")
         print("=" * 80)
         print(f"Duración total: {duration:.2f}s")
         print(f"Comandos exitosos: {successful}")
         print(f"Comandos fallidos: {failed}")
         print(f"Archivos generados: {len(self.results['outputs_generated'])}")
+        self.results['cache'] = self.result_cache.stats()
+        if self.result_cache.enabled:
+            print(f"Caché de resultados: {self.result_cache.hits} aciertos, "
+                  f"{self.result_cache.misses} fallos")
+        resumed = sum(1 for cmd in self.results['commands_executed'] if cmd.get('resumed'))
+        if resumed:
+            print(f"Comandos reanudados (sin repetir): {resumed}")
         print("\nArchivos de salida:")
         for output in self.results['outputs_generated']:
             print(f"  📄 {output}")
@@ -538,7 +1157,13 @@ class VulnerabilityScanner:
         
         # Retornar tupla (success, files)
         # Considerar exitoso si se generó al menos un archivo
-        success = len(self.results['outputs_generated']) > 0 and successful > 0
+        # Un escaneo cancelado nunca es exitoso; su salida parcial queda en
+        # outputs_generated y results['cancelled'] lo indica
+        success = len(self.results['outputs_generated']) > 0 and successful > 0 and not self.cancelled
+        self._emit("scan_finished", success=success, successful=successful,
+                   failed=failed, duration=round(duration, 2),
+                   cache_hits=self.result_cache.hits, resumed=resumed,
+                   cancelled=self.cancelled)
         return success, self.results['outputs_generated']
     
     @staticmethod
@@ -589,6 +1214,12 @@ class VulnerabilityScanner:
             print(f"   Salida: {cmd['output']}")
             print(f"   Timeout: {cmd.get('timeout', 300)}s")
             print(f"   Requerido: {'Sí' if cmd.get('required', False) else 'No'}")
+            if cmd.get('stage') == 'discovery':
+                print(f"   Etapa: descubrimiento (acota los comandos siguientes)")
+            elif cmd.get('scope') == 'ports':
+                print(f"   Acotado a: puertos descubiertos")
+            elif cmd.get('scope') == 'http':
+                print(f"   Acotado a: servicio web descubierto")
             if cmd.get('sudo', False):
                 print(f"   Sudo: Sí")
             print()
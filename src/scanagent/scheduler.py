@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Scheduler Module - Scan Agent
+=============================
+Gobernador de concurrencia compartido por todos los escaneos del proceso.
+
+Cada comando de un escaneo pide un hueco antes de lanzar la herramienta y
+solo arranca cuando caben a la vez todos estos límites:
+- Comandos simultáneos en el proceso (global)
+- Comandos simultáneos contra el mismo objetivo
+- Comandos simultáneos contra la misma subred (/24 en IPv4, /64 en IPv6)
+- Presupuesto por herramienta (p. ej. como mucho 4 nmap a la vez)
+
+Además adapta la temporización de nmap por subred: si un nmap excede su
+timeout o informa de paquetes perdidos ("retransmission cap hit"), los
+siguientes nmap contra esa subred bajan un escalón (-T y --max-rate); tras
+varias ejecuciones limpias se recupera un escalón. La adaptación solo
+reduce la agresividad: nunca sube el -T que fija el perfil.
+
+Los límites se pueden ajustar con variables de entorno:
+    SCAN_AGENT_MAX_COMMANDS, SCAN_AGENT_MAX_PER_TARGET, SCAN_AGENT_MAX_PER_SUBNET
+
+Autor: Scan Agent Team
+Versión: 1.0.0
+"""
+
+import ipaddress
+import os
+import re
+import threading
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+# (clave, límite) que ocupa un comando mientras se ejecuta
+SlotKeys = List[Tuple[Tuple[str, str], int]]
+
+# Escalones de temporización de nmap: (-T, --max-rate); el 0 no modifica nada
+NMAP_TIMING_STEPS = [(None, None), (3, None), (3, 500), (2, 200), (2, 100)]
+
+T_PATTERN = re.compile(r'(?<!\S)-T([0-5])(?!\S)')
+MAX_RATE_PATTERN = re.compile(r'--max-rate[= ](\d+)')
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def subnet_of(target: str) -> str:
+    """Subred de un objetivo (/24 IPv4, /64 IPv6); un hostname es su propia clave"""
+    try:
+        address = ipaddress.ip_address(target)
+    except ValueError:
+        return target.lower()
+    prefix = 24 if address.version == 4 else 64
+    return str(ipaddress.ip_network(f"{address}/{prefix}", strict=False))
+
+
+class ScanScheduler:
+    """Límites de concurrencia y temporización adaptativa de nmap"""
+
+    MAX_COMMANDS = 8
+    MAX_PER_TARGET = 2
+    MAX_PER_SUBNET = 4
+
+    # Comandos simultáneos por herramienta (las no listadas solo tienen
+    # los límites globales)
+    TOOL_LIMITS = {
+        'nmap': 4,
+        'nikto': 2,
+        'gobuster': 2
+    }
+
+    # Ejecuciones limpias seguidas para recuperar un escalón de nmap
+    RECOVERY_RUNS = 3
+
+    def __init__(self, max_commands: Optional[int] = None, max_per_target: Optional[int] = None,
+                 max_per_subnet: Optional[int] = None, tool_limits: Optional[Dict[str, int]] = None):
+        self.max_commands = max_commands or _env_int("SCAN_AGENT_MAX_COMMANDS", self.MAX_COMMANDS)
+        self.max_per_target = max_per_target or _env_int("SCAN_AGENT_MAX_PER_TARGET", self.MAX_PER_TARGET)
+        self.max_per_subnet = max_per_subnet or _env_int("SCAN_AGENT_MAX_PER_SUBNET", self.MAX_PER_SUBNET)
+        self.tool_limits = dict(self.TOOL_LIMITS if tool_limits is None else tool_limits)
+
+        self._cond = threading.Condition()
+        self._running: Counter = Counter()
+        self._waiting = 0
+
+        # Estado de temporización por subred: [escalón, ejecuciones limpias]
+        self._timing: Dict[str, List[int]] = {}
+
+    # =========================================
+    # CONCURRENCIA
+    # =========================================
+
+    def _keys(self, tool: str, target: str) -> SlotKeys:
+        keys = [
+            (("global", "*"), self.max_commands),
+            (("target", target), self.max_per_target),
+            (("subnet", subnet_of(target)), self.max_per_subnet)
+        ]
+        if tool in self.tool_limits:
+            keys.append((("tool", tool), self.tool_limits[tool]))
+        return keys
+
+    def _fits(self, keys: SlotKeys) -> bool:
+        return all(self._running[key] < limit for key, limit in keys)
+
+    def acquire(self, tool: str, target: str,
+                on_wait: Optional[Callable[[], None]] = None,
+                cancel: Optional[threading.Event] = None) -> Optional[SlotKeys]:
+        """
+        Reserva un hueco para ejecutar `tool` contra `target`.
+
+        Bloquea hasta que caben todos los límites a la vez (se reservan
+        todos o ninguno, así dos escaneos no se bloquean mutuamente).
+
+        Args:
+            on_wait: Se llama una vez, fuera del lock, si hay que esperar
+            cancel: Evento que interrumpe la espera (ver wake())
+
+        Returns:
+            Reserva que se debe devolver con release(), o None si se
+            canceló la espera
+        """
+        keys = self._keys(tool, target)
+        with self._cond:
+            if self._fits(keys):
+                self._take(keys)
+                return keys
+            self._waiting += 1
+
+        if on_wait is not None:
+            on_wait()
+
+        with self._cond:
+            try:
+                while not self._fits(keys):
+                    if cancel is not None and cancel.is_set():
+                        return None
+                    self._cond.wait()
+                self._take(keys)
+            finally:
+                self._waiting -= 1
+        return keys
+
+    def _take(self, keys: SlotKeys) -> None:
+        for key, _ in keys:
+            self._running[key] += 1
+
+    def release(self, keys: Optional[SlotKeys]) -> None:
+        """Devuelve una reserva de acquire()"""
+        if not keys:
+            return
+        with self._cond:
+            for key, _ in keys:
+                self._running[key] -= 1
+                if self._running[key] <= 0:
+                    del self._running[key]
+            self._cond.notify_all()
+
+    def wake(self) -> None:
+        """Despierta las esperas de acquire() para que comprueben su cancelación"""
+        with self._cond:
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, object]:
+        """Comandos en ejecución y en espera"""
+        with self._cond:
+            return {
+                "running": self._running.get(("global", "*"), 0),
+                "waiting": self._waiting,
+                "by_tool": {key[1]: count for key, count in self._running.items() if key[0] == "tool"},
+                "limits": {
+                    "global": self.max_commands,
+                    "per_target": self.max_per_target,
+                    "per_subnet": self.max_per_subnet,
+                    "tools": dict(self.tool_limits)
+                }
+            }
+
+    # =========================================
+    # TEMPORIZACIÓN ADAPTATIVA DE NMAP
+    # =========================================
+
+    def adapt_nmap_args(self, target: str, args: str) -> str:
+        """Aplica a los argumentos de nmap el escalón actual de la subred"""
+        with self._cond:
+            step = self._timing.get(subnet_of(target), [0, 0])[0]
+        timing, max_rate = NMAP_TIMING_STEPS[step]
+
+        if timing is not None:
+            match = T_PATTERN.search(args)
+            if match is None:
+                args = f"-T{timing} {args}"
+            elif int(match.group(1)) > timing:
+                args = T_PATTERN.sub(f"-T{timing}", args, count=1)
+
+        if max_rate is not None:
+            match = MAX_RATE_PATTERN.search(args)
+            if match is None:
+                args = f"--max-rate {max_rate} {args}"
+            elif int(match.group(1)) > max_rate:
+                args = MAX_RATE_PATTERN.sub(f"--max-rate {max_rate}", args, count=1)
+
+        return args
+
+    def report(self, tool: str, target: str, degraded: bool) -> Optional[int]:
+        """
+        Registra el resultado de un comando para adaptar la temporización.
+
+        Args:
+            degraded: El comando excedió su timeout o perdió paquetes
+
+        Returns:
+            Nuevo escalón si cambió, None si sigue igual
+        """
+        if tool != 'nmap':
+            return None
+
+        with self._cond:
+            state = self._timing.setdefault(subnet_of(target), [0, 0])
+            if degraded:
+                state[1] = 0
+                if state[0] < len(NMAP_TIMING_STEPS) - 1:
+                    state[0] += 1
+                    return state[0]
+                return None
+
+            state[1] += 1
+            if state[0] > 0 and state[1] >= self.RECOVERY_RUNS:
+                state[0] -= 1
+                state[1] = 0
+                return state[0]
+            return None
+
+
+# Instancia compartida por el proceso
+scheduler = ScanScheduler()
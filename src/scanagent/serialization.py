@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Serialization Module - Scan Agent
+==================================
+Serialización JSON intercambiable para todo el pipeline.
+
+Usa orjson o msgspec si están instalados y la biblioteca estándar como
+respaldo. Los registros de scanagent.records se serializan sin convertirlos
+antes a dict. Los artefactos internos (datos parseados, análisis intermedio,
+base de datos) se escriben compactos; la indentación queda reservada para
+los informes que lee una persona.
+
+El backend se puede forzar con la variable de entorno SCAN_AGENT_JSON
+(orjson, msgspec o stdlib) o con set_backend().
+
+Autor: Scan Agent Team
+Versión: 1.0.0
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Union
+
+from scanagent.records import to_builtin
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # msgspec es opcional
+    msgspec = None
+
+
+def _stdlib_dumps(obj: Any, pretty: bool) -> bytes:
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False, default=to_builtin).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False,
+                      default=to_builtin).encode('utf-8')
+
+
+def _stdlib_loads(data: Union[bytes, str]) -> Any:
+    return json.loads(data)
+
+
+def _orjson_dumps(obj: Any, pretty: bool) -> bytes:
+    option = orjson.OPT_NON_STR_KEYS
+    if pretty:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(obj, default=to_builtin, option=option)
+
+
+def _msgspec_dumps(obj: Any, pretty: bool) -> bytes:
+    data = _msgspec_encoder.encode(obj)
+    if pretty:
+        return msgspec.json.format(data, indent=2)
+    return data
+
+
+_msgspec_encoder = msgspec.json.Encoder(enc_hook=to_builtin) if msgspec is not None else None
+
+# Backends disponibles por orden de preferencia: (dumps, loads)
+BACKENDS: Dict[str, tuple] = {}
+if orjson is not None:
+    BACKENDS['orjson'] = (_orjson_dumps, orjson.loads)
+if msgspec is not None:
+    BACKENDS['msgspec'] = (_msgspec_dumps, msgspec.json.decode)
+BACKENDS['stdlib'] = (_stdlib_dumps, _stdlib_loads)
+
+BACKEND = ''
+_dumps: Callable[[Any, bool], bytes] = _stdlib_dumps
+_loads: Callable[[Union[bytes, str]], Any] = _stdlib_loads
+
+
+def set_backend(name: str) -> str:
+    """
+    Selecciona el backend de serialización.
+
+    Args:
+        name: orjson, msgspec o stdlib
+
+    Returns:
+        Nombre del backend activo
+    """
+    global BACKEND, _dumps, _loads
+
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Backend JSON no disponible: {name}. Opciones: {', '.join(BACKENDS)}"
+        )
+
+    BACKEND = name
+    _dumps, _loads = BACKENDS[name]
+    return BACKEND
+
+
+def dumps(obj: Any, pretty: bool = False) -> bytes:
+    """
+    Serializa un objeto a JSON en UTF-8.
+
+    Args:
+        obj: Objeto a serializar
+        pretty: Indentar con 2 espacios (solo para informes legibles)
+    """
+    return _dumps(obj, pretty)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Deserializa JSON desde bytes o str"""
+    return _loads(data)
+
+
+def dump(obj: Any, path: Union[str, Path], pretty: bool = False) -> Path:
+    """
+    Escribe un objeto como JSON en un archivo.
+
+    Returns:
+        Ruta del archivo escrito
+    """
+    path = Path(path)
+    path.write_bytes(_dumps(obj, pretty))
+    return path
+
+
+def load(path: Union[str, Path]) -> Any:
+    """Lee un archivo JSON"""
+    return _loads(Path(path).read_bytes())
+
+
+_requested = os.environ.get('SCAN_AGENT_JSON')
+if _requested and _requested not in BACKENDS:
+    print(f"[WARN] SCAN_AGENT_JSON={_requested} no disponible, usando {next(iter(BACKENDS))}")
+    _requested = None
+set_backend(_requested or next(iter(BACKENDS)))
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Toolchain Module - Scan Agent
+=============================
+Caché de proceso con la ruta y versión de las herramientas externas
+(nmap, nikto, gobuster, curl...).
+
+La ruta se resuelve con shutil.which (sin lanzar procesos) y la versión
+solo se obtiene la primera vez que se pide. Cada entrada se vuelve a
+comprobar cuando supera REFRESH_INTERVAL o cuando el escáner informa de
+que la herramienta falló al ejecutarse (invalidate).
+
+Todas las instancias de VulnerabilityScanner y la API web comparten la
+instancia `toolchain` de este módulo.
+
+Autor: Scan Agent Team
+Versión: 1.0.0
+"""
+
+import shutil
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+from scanagent.records import Record
+
+
+@dataclass(slots=True)
+class ToolInfo(Record):
+    """Estado de una herramienta en el sistema"""
+    name: str
+    path: Optional[str]
+    checked_at: float
+    version: Optional[str] = None
+
+    @property
+    def available(self) -> bool:
+        return self.path is not None
+
+
+class Toolchain:
+    """Registro de herramientas disponibles compartido por el proceso"""
+
+    # Segundos antes de volver a comprobar una herramienta
+    REFRESH_INTERVAL = 300
+
+    # Argumentos para obtener la versión de herramientas sin --version
+    VERSION_ARGS = {
+        'nikto': ['-Version'],
+        'gobuster': ['version']
+    }
+
+    def __init__(self, refresh_interval: int = REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self._tools: Dict[str, ToolInfo] = {}
+        self._lock = threading.Lock()
+
+    def get(self, tool: str) -> ToolInfo:
+        """Información de una herramienta (resuelta de nuevo si caducó)"""
+        with self._lock:
+            info = self._tools.get(tool)
+            if info is None or time.time() - info.checked_at > self.refresh_interval:
+                info = ToolInfo(name=tool, path=shutil.which(tool), checked_at=time.time())
+                self._tools[tool] = info
+            return info
+
+    def available(self, tool: str) -> bool:
+        return self.get(tool).available
+
+    def version(self, tool: str) -> str:
+        """
+        Primera línea de la versión de una herramienta.
+
+        Se obtiene ejecutando la herramienta una sola vez por entrada; si
+        no está disponible se devuelve una cadena vacía.
+        """
+        info = self.get(tool)
+        if info.version is not None:
+            return info.version
+        if not info.available:
+            return ''
+
+        args = self.VERSION_ARGS.get(tool, ['--version'])
+        try:
+            result = subprocess.run([info.path] + args, stdout=subprocess.PIPE,
+                                    stderr=subprocess.STDOUT, text=True,
+                                    errors='replace', timeout=5)
+            lines = result.stdout.strip().splitlines()
+            version = lines[0].strip() if lines else ''
+        except (OSError, subprocess.SubprocessError):
+            version = ''
+
+        info.version = version
+        return version
+
+    def invalidate(self, tool: Optional[str] = None) -> None:
+        """Olvida una herramienta (o todas) para comprobarla de nuevo"""
+        with self._lock:
+            if tool is None:
+                self._tools.clear()
+            else:
+                self._tools.pop(tool, None)
+
+    def refresh(self, tools: Iterable[str], with_version: bool = False) -> Dict[str, ToolInfo]:
+        """
+        Vuelve a comprobar un conjunto de herramientas.
+
+        Args:
+            tools: Nombres de las herramientas
+            with_version: Obtener también la versión de las disponibles
+        """
+        result = {}
+        for tool in tools:
+            self.invalidate(tool)
+            if with_version:
+                self.version(tool)
+            result[tool] = self.get(tool)
+        return result
+
+    def snapshot(self, tools: Iterable[str], with_version: bool = False) -> Dict[str, ToolInfo]:
+        """Estado actual de un conjunto de herramientas (desde la caché)"""
+        result = {}
+        for tool in tools:
+            if with_version:
+                self.version(tool)
+            result[tool] = self.get(tool)
+        return result
+
+
+# Instancia compartida por el proceso
+toolchain = Toolchain()
@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+VulnDB Module - Scan Agent
+==========================
+Coincidencia de versiones de software con CVEs conocidos, a partir de un
+conjunto de datos local y sin conexión.
+
+Fuente: config/vulnerable_versions.json (CPE -> rangos de versiones -> CVEs,
+con los campos de rango de NVD), ampliable con las fuentes JSON de NVD
+(nvdcve-1.1-*.json o nvdcve-2.0-*.json, también .gz):
+
+    python -m scanagent.vulndb build --nvd nvdcve-2.0-2024.json.gz ...
+
+La fuente se compila en SQLite (data/cache/vulndb.sqlite, o la ruta de
+SCAN_AGENT_VULNDB) como un árbol de segmentos por producto: los extremos
+de los rangos dividen las versiones en intervalos elementales y cada rango
+se guarda en los O(log n) nodos que lo cubren. Una consulta localiza el
+intervalo de la versión y lee los nodos de su camino a la raíz: dos
+búsquedas en índices, O(log n) aunque el conjunto tenga cientos de miles
+de CVEs, con O(n log n) de espacio. La base se compila sola si no existe o
+si cambió la fuente (salvo que incluya fuentes de NVD: esa solo se
+recompila con `build`).
+
+Las versiones se comparan por una clave ordenable con los componentes
+numéricos rellenos con ceros: 2.4.9 < 2.4.49 y 7.1 < 7.1p1 < 7.1p2 < 7.2.
+
+Uso:
+    python -m scanagent.vulndb build [--nvd FEED ...] [--db RUTA]
+    python -m scanagent.vulndb match "Apache httpd 2.4.49 ((Ubuntu))"
+
+Autor: Scan Agent Team
+Versión: 1.0.0
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+BASE_DIR = Path(__file__).parent.parent.parent
+SOURCE_FILE = BASE_DIR / "config" / "vulnerable_versions.json"
+DB_FILE = BASE_DIR / "data" / "cache" / "vulndb.sqlite"
+
+# Las claves de versión solo contienen [0-9a-z.]: "!" ordena justo después
+# de una clave (antes que cualquier versión posterior) y "~" después de todas
+JUST_AFTER = "!"
+MAX_KEY = "~"
+
+RANGE_FIELDS = ("versionStartIncluding", "versionStartExcluding",
+                "versionEndIncluding", "versionEndExcluding")
+
+VERSION_TOKEN = re.compile(r'\d+|[a-z]+')
+
+SCHEMA = """
+    CREATE TABLE products (
+        cpe TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        leaves INTEGER NOT NULL,
+        tree_size INTEGER NOT NULL
+    ) WITHOUT ROWID;
+    CREATE TABLE aliases (
+        alias TEXT NOT NULL,
+        cpe TEXT NOT NULL,
+        PRIMARY KEY (alias, cpe)
+    ) WITHOUT ROWID;
+    CREATE TABLE points (
+        cpe TEXT NOT NULL,
+        version_key TEXT NOT NULL,
+        leaf INTEGER NOT NULL,
+        PRIMARY KEY (cpe, version_key)
+    ) WITHOUT ROWID;
+    CREATE TABLE nodes (
+        cpe TEXT NOT NULL,
+        node INTEGER NOT NULL,
+        cves TEXT NOT NULL,
+        PRIMARY KEY (cpe, node)
+    ) WITHOUT ROWID;
+    CREATE TABLE metadata (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    ) WITHOUT ROWID;
+"""
+
+
+def version_key(version: str) -> str:
+    """Clave ordenable de una versión ("2.4.49" -> "0000000002.0000000004.0000000049")"""
+    return ".".join(token.zfill(10) if token.isdigit() else token
+                    for token in VERSION_TOKEN.findall(version.lower()))
+
+
+def version_bounds(version_range: Dict[str, str]) -> Optional[Tuple[str, str]]:
+    """
+    Convierte un rango con los campos de NVD en el intervalo [inicio, fin)
+    de claves de versión.
+
+    Returns:
+        (inicio, fin) o None si el rango está vacío
+    """
+    if version_range.get("version"):
+        key = version_key(version_range["version"])
+        return key, key + JUST_AFTER
+
+    if "versionStartIncluding" in version_range:
+        start = version_key(version_range["versionStartIncluding"])
+    elif "versionStartExcluding" in version_range:
+        start = version_key(version_range["versionStartExcluding"]) + JUST_AFTER
+    else:
+        start = ""
+
+    if "versionEndExcluding" in version_range:
+        end = version_key(version_range["versionEndExcluding"])
+    elif "versionEndIncluding" in version_range:
+        end = version_key(version_range["versionEndIncluding"]) + JUST_AFTER
+    else:
+        end = MAX_KEY
+
+    return (start, end) if start < end else None
+
+
+def segment_tree(ranges: Sequence[Tuple[str, str, str]]) -> Tuple[List[str], int, Dict[int, List[str]]]:
+    """
+    Árbol de segmentos de los rangos (inicio, fin, cve) de un producto.
+
+    Los extremos ordenados definen las hojas (intervalo elemental i =
+    [extremos[i], extremos[i + 1])) de un árbol binario completo numerado
+    como un heap (raíz 1, hojas desde tree_size). Cada rango se asigna a los
+    nodos que cubren exactamente sus hojas, como mucho dos por nivel.
+
+    Returns:
+        (extremos ordenados, tree_size, {nodo: cves})
+    """
+    points = sorted({point for start, end, _ in ranges for point in (start, end)})
+    leaf = {point: index for index, point in enumerate(points)}
+    tree_size = 1
+    while tree_size < len(points) - 1:
+        tree_size *= 2
+
+    nodes: Dict[int, set] = defaultdict(set)
+    for start, end, cve in ranges:
+        left, right = leaf[start] + tree_size, leaf[end] + tree_size
+        while left < right:
+            if left & 1:
+                nodes[left].add(cve)
+                left += 1
+            if right & 1:
+                right -= 1
+                nodes[right].add(cve)
+            left >>= 1
+            right >>= 1
+
+    return points, tree_size, {node: sorted(cves) for node, cves in nodes.items()}
+
+
+def _nvd_matches(feed: Path) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """(cve, criterio CPE) vulnerables de una fuente JSON de NVD 1.1 o 2.0"""
+    opener = gzip.open if feed.suffix == ".gz" else open
+    with opener(feed, "rt", encoding="utf-8") as f:
+        data = json.load(f)
+
+    # Formato 1.1: CVE_Items[].configurations.nodes[].cpe_match[].cpe23Uri
+    for item in data.get("CVE_Items", []):
+        cve = item["cve"]["CVE_data_meta"]["ID"]
+        nodes = list(item.get("configurations", {}).get("nodes", []))
+        while nodes:
+            node = nodes.pop()
+            nodes.extend(node.get("children", []))
+            for match in node.get("cpe_match", []):
+                yield cve, {**match, "criteria": match.get("cpe23Uri", "")}
+
+    # Formato 2.0: vulnerabilities[].cve.configurations[].nodes[].cpeMatch[].criteria
+    for item in data.get("vulnerabilities", []):
+        cve = item["cve"]["id"]
+        for configuration in item["cve"].get("configurations", []):
+            for node in configuration.get("nodes", []):
+                for match in node.get("cpeMatch", []):
+                    yield cve, match
+
+
+def nvd_ranges(feed: Path) -> Iterator[Tuple[str, str, str, str]]:
+    """(cpe, inicio, fin, cve) de los CPEs vulnerables de una fuente de NVD"""
+    for cve, match in _nvd_matches(feed):
+        parts = match.get("criteria", "").split(":")
+        if not match.get("vulnerable") or len(parts) < 6 or parts[5] == "-":
+            continue
+
+        version_range = {field: match[field] for field in RANGE_FIELDS if field in match}
+        if parts[5] != "*":
+            version_range["version"] = parts[5]
+
+        bounds = version_bounds(version_range)
+        if bounds:
+            yield ":".join(parts[:5]), bounds[0], bounds[1], cve
+
+
+def build(conn: sqlite3.Connection, source: Path, nvd_feeds: Sequence[Path] = ()) -> Dict[str, int]:
+    """
+    Compila la fuente (y las fuentes de NVD) en una conexión vacía.
+
+    Returns:
+        Estadísticas: productos, cves y nodos
+    """
+    with open(source, 'r', encoding='utf-8') as f:
+        dataset = json.load(f)
+
+    names: Dict[str, str] = {}
+    aliases = set()
+    ranges: Dict[str, List[Tuple[str, str, str]]] = defaultdict(list)
+    for product in dataset.get("products", []):
+        cpe = product["cpe"]
+        names[cpe] = product.get("name", cpe.split(":")[-1])
+        aliases.update((" ".join(alias.lower().split()), cpe) for alias in product.get("aliases", []))
+        for version_range in product.get("ranges", []):
+            bounds = version_bounds(version_range)
+            if bounds:
+                ranges[cpe].extend((bounds[0], bounds[1], cve) for cve in version_range["cves"])
+
+    for feed in nvd_feeds:
+        for cpe, start, end, cve in nvd_ranges(Path(feed)):
+            names.setdefault(cpe, cpe.split(":")[-1])
+            ranges[cpe].append((start, end, cve))
+
+    conn.executescript(SCHEMA)
+    conn.executemany("INSERT INTO aliases (alias, cpe) VALUES (?, ?)", sorted(aliases))
+
+    stats = {"products": len(names), "cves": 0, "nodes": 0}
+    all_cves = set()
+    for cpe, name in names.items():
+        points, tree_size, nodes = segment_tree(ranges.get(cpe, ()))
+        conn.execute("INSERT INTO products (cpe, name, leaves, tree_size) VALUES (?, ?, ?, ?)",
+                     (cpe, name, max(len(points) - 1, 0), tree_size))
+        conn.executemany("INSERT INTO points (cpe, version_key, leaf) VALUES (?, ?, ?)",
+                         ((cpe, point, index) for index, point in enumerate(points)))
+        conn.executemany("INSERT INTO nodes (cpe, node, cves) VALUES (?, ?, ?)",
+                         ((cpe, node, ",".join(cves)) for node, cves in nodes.items()))
+        stats["nodes"] += len(nodes)
+        all_cves.update(cve for _, _, cve in ranges.get(cpe, ()))
+    stats["cves"] = len(all_cves)
+
+    conn.executemany("INSERT INTO metadata (key, value) VALUES (?, ?)", [
+        ("source_mtime", str(os.path.getmtime(source))),
+        ("nvd_feeds", str(len(nvd_feeds))),
+        *((key, str(value)) for key, value in stats.items()),
+    ])
+    conn.commit()
+    return stats
+
+
+def build_file(db_path: Path, source: Path = SOURCE_FILE, nvd_feeds: Sequence[Path] = ()) -> Dict[str, int]:
+    """Compila la base en db_path (se escribe aparte y se reemplaza al terminar)"""
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = db_path.with_name(f"{db_path.name}.{os.getpid()}.tmp")
+    tmp_path.unlink(missing_ok=True)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        stats = build(conn, source, nvd_feeds)
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+    return stats
+
+
+class VulnerabilityDatabase:
+    """Consultas de versiones vulnerables sobre la base compilada"""
+
+    def __init__(self, db_path: Optional[str] = None, source: Optional[str] = None):
+        """
+        Args:
+            db_path: Base compilada (default: SCAN_AGENT_VULNDB o data/cache/vulndb.sqlite)
+            source: Fuente JSON (default: config/vulnerable_versions.json)
+        """
+        self.db_path = Path(db_path or os.environ.get("SCAN_AGENT_VULNDB") or DB_FILE)
+        self.source = Path(source) if source else SOURCE_FILE
+        self._conn: Optional[sqlite3.Connection] = None
+        self._names: Dict[str, str] = {}
+        self._trees: Dict[str, Tuple[int, int]] = {}
+        self._aliases: Dict[str, List[str]] = defaultdict(list)
+        self._pattern: Optional[re.Pattern] = None
+        self._lock = threading.Lock()
+
+    def _is_stale(self) -> bool:
+        """La base no existe o se compiló desde otra versión de la fuente"""
+        if not self.db_path.exists():
+            return True
+        try:
+            conn = sqlite3.connect(f"{self.db_path.resolve().as_uri()}?mode=ro", uri=True)
+            try:
+                metadata = dict(conn.execute("SELECT key, value FROM metadata"))
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return True
+        if metadata.get("nvd_feeds", "0") != "0":
+            return False
+        return metadata.get("source_mtime") != str(os.path.getmtime(self.source))
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre la base (compilándola si hace falta) en la primera consulta"""
+        if self._conn is not None:
+            return self._conn
+
+        try:
+            if self._is_stale():
+                print(f"[*] Compilando base de vulnerabilidades: {self.db_path}")
+                build_file(self.db_path, self.source)
+            conn = sqlite3.connect(f"{self.db_path.resolve().as_uri()}?mode=ro", uri=True,
+                                   check_same_thread=False)
+        except (OSError, sqlite3.Error) as e:
+            # Sin escritura en data/cache: la base se compila en memoria
+            print(f"[WARN] Base de vulnerabilidades en memoria ({self.db_path}: {e})")
+            conn = sqlite3.connect(":memory:", check_same_thread=False)
+            build(conn, self.source)
+
+        for cpe, name, leaves, tree_size in conn.execute(
+                "SELECT cpe, name, leaves, tree_size FROM products"):
+            self._names[cpe] = name
+            self._trees[cpe] = (leaves, tree_size)
+        for alias, cpe in conn.execute("SELECT alias, cpe FROM aliases"):
+            self._aliases[alias].append(cpe)
+
+        # Alias seguido de su versión: "Apache httpd 2.4.49", "nginx/1.18.0",
+        # "OpenSSH_7.4p1". Los alias más largos se prueban primero
+        aliases = sorted(self._aliases, key=len, reverse=True)
+        self._pattern = re.compile(
+            r'(?<![\w-])(%s)[\s/_]+v?(\d+(?:\.\d+)*(?:[a-z]+\d*)?)'
+            % "|".join(r'\s+'.join(map(re.escape, alias.split())) for alias in aliases),
+            re.IGNORECASE
+        ) if aliases else None
+
+        self._conn = conn
+        return conn
+
+    def _lookup(self, conn: sqlite3.Connection, cpe: str, key: str) -> List[str]:
+        """CVEs del producto en la clave de versión (dos búsquedas en índices)"""
+        leaves, tree_size = self._trees.get(cpe, (0, 0))
+        if not leaves:
+            return []
+
+        # Hoja de la versión: el mayor extremo <= clave (búsqueda en la clave primaria)
+        row = conn.execute(
+            "SELECT leaf FROM points WHERE cpe = ? AND version_key <= ? "
+            "ORDER BY version_key DESC LIMIT 1",
+            (cpe, key)
+        ).fetchone()
+        if row is None or row[0] >= leaves:
+            return []
+
+        # CVEs de los nodos del camino de la hoja a la raíz
+        node = row[0] + tree_size
+        path = []
+        while node:
+            path.append(node)
+            node >>= 1
+        rows = conn.execute(
+            f"SELECT cves FROM nodes WHERE cpe = ? AND node IN ({','.join('?' * len(path))})",
+            (cpe, *path)
+        )
+        return sorted({cve for (cves,) in rows for cve in cves.split(",")})
+
+    def lookup(self, cpe: str, version: str) -> List[str]:
+        """
+        CVEs que afectan a una versión de un producto.
+
+        Args:
+            cpe: Producto ("cpe:2.3:a:apache:http_server")
+            version: Versión ("2.4.49")
+        """
+        with self._lock:
+            return self._lookup(self._connect(), cpe, version_key(version))
+
+    def match(self, banner: str) -> List[Dict[str, Any]]:
+        """
+        Busca productos conocidos con su versión en un banner de servicio o
+        cabecera ("Apache httpd 2.4.49 ((Ubuntu))", "nginx/1.18.0") y los
+        CVEs que los afectan.
+
+        Returns:
+            Lista de {"producto", "cpe", "version", "cves"} con CVEs
+        """
+        if not banner:
+            return []
+
+        results = []
+        with self._lock:
+            conn = self._connect()
+            if self._pattern is None:
+                return []
+
+            seen = set()
+            for match in self._pattern.finditer(banner):
+                alias = " ".join(match.group(1).lower().split())
+                version = match.group(2)
+                for cpe in self._aliases[alias]:
+                    if (cpe, version) in seen:
+                        continue
+                    seen.add((cpe, version))
+
+                    cves = self._lookup(conn, cpe, version_key(version))
+                    if cves:
+                        results.append({
+                            "producto": self._names.get(cpe, cpe),
+                            "cpe": cpe,
+                            "version": version,
+                            "cves": cves
+                        })
+        return results
+
+
+# Instancia compartida (la base se abre en la primera consulta)
+vulnerability_db = VulnerabilityDatabase()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Base local de versiones vulnerables")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Compilar la base desde la fuente")
+    build_parser.add_argument("--db", default=str(vulnerability_db.db_path), help="Base a escribir")
+    build_parser.add_argument("--source", default=str(SOURCE_FILE), help="Fuente JSON curada")
+    build_parser.add_argument("--nvd", nargs="*", default=[], help="Fuentes JSON de NVD (1.1 o 2.0, .gz)")
+
+    match_parser = subparsers.add_parser("match", help="CVEs de un banner de servicio")
+    match_parser.add_argument("banner", help='Por ejemplo "Apache httpd 2.4.49"')
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        stats = build_file(Path(args.db), Path(args.source), [Path(feed) for feed in args.nvd])
+        print(f"[OK] Base de vulnerabilidades: {args.db} - {stats['products']} productos, "
+              f"{stats['cves']} CVEs, {stats['nodes']} nodos")
+        return 0
+
+    matches = vulnerability_db.match(args.banner)
+    for match in matches:
+        print(f"{match['producto']} {match['version']} ({match['cpe']}): {', '.join(match['cves'])}")
+    if not matches:
+        print("Sin CVEs conocidos")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+"""
+Configuración común de pytest: los tests importan scanagent (src/) y webapp
+desde la raíz del repositorio, igual que webapp/api/scans.py, y las
+herramientas simuladas de benchmarks/fake_tools.py.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+for path in (ROOT, ROOT / "src", ROOT / "benchmarks"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+@pytest.fixture
+def fake_tools(tmp_path, monkeypatch):
+    """nmap, nikto, gobuster y curl simulados al principio del PATH"""
+    import fake_tools
+    from scanagent.toolchain import toolchain
+
+    bin_dir = tmp_path / "bin"
+    fake_tools.install(str(bin_dir))
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}")
+    monkeypatch.setenv("FAKE_TOOL_LATENCY", "0")
+    toolchain.invalidate()
+    yield bin_dir
+    toolchain.invalidate()
@@ -0,0 +1,71 @@
+"""
+Tests del clasificador por palabras clave.
+"""
+
+import pytest
+
+from scanagent.classifier import KeywordClassifier, load_rules
+
+RULES = load_rules()
+
+TEXTS = [
+    "",
+    "Server leaks inodes via ETags",
+    "Possible SQL Injection in login form",
+    "Reflected XSS: injection of script via parameter",
+    "Information disclosure: server version banner",
+    "Directory indexing found, admin panel accessible",
+    "Outdated Apache version is vulnerable to remote code execution",
+    "Missing security header X-Frame-Options (misconfiguration)",
+    "CRITICAL: password sent in clear text",
+    "authentication bypass warning, exploit available",
+    "nothing interesting here",
+    "configurationserverheader",
+]
+
+
+def reference(ruleset, text):
+    """Cadena de `any(word in desc for word in [...])` que sustituye el clasificador"""
+    text = text.lower()
+    for rule in ruleset["rules"]:
+        if any(word.lower() in text for word in rule["keywords"]):
+            return rule["label"]
+    return ruleset["default"]
+
+
+@pytest.mark.parametrize("name", sorted(RULES))
+@pytest.mark.parametrize("text", TEXTS)
+def test_matches_keyword_chain(name, text):
+    classifier = KeywordClassifier.from_rules(name)
+    assert classifier.classify(text) == (reference(RULES[name], text),)
+
+
+def test_several_rulesets_in_one_pass():
+    names = ("severidad", "owasp")
+    classifier = KeywordClassifier.from_rules(*names)
+
+    for text in TEXTS:
+        assert classifier.classify(text) == tuple(reference(RULES[name], text) for name in names)
+
+
+def test_first_rule_wins_regardless_of_position():
+    rules = {"r": {"default": "none", "rules": [
+        {"label": "first", "keywords": ["injection"]},
+        {"label": "second", "keywords": ["in", "sql"]},
+    ]}}
+    classifier = KeywordClassifier(rules)
+
+    # "sql" e "in" aparecen antes en el texto, pero la primera regla manda
+    assert classifier.classify("SQL in a form, injection") == ("first",)
+    assert classifier.classify("sql only") == ("second",)
+    # Palabra de la segunda regla que es prefijo de la de la primera
+    assert classifier.classify("inject") == ("second",)
+    assert classifier.classify("nada") == ("none",)
+
+
+def test_cache_does_not_change_results():
+    classifier = KeywordClassifier.from_rules("nikto_severity")
+    uncached = KeywordClassifier({"nikto_severity": RULES["nikto_severity"]}, cache_size=0)
+
+    for text in TEXTS * 2:
+        assert classifier.classify(text) == uncached.classify(text)
@@ -0,0 +1,85 @@
+"""
+Tests de DatabaseManager usado desde varios hilos (threadpool del servicio
+web e hilos de lectura del escáner).
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from scanagent.database import DatabaseManager
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(db_path=str(tmp_path / "scan_agent.db"))
+    yield manager
+    manager.close()
+
+
+FINDINGS = [
+    {"herramienta": "nmap", "tipo": "puerto", "severidad": "INFO", "puerto": 22},
+    {"herramienta": "nikto", "tipo": "web", "severidad": "HIGH", "descripcion": "XSS"},
+]
+
+
+def run_in_other_thread(func, *args):
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(func, *args).result()
+
+
+def test_partial_findings_round_trip(db):
+    db.save_partial_findings("scan-1", "10.0.0.5", FINDINGS)
+    db.save_partial_findings("scan-2", "10.0.0.6", FINDINGS[:1])
+
+    assert db.get_partial_findings("scan-1") == FINDINGS
+    assert db.get_partial_findings("scan-2") == FINDINGS[:1]
+    assert db.get_partial_findings("missing") == []
+
+
+def test_partial_findings_from_worker_threads(db):
+    # GET /api/scans/{id}/findings lee desde el threadpool, no desde el hilo
+    # que creó el DatabaseManager
+    run_in_other_thread(db.save_partial_findings, "scan-1", "10.0.0.5", FINDINGS)
+
+    assert run_in_other_thread(db.get_partial_findings, "scan-1") == FINDINGS
+
+
+def test_manager_shared_between_threads(tmp_path):
+    # El agente puede crear el DatabaseManager en un hilo de lectura del
+    # escáner y guardar el escaneo desde otro hilo del threadpool
+    db = run_in_other_thread(DatabaseManager, str(tmp_path / "scan_agent.db"))
+    analysis = {"vulnerabilities": []}
+
+    scan_id = run_in_other_thread(
+        lambda: db.save_scan("10.0.0.5", "quick", 12, "completed", analysis, {"puertos": []})
+    )
+    db.save_phase_timings(scan_id, "scan-1", {"parsing": 0.5})
+
+    detail = run_in_other_thread(db.get_scan_detail, scan_id)
+    assert detail["target_ip"] == "10.0.0.5"
+    assert detail["analysis_data"] == analysis
+    assert db.get_timing_summary()["phases"][0]["phase"] == "parsing"
+
+
+def test_timings_summary_from_the_cli(db, capsys):
+    from scanagent.agent import ScanAgent
+
+    db.save_command_runs(None, "scan-1", "10.0.0.5", [
+        {"tool": "nmap", "command": "nmap -sV 10.0.0.5", "returncode": 0, "duration": 4.0},
+        {"tool": "nmap", "command": "nmap -sV 10.0.0.5", "returncode": 0, "duration": 0.0, "resumed": True},
+        {"tool": "curl", "command": "curl -I http://10.0.0.5", "returncode": 0, "duration": 0.5},
+    ])
+    db.save_phase_timings(None, "scan-1", {"parsing": 0.25})
+
+    agent = ScanAgent(use_database=True)
+    agent._db_manager = db
+    assert agent.show_timings()
+
+    out = capsys.readouterr().out
+    # Los comandos reanudados no ejecutaron la herramienta
+    assert "nmap          1 ejecuciones" in out
+    assert "curl          1 ejecuciones" in out
+    assert "parsing" in out
+
+    assert not ScanAgent(use_database=False).show_timings()
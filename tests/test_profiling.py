@@ -0,0 +1,57 @@
+"""
+Tests de las sesiones de profiling con escaneos en paralelo.
+"""
+
+import json
+import threading
+
+from scanagent.profiling import Profiler
+
+
+def read_spans(output_dir):
+    traces = {}
+    for path in output_dir.glob("*.spans.jsonl"):
+        records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+        traces[path.name] = records
+    return traces
+
+
+def test_sessions_are_per_thread(tmp_path):
+    profiler = Profiler(["spans"], str(tmp_path))
+    both_started = threading.Barrier(2)
+
+    def scan(name):
+        with profiler.session("agent_run", scan=name):
+            both_started.wait()
+            with profiler.span(f"parse.{name}"):
+                pass
+            both_started.wait()
+
+    threads = [threading.Thread(target=scan, args=(name,)) for name in ("a", "b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    traces = read_spans(tmp_path)
+    assert len(traces) == 2
+    for records in traces.values():
+        # Cada archivo tiene solo su raíz y su span, con una sola traza
+        root, child = sorted(records, key=lambda r: r["parent_span_id"] is not None)
+        assert {r["trace_id"] for r in records} == {root["trace_id"]}
+        assert root["parent_span_id"] is None
+        assert child["parent_span_id"] == root["span_id"]
+        assert child["name"] == f"parse.{root['attributes']['scan']}"
+
+
+def test_spans_outside_a_session_are_ignored(tmp_path):
+    profiler = Profiler(["spans"], str(tmp_path))
+
+    with profiler.span("parse.nmap"):
+        pass
+    with profiler.session("agent_run"):
+        with profiler.session("nested"):
+            pass
+
+    (records,) = read_spans(tmp_path).values()
+    assert [r["name"] for r in sorted(records, key=lambda r: r["start_time_unix_nano"])] == ["agent_run", "nested"]
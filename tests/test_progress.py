@@ -0,0 +1,156 @@
+"""
+Tests del broker de eventos de progreso.
+"""
+
+import asyncio
+
+from webapp.utils.progress import ALL_SCANS, SLOW_CONSUMER_CLOSE_CODE, ProgressBroker
+
+
+class FakeWebSocket:
+    """WebSocket que guarda lo enviado"""
+
+    def __init__(self):
+        self.sent = []
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, event):
+        self.sent.append(event)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+async def drain():
+    """Deja que las tareas de envío vacíen sus colas"""
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def seqs(websocket):
+    return [event["seq"] for event in websocket.sent]
+
+
+def test_publish_numbers_events_per_scan():
+    broker = ProgressBroker()
+
+    assert broker.publish("a", {"type": "status"}) == {"type": "status", "scan_id": "a", "seq": 1}
+    assert broker.publish("a", {"type": "status"})["seq"] == 2
+    assert broker.publish("b", {"type": "status"})["seq"] == 1
+
+
+def test_history_is_a_ring_buffer():
+    broker = ProgressBroker(history_size=3)
+    for _ in range(5):
+        broker.publish("a", {})
+
+    assert [event["seq"] for event in broker.history("a")] == [3, 4, 5]
+    assert [event["seq"] for event in broker.history("a", since=4)] == [5]
+    assert broker.history("missing") == []
+
+
+def test_oldest_channels_are_evicted():
+    broker = ProgressBroker(max_channels=2)
+    broker.publish("a", {})
+    broker.publish("b", {})
+    broker.publish("a", {})
+    broker.publish("c", {})
+
+    # "b" es el escaneo con actividad más antigua
+    assert broker.history("b") == []
+    assert [event["seq"] for event in broker.history("a")] == [1, 2]
+
+
+def test_subscribe_replays_since_then_streams_live():
+    async def scenario():
+        broker = ProgressBroker(history_size=4)
+        for _ in range(6):
+            broker.publish("a", {})
+
+        late = FakeWebSocket()
+        resumed = FakeWebSocket()
+        await broker.subscribe("a", late)
+        await broker.subscribe("a", resumed, since=4)
+
+        broker.publish("a", {})
+        await drain()
+        return late, resumed
+
+    late, resumed = asyncio.run(scenario())
+
+    # Sin since: todo lo que queda en el buffer; con since: solo lo posterior
+    assert seqs(late) == [3, 4, 5, 6, 7]
+    assert seqs(resumed) == [5, 6, 7]
+
+
+def test_all_scans_channel_gets_live_events_only():
+    async def scenario():
+        broker = ProgressBroker()
+        broker.publish("a", {})
+
+        websocket = FakeWebSocket()
+        await broker.subscribe(ALL_SCANS, websocket)
+        broker.publish("a", {})
+        broker.publish("b", {})
+        await drain()
+        return websocket
+
+    websocket = asyncio.run(scenario())
+    assert [(event["scan_id"], event["seq"]) for event in websocket.sent] == [("a", 2), ("b", 1)]
+
+
+def test_publish_from_another_thread():
+    async def scenario():
+        broker = ProgressBroker()
+        websocket = FakeWebSocket()
+        await broker.subscribe("a", websocket)
+
+        def worker():
+            for _ in range(20):
+                broker.publish("a", {})
+
+        await asyncio.to_thread(worker)
+        await drain()
+        return websocket
+
+    websocket = asyncio.run(scenario())
+    assert seqs(websocket) == list(range(1, 21))
+
+
+def test_slow_consumer_is_disconnected():
+    async def scenario():
+        broker = ProgressBroker(queue_size=2)
+        websocket = FakeWebSocket()
+        subscriber = await broker.subscribe("a", websocket)
+
+        # Sin ceder el control el envío no avanza y la cola se llena
+        for _ in range(3):
+            broker.publish("a", {})
+        await drain()
+        return broker, subscriber, websocket
+
+    broker, subscriber, websocket = asyncio.run(scenario())
+
+    assert subscriber.dropped
+    assert broker.subscriber_count("a") == 0
+    assert websocket.closed_with == SLOW_CONSUMER_CLOSE_CODE
+
+
+def test_unsubscribe():
+    async def scenario():
+        broker = ProgressBroker()
+        websocket = FakeWebSocket()
+        subscriber = await broker.subscribe("a", websocket)
+        assert broker.subscriber_count() == 1
+
+        broker.unsubscribe(subscriber)
+        broker.publish("a", {})
+        await drain()
+        return broker, websocket
+
+    broker, websocket = asyncio.run(scenario())
+    assert broker.subscriber_count() == 0
+    assert websocket.sent == []
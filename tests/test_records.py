@@ -0,0 +1,54 @@
+"""
+Tests de los registros del pipeline y su serialización.
+"""
+
+import pytest
+
+from scanagent import serialization
+from scanagent.records import ExposedPort, NiktoVulnerability, PortRecord, Vulnerability
+
+VULNERABILITY = dict(
+    id="IND-1", titulo="Ruta expuesta", descripcion="", severidad="alta", cvss_score=7.5,
+    owasp_category="A01:2021", fuente="gobuster", evidencia=None, recomendacion="Restringir"
+)
+
+
+@pytest.fixture(params=list(serialization.BACKENDS))
+def backend(request):
+    previous = serialization.BACKEND
+    serialization.set_backend(request.param)
+    yield request.param
+    serialization.set_backend(previous)
+
+
+def test_backend_preference_order():
+    # orjson y msgspec solo si están instalados; stdlib siempre, como respaldo final
+    names = list(serialization.BACKENDS)
+    assert names[-1] == "stdlib"
+    assert names == [name for name in ("orjson", "msgspec", "stdlib") if name in names]
+
+
+def test_dict_style_access():
+    port = PortRecord(puerto=22, protocolo="tcp", servicio="ssh", estado="open")
+
+    assert port["puerto"] == 22
+    assert port.get("version") == ""
+    assert port.get("banner", "-") == "-"
+    assert "servicio" in port and "banner" not in port
+    assert list(port.keys()) == ["puerto", "protocolo", "servicio", "estado", "version"]
+    with pytest.raises(KeyError):
+        port["banner"]
+
+
+def test_serialized_keys_match_the_previous_dicts(backend):
+    vulnerability = Vulnerability(**VULNERABILITY)
+    nikto = NiktoVulnerability(**{**VULNERABILITY, "fuente": "nikto"}, ubicacion="/admin")
+    exposed = ExposedPort(puerto=80, servicio="http", version="", critico=False)
+
+    data = serialization.loads(serialization.dumps([vulnerability, nikto, exposed]))
+
+    # Solo los hallazgos de Nikto llevan ubicación
+    assert data[0] == VULNERABILITY
+    assert data[1] == {**VULNERABILITY, "fuente": "nikto", "ubicacion": "/admin"}
+    assert data[2] == {"puerto": 80, "servicio": "http", "version": "", "critico": False, "razon": None}
+    assert serialization.loads(serialization.dumps(exposed, pretty=True)) == data[2]
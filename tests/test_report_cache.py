@@ -0,0 +1,102 @@
+"""
+Tests del renderizado bajo demanda de ReportCache.
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from webapp.utils.report_cache import ReportCache
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+
+
+def render_summary(scan_data: dict) -> str:
+    return f"{scan_data['target']}: {scan_data['summary']['critical_findings']} críticos"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ReportCache(reports_dir=str(tmp_path), renderers={"txt": render_summary})
+
+
+def test_renders_web_analysis(cache, tmp_path):
+    analysis = {"scan_id": "abc", "target": "10.0.0.5", "vulnerabilities": [],
+                "summary": {"critical_findings": 2}}
+    (tmp_path / "scan_abc.json").write_text(json.dumps(analysis), encoding="utf-8")
+
+    report = cache.resolve("abc", "txt")
+
+    assert report.path.read_text(encoding="utf-8") == "10.0.0.5: 2 críticos"
+    assert cache.resolve("abc", "txt").etag == report.etag
+
+
+def test_cli_report_is_not_rendered(cache, tmp_path):
+    # informe_tecnico.json de la CLI: otro esquema (metadata, executive_summary...)
+    shutil.copy(EXAMPLES / "ejemplo_informe_tecnico.json", tmp_path / "scan_cli.json")
+
+    assert cache.resolve("cli", "txt") is None
+    assert cache.resolve("cli", "json").path == tmp_path / "scan_cli.json"
+    assert not ReportCache.is_analysis(json.loads((tmp_path / "scan_cli.json").read_text(encoding="utf-8")))
+
+
+def write_analysis(tmp_path, scan_id, critical):
+    analysis = {"scan_id": scan_id, "target": "10.0.0.5", "vulnerabilities": [],
+                "summary": {"critical_findings": critical}}
+    path = tmp_path / f"scan_{scan_id}.json"
+    path.write_text(json.dumps(analysis), encoding="utf-8")
+    return path
+
+
+def test_etag_without_rendering(cache, tmp_path):
+    write_analysis(tmp_path, "abc", 1)
+
+    etags = (cache.etag("abc", "txt"), cache.etag("abc", "txt", "gzip"))
+    assert not cache.cache_dir.exists()
+
+    assert etags == (cache.resolve("abc", "txt").etag, cache.resolve("abc", "txt", "gzip").etag)
+    assert cache.etag("missing", "txt") is None
+
+
+def test_stale_renders_are_removed_only_if_older_than_the_analysis(cache, tmp_path):
+    source = write_analysis(tmp_path, "abc", 1)
+    old = cache.resolve("abc", "txt", "gzip")
+    old_plain = old.path.with_suffix("")
+
+    # Renderizado de una petición en curso que leyó el análisis anterior
+    in_flight = old.path.parent / "inflight-v1.txt"
+    in_flight.write_text("previo", encoding="utf-8")
+
+    source = write_analysis(tmp_path, "abc", 2)
+    stat = source.stat()
+    os.utime(old.path, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10 ** 9))
+    os.utime(old_plain, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10 ** 9))
+    os.utime(in_flight, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    new = cache.resolve("abc", "txt")
+
+    assert new.path.read_text(encoding="utf-8") == "10.0.0.5: 2 críticos"
+    assert not old.path.exists() and not old_plain.exists()
+    assert in_flight.exists()
+
+
+def test_compress_renders_again_if_the_plain_report_vanished(cache, tmp_path, monkeypatch):
+    write_analysis(tmp_path, "abc", 1)
+    plain = cache.resolve("abc", "txt").path
+
+    # Otra petición elimina el renderizado justo antes de comprimirlo
+    compress = cache._compress
+
+    def racing_compress(source, destination, encoding):
+        source.unlink(missing_ok=True)
+        monkeypatch.setattr(cache, "_compress", compress)
+        compress(source, destination, encoding)
+
+    monkeypatch.setattr(cache, "_compress", racing_compress)
+    report = cache.resolve("abc", "txt", "gzip")
+
+    assert report.encoding == "gzip" and report.path.exists()
+    assert plain.read_text(encoding="utf-8") == "10.0.0.5: 1 críticos"
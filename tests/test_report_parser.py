@@ -0,0 +1,63 @@
+"""
+Tests del esquema web construido sobre el análisis de scanagent.
+"""
+
+from scanagent.interpreter import VulnerabilityInterpreter
+from webapp.utils.report_parser import ScanResultParser, WebAnalysis
+
+PARSED = {
+    "target_ip": "10.0.0.5",
+    "host": {"activo": True, "latencia_ms": 1.5},
+    "puertos": [
+        {"puerto": 22, "protocolo": "tcp", "estado": "open", "servicio": "ssh",
+         "version": "OpenSSH 6.6.1p1 Ubuntu 2ubuntu2.13"},
+        {"puerto": 8080, "protocolo": "tcp", "estado": "open", "servicio": "http-proxy", "version": ""},
+    ],
+    "vulnerabilidades_nikto": [
+        {"id_osvdb": "OSVDB-1", "ubicacion": "/login", "descripcion": "Possible SQL injection in login form"},
+    ],
+}
+
+
+def build():
+    analysis = VulnerabilityInterpreter(PARSED).analyze()
+    results = ScanResultParser().from_parsed_data(PARSED, "10.0.0.5")
+    return analysis, WebAnalysis(analysis, results).build()
+
+
+def test_findings_come_from_the_interpreter(capsys):
+    analysis, web = build()
+    by_title = {finding["title"]: finding for finding in web["findings"]}
+
+    # Cada vulnerabilidad del intérprete, con su severidad en la escala web
+    for vuln in analysis["vulnerabilidades"]:
+        assert by_title[vuln["titulo"]]["severity"] == WebAnalysis.SEVERITY[vuln["severidad"]]
+
+    nikto = by_title["Possible SQL injection in login form"]
+    assert (nikto["severity"], nikto["port"], nikto["service"]) == ("CRITICAL", 8080, "http")
+
+
+def test_vulnerable_versions_and_critical_ports(capsys):
+    _, web = build()
+    by_port = {}
+    for finding in web["findings"]:
+        by_port.setdefault(finding["port"], []).append(finding)
+
+    openssh = [f for f in by_port[22] if f["cves"]]
+    assert len(openssh) == 1 and openssh[0]["severity"] == "CRITICAL"
+    assert "CVE-2016-0777" in openssh[0]["cves"]
+    # 22 es crítico en la tabla del intérprete; 8080 no
+    assert any(f["severity"] == "HIGH" and "SSH" in f["title"] for f in by_port[22])
+    assert [f["severity"] for f in by_port[8080] if f["title"].startswith("Puerto")] == ["INFO"]
+
+
+def test_risk_and_summary(capsys):
+    analysis, web = build()
+
+    assert web["risk_level"] == "CRITICAL"
+    assert analysis["resumen_ejecutivo"]["nivel_riesgo_general"] == "CRÍTICO"
+    assert 0 < web["risk_score"] <= 100
+    assert web["summary"]["total_findings"] == len(web["findings"])
+    assert web["summary"]["critical"] == sum(f["severity"] == "CRITICAL" for f in web["findings"])
+    assert web["recommendations"] == analysis["recomendaciones"]["corto_plazo"] + \
+        analysis["recomendaciones"]["mediano_plazo"]
@@ -0,0 +1,182 @@
+"""
+Tests de los endpoints de descarga y vista previa de reportes.
+"""
+
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from webapp.api import reports
+from webapp.utils.report_cache import ReportCache
+from webapp.utils.report_catalog import ReportCatalog
+
+ANALYSIS = {
+    "scan_id": "abc",
+    "target": "10.0.0.5",
+    "summary": {"critical_findings": 1},
+    "vulnerabilities": [{"title": f"Hallazgo {i}", "severity": "LOW"} for i in range(5)],
+}
+
+
+def render_summary(scan_data: dict) -> str:
+    return f"{scan_data['target']}: {scan_data['summary']['critical_findings']} críticos"
+
+
+@pytest.fixture
+def reports_dir(tmp_path, monkeypatch):
+    (tmp_path / "scan_abc.json").write_text(json.dumps(ANALYSIS), encoding="utf-8")
+    catalog = ReportCatalog(reports_dir=str(tmp_path))
+    catalog.register("abc")
+    monkeypatch.setattr(reports, "report_catalog", catalog)
+    monkeypatch.setattr(reports, "report_cache",
+                        ReportCache(reports_dir=str(tmp_path), renderers={"txt": render_summary}))
+    return tmp_path
+
+
+@pytest.fixture
+def client(reports_dir):
+    app = FastAPI()
+    app.include_router(reports.router, prefix="/api/reports")
+    return TestClient(app)
+
+
+def test_not_modified_before_rendering(client, reports_dir):
+    etag = reports.report_cache.etag("abc", "txt")
+
+    response = client.get("/api/reports/abc/download/txt",
+                          headers={"If-None-Match": etag, "Accept-Encoding": "identity"})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    # Caché fría: el 304 no renderizó nada
+    assert not (reports_dir / ".cache").exists()
+
+    response = client.get("/api/reports/abc/download/txt", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert response.headers["etag"] == etag
+    assert response.text == "10.0.0.5: 1 críticos"
+
+
+RENDERED = "10.0.0.5: 1 críticos".encode("utf-8")
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-4", (0, 4)),
+    ("bytes=5-5", (5, 5)),
+    ("bytes=10-", (10, 20)),
+    ("bytes=10-999", (10, 20)),
+    ("bytes=-8", (13, 20)),
+    ("bytes=-999", (0, 20)),
+    (" bytes=0-0 ", (0, 0)),
+    ("bytes=21-", "unsatisfiable"),
+    ("bytes=5-4", "unsatisfiable"),
+    ("bytes=-0", "unsatisfiable"),
+    ("bytes=-", None),
+    ("bytes=0-1,3-4", None),
+    ("items=0-4", None),
+])
+def test_parse_range(header, expected):
+    assert reports._parse_range(header, 21) == expected
+
+
+def get_range(client, byte_range, **headers):
+    return client.get("/api/reports/abc/download/txt", headers={"Range": byte_range, **headers})
+
+
+@pytest.mark.parametrize("byte_range, start, end", [
+    ("bytes=0-4", 0, 4),
+    ("bytes=10-", 10, 20),
+    ("bytes=-8", 13, 20),
+])
+def test_partial_download(client, byte_range, start, end):
+    response = get_range(client, byte_range, **{"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 206
+    assert response.content == RENDERED[start:end + 1]
+    assert response.headers["content-range"] == f"bytes {start}-{end}/{len(RENDERED)}"
+    # Los rangos son siempre sobre la representación sin comprimir
+    assert "content-encoding" not in response.headers
+
+
+def test_unsatisfiable_range(client):
+    response = get_range(client, "bytes=50-")
+
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(RENDERED)}"
+
+
+def test_invalid_or_multiple_ranges_send_everything(client):
+    for byte_range in ("bytes=0-1,3-4", "lines=1-2"):
+        response = get_range(client, byte_range)
+        assert response.status_code == 200
+        assert response.content == RENDERED
+
+
+def test_if_range(client):
+    etag = reports.report_cache.etag("abc", "txt")
+
+    response = get_range(client, "bytes=0-4", **{"If-Range": etag})
+    assert response.status_code == 206
+    assert response.content == RENDERED[:5]
+
+    # Otro ETag: el cliente tiene una versión anterior, se envía completo
+    response = get_range(client, "bytes=0-4", **{"If-Range": '"otra-version"'})
+    assert response.status_code == 200
+    assert response.content == RENDERED
+    assert response.headers["etag"] == etag
+
+
+def test_preview_whole_analysis_and_sections(client):
+    assert client.get("/api/reports/abc/preview").json() == ANALYSIS
+
+    response = client.get("/api/reports/abc/preview", params={"section": "summary"})
+    assert response.status_code == 200
+    assert response.json() == ANALYSIS["summary"]
+
+    response = client.get("/api/reports/abc/preview", params={"section": "vulnerabilities"})
+    assert response.json() == ANALYSIS["vulnerabilities"]
+
+    assert client.get("/api/reports/abc/preview", params={"section": "missing"}).status_code == 404
+    assert client.get("/api/reports/other/preview").status_code == 404
+
+
+@pytest.mark.parametrize("page, items", [
+    (1, [0, 1]),
+    (2, [2, 3]),
+    (3, [4]),
+    (4, []),
+])
+def test_preview_pages(client, page, items):
+    response = client.get("/api/reports/abc/preview",
+                          params={"section": "vulnerabilities", "page": page, "page_size": 2})
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "section": "vulnerabilities", "page": page, "page_size": 2, "total": 5,
+        "items": [ANALYSIS["vulnerabilities"][i] for i in items]
+    }
+
+
+def test_preview_page_of_a_non_list_section(client):
+    response = client.get("/api/reports/abc/preview", params={"section": "summary", "page": 1})
+    assert response.status_code == 404
+
+
+def test_catalog_streams_sections_of_a_pretty_printed_analysis(tmp_path):
+    # Con sangría, los fragmentos siguen siendo JSON válido
+    analysis = {**ANALYSIS, "target": "ñandú.example"}
+    (tmp_path / "scan_abc.json").write_text(json.dumps(analysis, indent=2, ensure_ascii=False),
+                                            encoding="utf-8")
+    catalog = ReportCatalog(reports_dir=str(tmp_path))
+
+    def read(stream):
+        return json.loads(b"".join(stream))
+
+    assert read(catalog.stream_section("abc", "target")) == "ñandú.example"
+    assert read(catalog.stream_section("abc", "summary")) == analysis["summary"]
+    page = read(catalog.stream_items("abc", "vulnerabilities", 2, 3))
+    assert (page["total"], page["items"]) == (5, analysis["vulnerabilities"][3:])
+    assert catalog.stream_section("abc", "missing") is None
+    assert catalog.stream_items("abc", "summary", 1, 10) is None
@@ -0,0 +1,85 @@
+"""
+Tests de la caché de salidas de herramientas (ResultCache).
+"""
+
+import os
+import time
+
+import pytest
+
+from scanagent import serialization
+from scanagent.result_cache import ResultCache
+from scanagent.scanner import VulnerabilityScanner
+
+
+@pytest.fixture
+def output_file(tmp_path):
+    path = tmp_path / "headers.txt"
+    path.write_text("HTTP/1.1 200 OK\nServer: nginx\n", encoding="utf-8")
+    return path
+
+
+def test_key_covers_target_command_and_version():
+    key = ResultCache.key("10.0.0.5", "curl -I http://10.0.0.5", "8.5.0")
+
+    assert key == ResultCache.key("10.0.0.5", "curl -I http://10.0.0.5", "8.5.0")
+    assert key != ResultCache.key("10.0.0.6", "curl -I http://10.0.0.5", "8.5.0")
+    assert key != ResultCache.key("10.0.0.5", "curl -v http://10.0.0.5", "8.5.0")
+    assert key != ResultCache.key("10.0.0.5", "curl -I http://10.0.0.5", "8.6.0")
+    # Los separadores no permiten colisiones moviendo texto entre campos
+    assert ResultCache.key("a", "bc", "") != ResultCache.key("ab", "c", "")
+
+
+def test_get_respects_max_age(tmp_path, output_file):
+    cache = ResultCache(cache_dir=str(tmp_path / "cache"), max_age=60)
+    key = ResultCache.key("10.0.0.5", "curl -I http://10.0.0.5", "8.5.0")
+
+    assert cache.get(key) is None
+    cache.put(key, str(output_file), {"returncode": 0})
+    entry = cache.get(key)
+    assert entry["returncode"] == 0
+    assert open(entry["output_path"], encoding="utf-8").read() == output_file.read_text(encoding="utf-8")
+
+    # Entrada de hace dos minutos: ya no es vigente con max_age = 60
+    _, meta_path = cache._paths(key)
+    meta = serialization.load(meta_path)
+    serialization.dump({**meta, "created_at": time.time() - 120}, meta_path)
+    assert cache.get(key) is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_disabled_cache_stores_nothing(tmp_path, output_file):
+    cache = ResultCache(cache_dir=str(tmp_path / "cache"), max_age=0)
+    cache.put("abcd", str(output_file), {})
+
+    assert cache.get("abcd") is None
+    assert not (tmp_path / "cache").exists()
+
+
+def test_prune_removes_only_old_entries(tmp_path, output_file):
+    cache = ResultCache(cache_dir=str(tmp_path / "cache"), max_age=3600)
+    cache.put("aa" + "0" * 62, str(output_file), {})
+    cache.put("bb" + "0" * 62, str(output_file), {})
+
+    old = time.time() - ResultCache.RETENTION - 60
+    _, old_meta = cache._paths("aa" + "0" * 62)
+    os.utime(old_meta, (old, old))
+
+    assert cache.prune() == 1
+    assert cache.get("aa" + "0" * 62) is None
+    assert cache.get("bb" + "0" * 62) is not None
+
+
+def test_only_reusable_probes_are_cacheable():
+    cacheable = {
+        (command["tool"], command["args"])
+        for profile in VulnerabilityScanner.PROFILES.values()
+        for command in profile.commands
+        if command.get("cache")
+    }
+
+    assert cacheable
+    assert all(tool in ("curl", "nmap") for tool, _ in cacheable)
+    for tool, args in cacheable:
+        if tool == "nmap":
+            assert "vuln" not in args and "-p" not in args.split()
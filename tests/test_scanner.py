@@ -0,0 +1,183 @@
+"""
+Tests del escáner con las herramientas simuladas de benchmarks/fake_tools.py.
+"""
+
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from scanagent.scanner import VulnerabilityScanner
+
+TARGET = "10.0.0.5"
+
+
+def wait_until(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "la condición no se cumplió a tiempo"
+        time.sleep(0.05)
+
+
+def test_cancel_kills_the_process_group_and_keeps_partial_output(fake_tools, tmp_path,
+                                                                 monkeypatch, capsys):
+    monkeypatch.setenv("FAKE_TOOL_LATENCY_NMAP", "30")
+    events = []
+    scanner = VulnerabilityScanner(on_event=events.append)
+    output_dir = tmp_path / "outputs"
+    output_file = output_dir / f"nmap_service_{TARGET}.txt"
+    result = []
+
+    thread = threading.Thread(target=lambda: result.append(
+        scanner.run_scan(TARGET, "quick", str(output_dir))))
+    thread.start()
+
+    # nmap (requerido) ya ha escrito su primer trozo y sigue en ejecución
+    wait_until(lambda: output_file.exists() and output_file.stat().st_size > 0)
+    pid = scanner._running.process.pid
+    scanner.cancel()
+    thread.join(10)
+    assert not thread.is_alive()
+
+    # Todo el grupo de procesos ha terminado
+    try:
+        os.killpg(pid, 0)
+    except ProcessLookupError:
+        pass
+    else:
+        raise AssertionError("el grupo de procesos de nmap sigue vivo")
+
+    success, files = result[0]
+    assert not success
+    assert files == [str(output_file)]
+    assert 0 < output_file.stat().st_size
+    assert scanner.results["cancelled"]
+    assert scanner.results["commands_executed"][0]["cancelled"]
+
+    finished = [e for e in events if e["type"] == "command_finished"]
+    assert [(e["tool"], e["reason"]) for e in finished] == [("nmap", "cancelled")]
+    scan_finished = events[-1]
+    assert scan_finished["type"] == "scan_finished"
+    assert (scan_finished["cancelled"], scan_finished["failed"]) == (True, 0)
+
+    # Cancelar no es un fallo del comando requerido
+    out = capsys.readouterr().out
+    assert "ERROR CRÍTICO" not in out
+    assert "Comando cancelado: nmap" in out
+
+
+def manifest_commands(output_dir):
+    with open(output_dir / VulnerabilityScanner.MANIFEST_NAME, "r", encoding="utf-8") as f:
+        return json.load(f)["commands"]
+
+
+def test_resume_matches_commands_scoped_by_discovery(fake_tools, tmp_path, capsys):
+    output_dir = tmp_path / "outputs"
+    events = []
+    first = VulnerabilityScanner(on_event=events.append)
+    assert first.run_scan(TARGET, "standard", str(output_dir))[0]
+
+    # Las claves del manifiesto llevan los puertos del descubrimiento, no {ports_arg}
+    ports = next(e["ports"] for e in events if e["type"] == "ports_discovered")
+    ports_arg = "-p" + ",".join(str(port) for port in ports)
+    commands = manifest_commands(output_dir)
+    assert f"nmap -sV -sC {ports_arg} {TARGET}" in commands
+    assert f"nmap --script=vuln,safe {ports_arg} {TARGET}" in commands
+    assert len(commands) == len(VulnerabilityScanner.PROFILES["standard"].commands)
+
+    # Una salida modificada desde la ejecución anterior se repite
+    nse = output_dir / f"nmap_nse_{TARGET}.txt"
+    nse.write_text(nse.read_text(encoding="utf-8") + "# editado\n", encoding="utf-8")
+
+    events = []
+    resumed = VulnerabilityScanner(on_event=events.append)
+    success, files = resumed.run_scan(TARGET, "standard", str(output_dir), resume=True)
+
+    # El descubrimiento reanudado vuelve a acotar los comandos con los mismos
+    # puertos, así que sus claves siguen encontrando su checkpoint
+    assert success
+    assert [port for port, _ in resumed.discovered_ports] == ports
+    executed = resumed.results["commands_executed"]
+    assert [bool(cmd.get("resumed")) for cmd in executed] == [True, True, False, True, True]
+    assert executed[2]["output_file"] == str(nse)
+    assert set(manifest_commands(output_dir)) == set(commands)
+    assert len(files) == len(commands)
+
+
+DISCOVERY = """Starting Nmap 7.94 ( https://nmap.org )
+Nmap scan report for 10.0.0.5
+PORT     STATE  SERVICE
+22/tcp   open   ssh
+80/tcp   open   http
+139/tcp  closed netbios-ssn
+8443/tcp open   https-alt
+53/udp   open   domain
+"""
+
+NO_PORTS = """Starting Nmap 7.94 ( https://nmap.org )
+Nmap scan report for 10.0.0.5
+All 65535 scanned ports on 10.0.0.5 are in ignored states.
+"""
+
+PORTS_COMMAND = VulnerabilityScanner.PROFILES["standard"].commands[1]
+HTTP_COMMAND = VulnerabilityScanner.PROFILES["standard"].commands[3]
+
+
+def discover(tmp_path, content):
+    events = []
+    scanner = VulnerabilityScanner(on_event=events.append)
+    output_file = tmp_path / "nmap_discovery.txt"
+    if content is not None:
+        output_file.write_text(content, encoding="utf-8")
+    scanner._finish_discovery(str(output_file), TARGET, 1, 5)
+    return scanner, events
+
+
+def test_discovery_scopes_ports_and_http(tmp_path):
+    scanner, events = discover(tmp_path, DISCOVERY)
+
+    # Solo puertos TCP abiertos
+    assert scanner.discovered_ports == [(22, "ssh"), (80, "http"), (8443, "https-alt")]
+    assert scanner._scope_command(PORTS_COMMAND, TARGET) == f"-sV -sC -p22,80,8443 {TARGET}"
+    assert scanner._scope_command(HTTP_COMMAND, TARGET) == f"-I http://{TARGET}"
+    assert events == [{"type": "ports_discovered", "step": 1, "total": 5,
+                       "ports": [22, 80, 8443], "http_url": f"http://{TARGET}"}]
+
+
+def test_discovery_without_open_ports_skips_scoped_commands(tmp_path):
+    scanner, events = discover(tmp_path, NO_PORTS)
+
+    assert scanner.discovered_ports == []
+    assert scanner._scope_command(PORTS_COMMAND, TARGET) is None
+    assert scanner._scope_command(HTTP_COMMAND, TARGET) is None
+    assert (events[0]["ports"], events[0]["http_url"]) == ([], None)
+
+
+def test_without_discovery_nmap_uses_its_default_ports(tmp_path):
+    # Perfil sin etapa de descubrimiento
+    scanner = VulnerabilityScanner()
+    assert scanner._scope_command(PORTS_COMMAND, TARGET).split() == ["-sV", "-sC", TARGET]
+    assert scanner._scope_command(HTTP_COMMAND, TARGET) == f"-I http://{TARGET}"
+
+    # Salida del descubrimiento ilegible: igual que si no se hubiera hecho
+    scanner, events = discover(tmp_path, None)
+    assert scanner.discovered_ports is None
+    assert scanner._scope_command(PORTS_COMMAND, TARGET).split() == ["-sV", "-sC", TARGET]
+    assert (events[0]["ports"], events[0]["http_url"]) == ([], f"http://{TARGET}")
+
+
+@pytest.mark.parametrize("ports, url", [
+    ([(80, "http"), (443, "https")], f"http://{TARGET}"),
+    ([(8080, "http-proxy"), (443, "https")], f"https://{TARGET}"),
+    ([(8443, "https-alt")], f"https://{TARGET}:8443"),
+    ([(9443, "ssl/http")], f"https://{TARGET}:9443"),
+    ([(8080, "http-proxy"), (8000, "http-alt")], f"http://{TARGET}:8000"),
+    ([(3000, "ppp")], f"http://{TARGET}:3000"),
+    ([(22, "ssh"), (3306, "mysql")], None),
+])
+def test_http_url(ports, url):
+    scanner = VulnerabilityScanner()
+    scanner.discovered_ports = ports
+    assert scanner._http_url(TARGET) == url
@@ -0,0 +1,143 @@
+"""
+Tests del gobernador de concurrencia de escaneos.
+"""
+
+import threading
+
+import pytest
+
+from scanagent.scheduler import NMAP_TIMING_STEPS, ScanScheduler, subnet_of
+
+
+@pytest.fixture
+def scheduler():
+    return ScanScheduler(max_commands=4, max_per_target=2, max_per_subnet=3,
+                         tool_limits={"nmap": 2})
+
+
+def try_acquire(scheduler, tool, target):
+    """acquire() sin bloquear: None si habría que esperar"""
+    cancel = threading.Event()
+    cancel.set()
+    return scheduler.acquire(tool, target, cancel=cancel)
+
+
+@pytest.mark.parametrize("target, subnet", [
+    ("10.0.0.7", "10.0.0.0/24"),
+    ("10.0.0.250", "10.0.0.0/24"),
+    ("2001:db8::1", "2001:db8::/64"),
+    ("Example.COM", "example.com"),
+])
+def test_subnet_of(target, subnet):
+    assert subnet_of(target) == subnet
+
+
+def test_per_target_limit(scheduler):
+    assert try_acquire(scheduler, "curl", "10.0.0.1")
+    assert try_acquire(scheduler, "curl", "10.0.0.1")
+    assert try_acquire(scheduler, "curl", "10.0.0.1") is None
+    # Otro objetivo de la misma subred aún cabe
+    assert try_acquire(scheduler, "curl", "10.0.0.2")
+
+
+def test_per_subnet_limit(scheduler):
+    for host in (1, 2, 3):
+        assert try_acquire(scheduler, "curl", f"10.0.0.{host}")
+
+    assert try_acquire(scheduler, "curl", "10.0.0.4") is None
+    assert try_acquire(scheduler, "curl", "10.0.1.4")
+
+
+def test_global_and_tool_limits(scheduler):
+    assert try_acquire(scheduler, "nmap", "10.0.0.1")
+    assert try_acquire(scheduler, "nmap", "10.0.1.1")
+    assert try_acquire(scheduler, "nmap", "10.0.2.1") is None
+
+    assert try_acquire(scheduler, "curl", "10.0.2.1")
+    assert try_acquire(scheduler, "curl", "10.0.3.1")
+    # Cuatro comandos en ejecución: el límite global
+    assert try_acquire(scheduler, "curl", "10.0.4.1") is None
+    assert scheduler.stats()["running"] == 4
+    assert scheduler.stats()["by_tool"] == {"nmap": 2}
+
+
+def test_rejected_acquire_takes_nothing(scheduler):
+    for _ in range(2):
+        try_acquire(scheduler, "curl", "10.0.0.1")
+    before = scheduler.stats()
+
+    # Cabe en el global y en la subred pero no en el objetivo: no reserva nada
+    assert try_acquire(scheduler, "curl", "10.0.0.1") is None
+    assert scheduler.stats() == before
+
+
+def test_release_wakes_waiters(scheduler):
+    slots = [try_acquire(scheduler, "curl", "10.0.0.1") for _ in range(2)]
+    waiting = threading.Event()
+    acquired = []
+
+    thread = threading.Thread(target=lambda: acquired.append(
+        scheduler.acquire("curl", "10.0.0.1", on_wait=waiting.set)))
+    thread.start()
+    assert waiting.wait(5)
+    assert scheduler.stats()["waiting"] == 1
+
+    scheduler.release(slots[0])
+    thread.join(5)
+    assert acquired and acquired[0] is not None
+    stats = scheduler.stats()
+    assert (stats["running"], stats["waiting"]) == (2, 0)
+
+
+def test_cancelled_wait_returns_none(scheduler):
+    for _ in range(2):
+        try_acquire(scheduler, "curl", "10.0.0.1")
+    cancel = threading.Event()
+    waiting = threading.Event()
+    result = []
+
+    thread = threading.Thread(target=lambda: result.append(
+        scheduler.acquire("curl", "10.0.0.1", on_wait=waiting.set, cancel=cancel)))
+    thread.start()
+    assert waiting.wait(5)
+
+    cancel.set()
+    scheduler.wake()
+    thread.join(5)
+    assert result == [None]
+    assert scheduler.stats()["waiting"] == 0
+
+
+def test_release_frees_every_key(scheduler):
+    slot = try_acquire(scheduler, "nmap", "10.0.0.1")
+    scheduler.release(slot)
+    scheduler.release(None)
+
+    assert scheduler.stats()["running"] == 0
+    assert scheduler.stats()["by_tool"] == {}
+    # El hueco vuelve a estar disponible para el mismo objetivo
+    assert try_acquire(scheduler, "nmap", "10.0.0.1")
+
+
+def test_nmap_timing_degrades_and_recovers(scheduler):
+    args = "-sV -T4 -p 1-1000"
+    assert scheduler.adapt_nmap_args("10.0.0.1", args) == args
+
+    assert scheduler.report("nmap", "10.0.0.1", degraded=True) == 1
+    assert scheduler.report("nmap", "10.0.0.2", degraded=True) == 2
+    # La adaptación es por subred
+    assert scheduler.adapt_nmap_args("10.0.0.9", args) == "--max-rate 500 -sV -T3 -p 1-1000"
+    assert scheduler.adapt_nmap_args("10.0.1.9", args) == args
+    # Nunca sube el -T del perfil
+    assert scheduler.adapt_nmap_args("10.0.0.9", "-T2 --max-rate 100") == "-T2 --max-rate 100"
+
+    for _ in range(ScanScheduler.RECOVERY_RUNS - 1):
+        assert scheduler.report("nmap", "10.0.0.1", degraded=False) is None
+    assert scheduler.report("nmap", "10.0.0.1", degraded=False) == 1
+    assert scheduler.report("curl", "10.0.0.1", degraded=True) is None
+
+
+def test_nmap_timing_stops_at_last_step(scheduler):
+    for _ in range(len(NMAP_TIMING_STEPS) - 1):
+        assert scheduler.report("nmap", "10.0.0.1", degraded=True) is not None
+    assert scheduler.report("nmap", "10.0.0.1", degraded=True) is None
@@ -0,0 +1,168 @@
+"""
+Tests de la base de versiones vulnerables.
+"""
+
+import json
+import os
+import random
+
+import pytest
+
+from scanagent import vulndb
+from scanagent.vulndb import VulnerabilityDatabase, version_bounds, version_key
+
+CPE = "cpe:2.3:a:example:server"
+
+RANGES = [
+    {"cves": ["CVE-EXACT"], "version": "1.2.3"},
+    {"cves": ["CVE-START-INC"], "versionStartIncluding": "2.0", "versionEndExcluding": "2.4.49"},
+    {"cves": ["CVE-START-EXC"], "versionStartExcluding": "2.4.9", "versionEndIncluding": "2.4.50"},
+    {"cves": ["CVE-END-INC"], "versionEndIncluding": "7.1p1"},
+    {"cves": ["CVE-END-EXC"], "versionEndExcluding": "7.2"},
+    {"cves": ["CVE-OPEN"], "versionStartIncluding": "9.0"},
+    {"cves": ["CVE-EMPTY"], "versionStartIncluding": "3.0", "versionEndExcluding": "3.0"},
+]
+
+VERSIONS = [
+    "0.9", "1.2", "1.2.3", "1.2.3.1", "2.0", "2.4.9", "2.4.10", "2.4.48", "2.4.49",
+    "2.4.50", "2.4.51", "3.0", "7.1", "7.1p1", "7.1p2", "7.2", "7.2p1", "9.0", "12.1",
+]
+
+
+@pytest.mark.parametrize("lower, higher", [
+    ("2.4.9", "2.4.49"),
+    ("7.1", "7.1p1"),
+    ("7.1p1", "7.1p2"),
+    ("7.1p1", "7.2"),
+    ("1.9", "1.10"),
+    ("2.4", "2.4.0"),
+])
+def test_version_key_order(lower, higher):
+    assert version_key(lower) < version_key(higher)
+
+
+def test_version_bounds():
+    key = version_key
+
+    assert version_bounds({"version": "1.2.3"}) == (key("1.2.3"), key("1.2.3") + vulndb.JUST_AFTER)
+    assert version_bounds({"versionStartIncluding": "2.0", "versionEndExcluding": "2.4.49"}) == \
+        (key("2.0"), key("2.4.49"))
+    assert version_bounds({"versionStartExcluding": "2.4.9", "versionEndIncluding": "2.4.50"}) == \
+        (key("2.4.9") + vulndb.JUST_AFTER, key("2.4.50") + vulndb.JUST_AFTER)
+    assert version_bounds({"versionEndExcluding": "7.2"}) == ("", key("7.2"))
+    assert version_bounds({"versionStartIncluding": "9.0"}) == (key("9.0"), vulndb.MAX_KEY)
+    assert version_bounds({"versionStartIncluding": "3.0", "versionEndExcluding": "3.0"}) is None
+
+
+def test_bounds_include_and_exclude_their_ends():
+    def contains(version_range, version):
+        start, end = version_bounds(version_range)
+        return start <= version_key(version) < end
+
+    assert not contains({"versionStartExcluding": "2.4.9"}, "2.4.9")
+    assert contains({"versionStartExcluding": "2.4.9"}, "2.4.10")
+    assert contains({"versionEndIncluding": "7.1p1"}, "7.1p1")
+    assert not contains({"versionEndIncluding": "7.1p1"}, "7.1p2")
+    assert contains({"versionEndExcluding": "7.2"}, "7.1p1")
+    assert not contains({"versionEndExcluding": "7.2"}, "7.2")
+    assert contains({"version": "1.2.3"}, "1.2.3")
+    assert not contains({"version": "1.2.3"}, "1.2.3.1")
+
+
+def brute_force(ranges, version):
+    """CVEs de los rangos que contienen la versión, comprobando uno a uno"""
+    key = version_key(version)
+    found = set()
+    for version_range in ranges:
+        bounds = version_bounds(version_range)
+        if bounds and bounds[0] <= key < bounds[1]:
+            found.update(version_range["cves"])
+    return sorted(found)
+
+
+def make_database(tmp_path, products):
+    source = tmp_path / "vulnerable_versions.json"
+    source.write_text(json.dumps({"products": products}), encoding="utf-8")
+    return VulnerabilityDatabase(db_path=str(tmp_path / "vulndb.sqlite"), source=str(source))
+
+
+@pytest.fixture
+def database(tmp_path):
+    return make_database(tmp_path, [
+        {"cpe": CPE, "name": "Example", "aliases": ["example server", "example"], "ranges": RANGES}
+    ])
+
+
+@pytest.mark.parametrize("version", VERSIONS)
+def test_lookup_matches_brute_force(database, version):
+    assert database.lookup(CPE, version) == brute_force(RANGES, version)
+
+
+def test_lookup_random_ranges(tmp_path):
+    rng = random.Random(1234)
+    versions = [f"{a}.{b}" for a in range(4) for b in range(12)] + \
+        [f"{a}.{b}p{c}" for a in range(4) for b in range(12) for c in (1, 2)]
+    fields = [("versionStartIncluding", "versionStartExcluding", None),
+              ("versionEndIncluding", "versionEndExcluding", None)]
+
+    ranges = []
+    for index in range(200):
+        version_range = {"cves": [f"CVE-{index}"]}
+        if rng.random() < 0.1:
+            version_range["version"] = rng.choice(versions)
+        else:
+            for start_or_end in fields:
+                field = rng.choice(start_or_end)
+                if field:
+                    version_range[field] = rng.choice(versions)
+        ranges.append(version_range)
+
+    database = make_database(tmp_path, [{"cpe": CPE, "ranges": ranges}])
+    for version in versions + ["0.0", "9.9"]:
+        assert database.lookup(CPE, version) == brute_force(ranges, version)
+
+
+def test_lookup_unknown_product(database):
+    assert database.lookup("cpe:2.3:a:example:other", "1.0") == []
+
+
+def test_match_banner(database):
+    results = database.match("Example Server/2.4.49 (Unix)")
+
+    assert results == [{
+        "producto": "Example", "cpe": CPE, "version": "2.4.49", "cves": brute_force(RANGES, "2.4.49")
+    }]
+    assert database.match("example 8.0") == []
+    assert database.match("") == []
+
+
+def test_shipped_dataset_matches_brute_force(tmp_path):
+    with open(vulndb.SOURCE_FILE, "r", encoding="utf-8") as f:
+        products = json.load(f)["products"]
+    database = VulnerabilityDatabase(db_path=str(tmp_path / "vulndb.sqlite"))
+
+    for product in products:
+        ranges = product["ranges"]
+        # Extremos de los rangos y sus vecinos inmediatos
+        versions = {version for version_range in ranges for field, version in version_range.items()
+                    if field == "version" or field in vulndb.RANGE_FIELDS}
+        versions |= {f"{version}.1" for version in versions} | {"0.1", "99.0"}
+        for version in sorted(versions):
+            assert database.lookup(product["cpe"], version) == brute_force(ranges, version), \
+                (product["cpe"], version)
+
+
+def test_rebuilds_when_source_changes(tmp_path):
+    database = make_database(tmp_path, [{"cpe": CPE, "ranges": [{"cves": ["CVE-A"], "version": "1.0"}]}])
+    assert database.lookup(CPE, "1.0") == ["CVE-A"]
+
+    # Otra instancia (nuevo proceso) con la fuente modificada recompila la base
+    source = tmp_path / "vulnerable_versions.json"
+    source.write_text(json.dumps({"products": [
+        {"cpe": CPE, "ranges": [{"cves": ["CVE-B"], "version": "1.0"}]}
+    ]}), encoding="utf-8")
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    database = VulnerabilityDatabase(db_path=database.db_path, source=str(source))
+    assert database.lookup(CPE, "1.0") == ["CVE-B"]
@@ -5,8 +5,9 @@ Endpoints para obtener información sobre perfiles de escaneo disponibles.
 """
 
 from fastapi import APIRouter
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import List, Dict, Optional
 import sys
 from pathlib import Path
 
@@ -15,6 +16,7 @@ src_path = Path(__file__).parent.parent.parent / "src"
 sys.path.insert(0, str(src_path))
 
 from scanagent.scanner import VulnerabilityScanner
+from scanagent.toolchain import toolchain
 
 router = APIRouter()
 
@@ -27,6 +29,26 @@ class ScanProfileInfo(BaseModel):
     estimated_time: str
     tools: List[str]
     requires_sudo: bool
+    missing_tools: List[str] = []
+
+
+class ToolStatus(BaseModel):
+    """Disponibilidad y versión de una herramienta externa"""
+    name: str
+    available: bool
+    path: Optional[str] = None
+    version: Optional[str] = None
+    checked_at: float
+
+
+# Todas las herramientas usadas por algún perfil
+ALL_TOOLS = sorted({cmd['tool'] for profile in VulnerabilityScanner.PROFILES.values()
+                    for cmd in profile.commands})
+
+
+def tool_status(info) -> ToolStatus:
+    return ToolStatus(name=info.name, available=info.available, path=info.path,
+                      version=info.version, checked_at=info.checked_at)
 
 
 class ProfileParameter(BaseModel):
@@ -44,10 +66,9 @@ async def get_profiles():
     """
     Obtiene la lista de todos los perfiles de escaneo disponibles.
     """
-    scanner = VulnerabilityScanner()
     profiles_info = []
     
-    for profile_id, profile in scanner.PROFILES.items():
+    for profile_id, profile in VulnerabilityScanner.PROFILES.items():
         # Extraer herramientas únicas
         tools = list(set([cmd['tool'] for cmd in profile.commands]))
         
@@ -65,24 +86,45 @@ async def get_profiles():
             description=profile.description,
             estimated_time=time_estimates.get(profile_id, 'Variable'),
             tools=tools,
-            requires_sudo=profile.requires_sudo
+            requires_sudo=profile.requires_sudo,
+            missing_tools=[tool for tool in tools if not toolchain.available(tool)]
         ))
     
     return profiles_info
 
 
+@router.get("/tools", response_model=List[ToolStatus])
+async def get_tools(versions: bool = False):
+    """
+    Disponibilidad (y opcionalmente versión) de las herramientas externas.
+    
+    Se responde desde la caché de herramientas del proceso; `versions=true`
+    obtiene la versión de las que aún no la tienen.
+    """
+    if versions:
+        tools = await run_in_threadpool(toolchain.snapshot, ALL_TOOLS, True)
+    else:
+        tools = toolchain.snapshot(ALL_TOOLS)
+    return [tool_status(info) for info in tools.values()]
+
+
+@router.post("/tools/refresh", response_model=List[ToolStatus])
+async def refresh_tools():
+    """Vuelve a comprobar las herramientas (p. ej. tras instalar una)"""
+    tools = await run_in_threadpool(toolchain.refresh, ALL_TOOLS, True)
+    return [tool_status(info) for info in tools.values()]
+
+
 @router.get("/{profile_id}", response_model=ScanProfileInfo)
 async def get_profile(profile_id: str):
     """
     Obtiene información detallada de un perfil específico.
     """
-    scanner = VulnerabilityScanner()
-    
-    if profile_id not in scanner.PROFILES:
+    if profile_id not in VulnerabilityScanner.PROFILES:
         from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Perfil no encontrado")
     
-    profile = scanner.PROFILES[profile_id]
+    profile = VulnerabilityScanner.PROFILES[profile_id]
     tools = list(set([cmd['tool'] for cmd in profile.commands]))
     
     time_estimates = {
@@ -98,7 +140,8 @@ async def get_profile(profile_id: str):
         description=profile.description,
         estimated_time=time_estimates.get(profile_id, 'Variable'),
         tools=tools,
-        requires_sudo=profile.requires_sudo
+        requires_sudo=profile.requires_sudo,
+        missing_tools=[tool for tool in tools if not toolchain.available(tool)]
     )
 
 
@@ -4,15 +4,42 @@ Reports API Router
 Endpoints para gestionar y descargar reportes de escaneos.
 """
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Optional
-from pathlib import Path
-import json
+import re
+
+from webapp.api.scans import (
+    generate_professional_html_report,
+    generate_professional_txt_report,
+    generate_professional_md_report,
+    report_catalog
+)
+from webapp.utils.report_cache import ReportCache
 
 router = APIRouter()
 
+# Los formatos distintos de JSON se renderizan bajo demanda desde el análisis
+report_cache = ReportCache(
+    reports_dir="./reports",
+    renderers={
+        'html': generate_professional_html_report,
+        'txt': generate_professional_txt_report,
+        'md': generate_professional_md_report
+    }
+)
+
+MEDIA_TYPES = {
+    'json': 'application/json',
+    'html': 'text/html',
+    'txt': 'text/plain',
+    'md': 'text/markdown'
+}
+
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
 
 class ReportInfo(BaseModel):
     """Información de un reporte"""
@@ -21,40 +48,60 @@ class ReportInfo(BaseModel):
     filename: str
     size_bytes: int
     created_at: str
+    on_demand: bool = False  # Se renderiza desde el análisis al descargarlo
 
 
 @router.get("/{scan_id}", response_model=List[ReportInfo])
 async def get_scan_reports(scan_id: str):
     """
     Lista todos los reportes disponibles para un escaneo específico.
+
+    Usa el catálogo indexado en lugar de recorrer ./reports en cada petición.
     """
-    reports_dir = Path("./reports")
-    reports = []
-    
-    if not reports_dir.exists():
+    entry = await run_in_threadpool(report_catalog.get, scan_id)
+    if not entry:
         return []
-    
-    # Buscar archivos que coincidan con el scan_id
-    for report_file in reports_dir.glob(f"scan_{scan_id}.*"):
-        if report_file.is_file():
-            stat = report_file.stat()
-            reports.append(ReportInfo(
-                scan_id=scan_id,
-                format=report_file.suffix[1:],  # Quitar el punto
-                filename=report_file.name,
-                size_bytes=stat.st_size,
-                created_at=str(stat.st_mtime)
-            ))
-    
+
+    reports = []
+    files = entry["files"]
+
+    for fmt, info in files.items():
+        reports.append(ReportInfo(
+            scan_id=scan_id,
+            format=fmt,
+            filename=info["filename"],
+            size_bytes=info["size_bytes"],
+            created_at=str(info["mtime_ns"] / 1e9)
+        ))
+
+    # Formatos que se pueden renderizar desde el análisis (solo si el JSON
+    # tiene el esquema del análisis del servicio web)
+    if "json" in files and report_cache.is_analysis(entry["sections"]):
+        for fmt in report_cache.renderers:
+            if fmt not in files:
+                reports.append(ReportInfo(
+                    scan_id=scan_id,
+                    format=fmt,
+                    filename=f"scan_{scan_id}.{fmt}",
+                    size_bytes=0,
+                    created_at=str(files["json"]["mtime_ns"] / 1e9),
+                    on_demand=True
+                ))
+
     return reports
 
 
 @router.get("/{scan_id}/download/{format}")
-async def download_report(scan_id: str, format: str):
+async def download_report(scan_id: str, format: str, request: Request):
     """
     Descarga un reporte en el formato especificado.
-    
+
     Formatos soportados: json, html, txt, md
+
+    Los formatos se renderizan desde el análisis la primera vez que se piden
+    y se sirven desde caché después. Responde 304 si el ETag del cliente
+    sigue vigente, usa variantes gzip/brotli según Accept-Encoding y admite
+    descargas parciales con el header Range.
     """
     valid_formats = ['json', 'html', 'txt', 'md']
     if format not in valid_formats:
@@ -62,49 +109,143 @@ async def download_report(scan_id: str, format: str):
             status_code=400,
             detail=f"Formato inválido. Opciones: {', '.join(valid_formats)}"
         )
-    
-    report_path = Path(f"./reports/scan_{scan_id}.{format}")
-    
-    if not report_path.exists():
+
+    range_header = request.headers.get("range")
+
+    # Los rangos se sirven siempre sobre la representación sin comprimir
+    accept_encoding = "" if range_header else request.headers.get("accept-encoding", "")
+
+    headers = {
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept-Encoding",
+        "Accept-Ranges": "bytes"
+    }
+
+    # El ETag solo necesita el hash del análisis: un 304 no renderiza nada
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        etag = await run_in_threadpool(report_cache.etag, scan_id, format, accept_encoding)
+        if etag is not None and ReportCache.etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={**headers, "ETag": etag})
+
+    try:
+        cached = await run_in_threadpool(report_cache.resolve, scan_id, format, accept_encoding)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error renderizando reporte: {str(e)}"
+        )
+
+    if cached is None:
         raise HTTPException(
             status_code=404,
-            detail=f"Reporte no encontrado: {report_path.name}"
+            detail=f"Reporte no encontrado: scan_{scan_id}.{format}"
         )
-    
-    # Determinar media type
-    media_types = {
-        'json': 'application/json',
-        'html': 'text/html',
-        'txt': 'text/plain',
-        'md': 'text/markdown'
-    }
-    
+
+    headers["ETag"] = cached.etag
+
+    if cached.encoding:
+        headers["Content-Encoding"] = cached.encoding
+
+    media_type = MEDIA_TYPES.get(format, 'application/octet-stream')
+    headers["Content-Disposition"] = f'attachment; filename="scan_report_{scan_id}.{format}"'
+
+    # If-Range: si el ETag no coincide (comparación fuerte) se envía el archivo completo
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() == cached.etag):
+        size = cached.path.stat().st_size
+        byte_range = _parse_range(range_header, size)
+
+        if byte_range == "unsatisfiable":
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                report_catalog.iter_file_range(cached.path, start, end + 1),
+                status_code=206,
+                media_type=media_type,
+                headers=headers
+            )
+
     return FileResponse(
-        path=str(report_path),
-        media_type=media_types.get(format, 'application/octet-stream'),
-        filename=f"scan_report_{scan_id}.{format}"
+        path=str(cached.path),
+        media_type=media_type,
+        headers=headers
     )
 
 
 @router.get("/{scan_id}/preview")
-async def preview_report(scan_id: str):
+async def preview_report(
+    scan_id: str,
+    section: Optional[str] = Query(None, description="Sección de primer nivel (summary, vulnerabilities, ports...)"),
+    page: Optional[int] = Query(None, ge=1, description="Página de elementos si la sección es una lista"),
+    page_size: int = Query(50, ge=1, le=1000, description="Elementos por página")
+):
     """
     Obtiene una vista previa del reporte en formato JSON.
+
+    Sin parámetros devuelve el análisis completo. Con `section` devuelve solo
+    esa sección y con `page` una página de sus elementos; en ambos casos los
+    bytes se leen del archivo usando el índice del catálogo, sin cargar el
+    JSON completo en memoria.
     """
-    report_path = Path(f"./reports/scan_{scan_id}.json")
-    
-    if not report_path.exists():
+    json_path = await run_in_threadpool(report_catalog.json_path, scan_id)
+
+    if json_path is None:
         raise HTTPException(
             status_code=404,
             detail="Reporte no encontrado"
         )
-    
-    try:
-        with open(report_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        return data
-    except Exception as e:
+
+    if section is None:
+        return FileResponse(path=str(json_path), media_type="application/json")
+
+    # La búsqueda en el catálogo puede reindexar el análisis: fuera del event
+    # loop (StreamingResponse ya itera los bloques en el threadpool)
+    if page is None:
+        stream = await run_in_threadpool(report_catalog.stream_section, scan_id, section)
+    else:
+        stream = await run_in_threadpool(report_catalog.stream_items, scan_id, section, page, page_size)
+
+    if stream is None:
         raise HTTPException(
-            status_code=500,
-            detail=f"Error leyendo reporte: {str(e)}"
+            status_code=404,
+            detail=f"Sección no encontrada: {section}"
         )
+
+    return StreamingResponse(stream, media_type="application/json")
+
+
+def _parse_range(range_header: str, size: int):
+    """
+    Interpreta un header Range de un único rango de bytes.
+
+    Returns:
+        (inicio, fin) inclusivos, "unsatisfiable", o None si el header no es
+        válido o pide varios rangos (se responde con el archivo completo)
+    """
+    match = RANGE_PATTERN.match(range_header.strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+
+    if not first:
+        # Sufijo: los últimos N bytes
+        length = int(last)
+        if length == 0:
+            return "unsatisfiable"
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return "unsatisfiable"
+
+    return start, min(end, size - 1)
@@ -5,12 +5,15 @@ Endpoints para gestionar escaneos de vulnerabilidades.
 """
 
 from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from datetime import datetime
 import uuid
 import sys
 import json
+import time
 from pathlib import Path
 
 # Importar módulos de scanagent
@@ -19,18 +22,33 @@ sys.path.insert(0, str(src_path))
 
 from scanagent.agent import ScanAgent
 from scanagent.database import DatabaseManager
+from scanagent.interpreter import VulnerabilityInterpreter
+from scanagent.parser import ScanParser
+from scanagent import serialization
 
 # Importar gestor de archivos
 from webapp.utils.file_manager import FileRetentionManager
-from webapp.utils.report_parser import ScanResultParser, VulnerabilityAnalyzer
+from webapp.utils.report_parser import ScanResultParser, WebAnalysis
+from webapp.utils.report_catalog import ReportCatalog
+from webapp.utils.progress import ProgressBroker
+from webapp.utils.output_tail import OutputTail
+from webapp.utils.metrics import (
+    command_duration, db_query_duration, phase_duration, scan_duration, scans_finished
+)
 
 router = APIRouter()
 db = DatabaseManager()
 file_manager = FileRetentionManager()
+report_catalog = ReportCatalog(reports_dir="./reports")
+progress_broker = ProgressBroker()
+output_tail = OutputTail()
 
 # Estado de escaneos activos
 active_scans = {}
 
+# Agentes de los escaneos en ejecución (para poder cancelarlos)
+running_agents = {}
+
 
 class ScanRequest(BaseModel):
     """Modelo de petición para iniciar un escaneo"""
@@ -41,6 +59,10 @@ class ScanRequest(BaseModel):
         description="Formatos de reporte: json, html, txt, md"
     )
     save_to_db: bool = Field(default=True, description="Guardar en base de datos")
+    max_age: int = Field(
+        default=0, ge=0,
+        description="Reutilizar salidas de sondas cacheables (cabeceras HTTP, certificados TLS) con esta antigüedad máxima en segundos (0 = sin caché)"
+    )
 
 
 class ScanStatus(BaseModel):
@@ -98,7 +120,8 @@ async def start_scan(request: ScanRequest, background_tasks: BackgroundTasks):
         "started_at": datetime.now(),
         "completed_at": None,
         "output_formats": request.output_formats,
-        "save_to_db": request.save_to_db
+        "save_to_db": request.save_to_db,
+        "max_age": request.max_age
     }
     
     active_scans[scan_id] = scan_status
@@ -150,7 +173,8 @@ async def list_scans(limit: int = 20, status: Optional[str] = None):
     
     # Obtener escaneos completados de la BD
     try:
-        db_scans = db.get_all_scans(limit=limit)
+        with db_query_duration.time(operation="get_all_scans"):
+            db_scans = db.get_all_scans(limit=limit)
         for db_scan in db_scans:
             if db_scan['id'] not in active_scans:
                 scans.append({
@@ -184,6 +208,11 @@ async def list_scans(limit: int = 20, status: Optional[str] = None):
 async def cancel_scan(scan_id: str):
     """
     Cancela un escaneo en ejecución.
+    
+    La herramienta en curso y sus procesos hijos se terminan (SIGTERM y,
+    tras un periodo de gracia, SIGKILL) y su hueco en el scheduler queda
+    libre. Lo que ya se había generado se analiza y se reporta como
+    resultado parcial.
     """
     if scan_id not in active_scans:
         raise HTTPException(status_code=404, detail="Escaneo no encontrado")
@@ -191,125 +220,364 @@ async def cancel_scan(scan_id: str):
     if active_scans[scan_id]["status"] == "completed":
         raise HTTPException(status_code=400, detail="El escaneo ya está completado")
     
-    # Marcar como cancelado
-    active_scans[scan_id]["status"] = "cancelled"
-    active_scans[scan_id]["message"] = "Escaneo cancelado por el usuario"
-    active_scans[scan_id]["completed_at"] = datetime.now()
+    # Marcar como cancelado (un escaneo aún en cola ya no arrancará)
+    update_scan_status(
+        scan_id,
+        status="cancelled",
+        message="Escaneo cancelado por el usuario",
+        completed_at=datetime.now()
+    )
+    
+    agent = running_agents.get(scan_id)
+    if agent is not None:
+        await run_in_threadpool(agent.cancel)
     
     return {"message": "Escaneo cancelado", "scan_id": scan_id}
 
 
-async def execute_scan(scan_id: str, request: ScanRequest):
+@router.post("/{scan_id}/resume", response_model=ScanStatus)
+async def resume_scan(scan_id: str, background_tasks: BackgroundTasks):
+    """
+    Reanuda un escaneo fallido o cancelado.
+    
+    Se reutiliza su directorio de salida: los comandos que el manifiesto
+    (scan_manifest.json) da por completados y cuya salida no ha cambiado
+    no se vuelven a ejecutar.
+    """
+    scan = active_scans.get(scan_id)
+    if scan is not None and scan["status"] in ("pending", "running"):
+        raise HTTPException(status_code=409, detail="El escaneo sigue en ejecución")
+    if scan is not None and scan["status"] == "completed":
+        raise HTTPException(status_code=400, detail="El escaneo ya está completado")
+    
+    # Sin estado en memoria (p. ej. tras reiniciar el servidor): el
+    # objetivo y el perfil se toman del manifiesto
+    if scan is None:
+        manifest_path = Path(f"./outputs/scan_{scan_id}") / "scan_manifest.json"
+        try:
+            manifest = await run_in_threadpool(serialization.load, manifest_path)
+        except (OSError, ValueError):
+            raise HTTPException(status_code=404, detail="No hay un escaneo reanudable con ese ID")
+        scan = {"target": manifest.get("target"), "profile": manifest.get("profile")}
+    
+    request = ScanRequest(
+        target=scan["target"],
+        profile=scan["profile"],
+        output_formats=scan.get("output_formats", ["json", "html"]),
+        save_to_db=scan.get("save_to_db", True),
+        max_age=scan.get("max_age", 0)
+    )
+    
+    scan_status = {
+        "scan_id": scan_id,
+        "target": request.target,
+        "profile": request.profile,
+        "status": "pending",
+        "progress": 0,
+        "message": "Reanudación en cola",
+        "started_at": datetime.now(),
+        "completed_at": None,
+        "output_formats": request.output_formats,
+        "save_to_db": request.save_to_db,
+        "max_age": request.max_age
+    }
+    
+    active_scans[scan_id] = scan_status
+    background_tasks.add_task(execute_scan, scan_id, request, True)
+    
+    return ScanStatus(**scan_status)
+
+
+@router.get("/{scan_id}/findings")
+async def get_partial_findings(scan_id: str):
+    """
+    Hallazgos preliminares detectados mientras las herramientas se ejecutaban.
+    
+    Son orientativos: el análisis definitivo está en el reporte del escaneo.
+    """
+    with db_query_duration.time(operation="get_partial_findings"):
+        findings = await run_in_threadpool(db.get_partial_findings, scan_id)
+    if not findings and scan_id not in active_scans:
+        raise HTTPException(status_code=404, detail="Escaneo no encontrado")
+    
+    return {"scan_id": scan_id, "total": len(findings), "findings": findings}
+
+
+def open_output_tail(scan_id: str) -> None:
+    """
+    Comprueba que se puede seguir la salida de un escaneo.
+    
+    Un escaneo pendiente aún no tiene buffer: se crea para que el cliente
+    espere a la primera línea.
+    """
+    if scan_id in output_tail:
+        return
+    
+    status = active_scans.get(scan_id)
+    if status is None or status["status"] not in ("pending", "running"):
+        raise HTTPException(status_code=404, detail="Salida no disponible para este escaneo")
+    output_tail.open(scan_id)
+
+
+@router.get("/{scan_id}/output")
+async def stream_scan_output(scan_id: str, offset: int = 0):
+    """
+    Sigue en vivo la salida de las herramientas de un escaneo (HTTP chunked).
+    
+    Devuelve texto plano a medida que nmap, nikto, etc. lo producen y cierra
+    la respuesta al terminar la fase de escaneo. Un cliente lento no frena
+    el escaneo: si se queda atrás más que el buffer, se indica el salto.
+    """
+    open_output_tail(scan_id)
+    
+    async def generate():
+        current = None
+        async for message in output_tail.follow(scan_id, offset):
+            if message["type"] == "gap":
+                yield f"\n[... {message['skipped']} caracteres omitidos ...]\n"
+                continue
+            
+            source = (message["tool"], message["stream"])
+            if source != current:
+                current = source
+                label = message["tool"] if message["stream"] == "stdout" else f"{message['tool']} (stderr)"
+                yield f"\n==> {label} <==\n"
+            yield message["data"]
+    
+    return StreamingResponse(generate(), media_type="text/plain; charset=utf-8",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+# Campos del estado que se envían en cada evento "status"
+STATUS_EVENT_FIELDS = ("status", "progress", "message", "vulnerabilities_count", "partial_findings")
+
+# Rango de progreso asignado a la ejecución de comandos y a cada fase del agente
+COMMAND_PROGRESS_RANGE = (30, 60)
+PHASE_PROGRESS = {
+    "parsing": 62,
+    "interpretation": 68,
+    "reports": 72,
+    "database": 76,
+    "dashboard": 78
+}
+
+
+def update_scan_status(scan_id: str, **fields):
+    """
+    Actualiza el estado de un escaneo y lo notifica a los clientes WebSocket.
+    
+    Se puede llamar desde el event loop o desde el hilo del escaneo.
+    """
+    status = active_scans.get(scan_id)
+    if status is None:
+        return
+    
+    status.update(fields)
+    
+    event = {"type": "status"}
+    for key in STATUS_EVENT_FIELDS:
+        if key in status:
+            event[key] = status[key]
+    progress_broker.publish(scan_id, event)
+
+
+def handle_scan_event(scan_id: str, event: dict):
+    """
+    Reenvía los eventos del escáner y del agente a los clientes y traduce
+    los relevantes a progreso del escaneo.
+    
+    Se ejecuta en el hilo del escaneo.
+    """
+    progress_broker.publish(scan_id, event)
+    
+    event_type = event.get("type")
+    if event_type == "finding":
+        # El hallazgo ya llegó a los clientes; solo se cuenta en el estado
+        status = active_scans.get(scan_id)
+        if status is not None:
+            status["partial_findings"] = status.get("partial_findings", 0) + 1
+    elif event_type == "command_started":
+        low, high = COMMAND_PROGRESS_RANGE
+        step, total = event.get("step", 0), event.get("total", 0)
+        if total:
+            update_scan_status(
+                scan_id,
+                progress=low + (high - low) * (step - 1) // total,
+                message=f"[{step}/{total}] Ejecutando {event.get('tool')}..."
+            )
+    elif event_type == "command_finished":
+        # Solo ejecuciones reales: las servidas desde caché o reanudadas no
+        # dicen nada del tiempo de la herramienta
+        if "duration" in event and not event.get("cached") and not event.get("resumed"):
+            command_duration.observe(event["duration"], tool=event.get("tool", ""),
+                                     success=str(bool(event.get("success"))).lower())
+    elif event_type == "command_queued":
+        update_scan_status(
+            scan_id,
+            message=f"[{event.get('step')}/{event.get('total')}] En cola: esperando hueco para {event.get('tool')}..."
+        )
+    elif event_type == "phase" and event.get("phase") in PHASE_PROGRESS:
+        update_scan_status(
+            scan_id,
+            progress=PHASE_PROGRESS[event["phase"]],
+            message=event.get("message", "Procesando resultados...")
+        )
+
+
+def run_scan_agent(scan_id: str, request: ScanRequest, output_dir: str,
+                   resume: bool = False) -> Tuple[ScanAgent, Optional[bool]]:
+    """
+    Crea el agente, ejecuta las herramientas y procesa los resultados.
+    
+    Todo ocurre en la misma llamada a run_in_threadpool: la conexión de
+    SQLite del DatabaseManager queda ligada al hilo que la abre, y dos
+    llamadas sucesivas al threadpool pueden caer en hilos distintos.
+    
+    Returns:
+        (agente, éxito de agent.run); None si el escaneo se canceló antes
+        de generar salida
+    """
+    # Crear agente
+    output_tail.open(scan_id)
+    agent = ScanAgent(
+        verbose=True,
+        use_database=request.save_to_db,
+        on_event=lambda event: handle_scan_event(scan_id, event),
+        on_output=lambda tool, stream, text: output_tail.append(scan_id, tool, stream, text),
+        max_age=request.max_age
+    )
+    running_agents[scan_id] = agent
+    
+    # Ejecutar escaneo
+    update_scan_status(scan_id, progress=30, message=f"Escaneando {request.target}...")
+    
+    # execute_scan solo retorna bool
+    try:
+        success = agent.execute_scan(
+            target=request.target,
+            profile=request.profile,
+            outputs_dir=output_dir,
+            scan_ref=scan_id,
+            resume=resume
+        )
+    finally:
+        # Fin de la salida en vivo: los clientes que la siguen terminan
+        output_tail.close(scan_id)
+    
+    # Cancelado: se analiza la salida parcial, si la hay
+    if agent.cancelled and not agent.scanner.results['outputs_generated']:
+        return agent, None
+    if not success and not agent.cancelled:
+        raise Exception("El escaneo de red falló")
+    
+    # Ahora ejecutar el procesamiento con run()
+    update_scan_status(scan_id, progress=60, message="Procesando resultados...")
+    
+    # run() hace parsing, análisis y guarda en la BD; los informes del
+    # servicio web salen de agent.context (generate_basic_reports)
+    processing_success = False
+    try:
+        processing_success = agent.run(
+            target_ip=request.target,
+            output_format=None,
+            outputs_dir=output_dir,
+            profile_used=request.profile
+        )
+        if not processing_success:
+            print(f"⚠️  agent.run() retornó False para {scan_id}")
+    except Exception as run_error:
+        print(f"⚠️  Error en agent.run(): {run_error}")
+        import traceback
+        traceback.print_exc()
+    
+    return agent, processing_success
+
+
+async def execute_scan(scan_id: str, request: ScanRequest, resume: bool = False):
     """
     Ejecuta el escaneo en background.
+    
+    El trabajo bloqueante (herramientas, parsing, reportes) corre en el
+    threadpool para que el event loop pueda enviar el progreso por WebSocket
+    mientras tanto.
+    
+    Con resume=True se reutiliza la salida de una ejecución anterior del
+    mismo scan_id y solo se lanzan los comandos pendientes.
     """
+    # Cancelado mientras estaba en cola
+    if active_scans.get(scan_id, {}).get("status") == "cancelled":
+        return
+    
+    started = time.perf_counter()
     try:
         # Actualizar estado
-        active_scans[scan_id]["status"] = "running"
-        active_scans[scan_id]["progress"] = 10
-        active_scans[scan_id]["message"] = "Iniciando escaneo..."
+        update_scan_status(scan_id, status="running", progress=10, message="Iniciando escaneo...")
         
         # Crear directorios necesarios
         Path("./outputs").mkdir(parents=True, exist_ok=True)
         Path("./reports").mkdir(parents=True, exist_ok=True)
         
-        # Crear agente
-        agent = ScanAgent(verbose=True, use_database=request.save_to_db)
-        
-        # Ejecutar escaneo
-        active_scans[scan_id]["progress"] = 30
-        active_scans[scan_id]["message"] = f"Escaneando {request.target}..."
-        
         output_dir = f"./outputs/scan_{scan_id}"
         
-        # execute_scan solo retorna bool
-        success = agent.execute_scan(
-            target=request.target,
-            profile=request.profile,
-            outputs_dir=output_dir
+        # Escaneo y procesamiento en un solo hilo del threadpool (ver run_scan_agent)
+        agent, processing_success = await run_in_threadpool(
+            run_scan_agent, scan_id, request, output_dir, resume
         )
+        cancelled = agent.cancelled
+        if processing_success is None:
+            return
+        
+        if agent.context:
+            for phase, seconds in agent.context.phase_timings.items():
+                phase_duration.observe(seconds, phase=phase)
         
-        if not success:
-            raise Exception("El escaneo de red falló")
+        # Análisis del servicio web: solo se escribe scan_{id}.json; los
+        # demás formatos se renderizan bajo demanda a partir de él
+        update_scan_status(scan_id, progress=80, message="Generando reportes...")
         
-        # Ahora ejecutar el procesamiento con run()
-        active_scans[scan_id]["progress"] = 60
-        active_scans[scan_id]["message"] = "Procesando resultados..."
+        reports = []
+        
+        # Conteo desde el contexto en memoria del agente (sin releer JSON)
+        vuln_count = agent.context.vulnerability_count if agent.context else 0
+        
+        if not processing_success:
+            print(f"⚠️  Procesamiento incompleto para {scan_id}, se completa el análisis pendiente")
         
-        # run() hace parsing, análisis y genera reportes
-        processing_success = False
         try:
-            processing_success = agent.run(
-                target_ip=request.target,
-                output_format="all",  # Genera todos los formatos
-                outputs_dir=output_dir,
-                profile_used=request.profile
+            basic_reports, scan_data = await run_in_threadpool(
+                generate_basic_reports,
+                scan_id=scan_id,
+                target=request.target,
+                profile=request.profile,
+                output_dir=output_dir,
+                formats=request.output_formats,
+                parsed_data=agent.context.parsed_data if agent.context else None,
+                analysis=agent.context.analysis if agent.context else None
             )
-            if not processing_success:
-                print(f"⚠️  agent.run() retornó False para {scan_id}")
-        except Exception as run_error:
-            print(f"⚠️  Error en agent.run(): {run_error}")
+            reports.extend(basic_reports)
+            vuln_count = len(scan_data["vulnerabilities"])
+            print(f"✅ Reportes generados: {basic_reports}")
+        except Exception as e:
+            print(f"❌ Error generando reportes: {e}")
             import traceback
             traceback.print_exc()
         
-        # Buscar reportes generados
-        active_scans[scan_id]["progress"] = 80
-        active_scans[scan_id]["message"] = "Recopilando reportes..."
-        
-        reports = []
-        report_dir = Path("./reports")
-        
-        # Los reportes se guardan con el nombre informe_tecnico.*
-        for fmt in request.output_formats:
-            report_file = report_dir / f"informe_tecnico.{fmt}"
-            if report_file.exists():
-                # Renombrar con el scan_id
-                new_name = report_dir / f"scan_{scan_id}.{fmt}"
-                report_file.rename(new_name)
-                reports.append(str(new_name))
-        
-        # Si no se generaron reportes, crear reportes básicos desde archivos raw
-        if not reports:
-            print(f"⚠️  No se encontraron reportes, generando reportes básicos para {scan_id}")
-            print(f"   processing_success={processing_success}, formats={request.output_formats}")
-            active_scans[scan_id]["message"] = "Generando reportes básicos..."
-            
-            try:
-                # Generar reportes básicos desde archivos raw
-                basic_reports = generate_basic_reports(
-                    scan_id=scan_id,
-                    target=request.target,
-                    profile=request.profile,
-                    output_dir=output_dir,
-                    formats=request.output_formats
-                )
-                reports.extend(basic_reports)
-                print(f"✅ Reportes básicos generados: {basic_reports}")
-            except Exception as e:
-                print(f"❌ Error generando reportes básicos: {e}")
-                import traceback
-                traceback.print_exc()
-        
-        # Contar vulnerabilidades del análisis
-        vuln_count = 0
-        # Intentar leer desde el archivo JSON generado
-        json_report = report_dir / f"scan_{scan_id}.json"
-        if json_report.exists():
-            try:
-                with open(json_report, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if isinstance(data, dict):
-                        vuln_count = len(data.get('vulnerabilities', []))
-            except Exception as e:
-                print(f"⚠️  Error leyendo JSON: {e}")
+        # Indexar los reportes para los endpoints de descarga y vista previa
+        try:
+            await run_in_threadpool(report_catalog.register, scan_id)
+        except Exception as e:
+            print(f"⚠️  Error indexando reportes: {e}")
         
         # Completado
-        active_scans[scan_id]["status"] = "completed"
-        active_scans[scan_id]["progress"] = 100
-        active_scans[scan_id]["message"] = "Escaneo completado exitosamente"
-        active_scans[scan_id]["completed_at"] = datetime.now()
-        active_scans[scan_id]["reports"] = reports
-        active_scans[scan_id]["vulnerabilities_count"] = vuln_count
+        update_scan_status(
+            scan_id,
+            status="cancelled" if cancelled else "completed",
+            progress=100,
+            message="Escaneo cancelado: resultados parciales" if cancelled else "Escaneo completado exitosamente",
+            completed_at=datetime.now(),
+            reports=reports,
+            vulnerabilities_count=vuln_count
+        )
         
         # Guardar metadata para gestión de archivos
         scan_metadata = {
@@ -323,7 +591,9 @@ async def execute_scan(scan_id: str, request: ScanRequest):
             "vulnerabilities_count": vuln_count,
             "reports": reports,
             "size_bytes": sum(Path(r).stat().st_size for r in reports if Path(r).exists()),
-            "retention_priority": "high" if vuln_count > 10 else "normal"
+            "retention_priority": "high" if vuln_count > 10 else "normal",
+            "cache": agent.scanner.results.get("cache"),
+            "cancelled": cancelled
         }
         file_manager.save_scan_metadata(scan_id, scan_metadata)
         
@@ -335,32 +605,57 @@ async def execute_scan(scan_id: str, request: ScanRequest):
         print(error_detail)
         
         # Actualizar estado
-        active_scans[scan_id]["status"] = "failed"
-        active_scans[scan_id]["progress"] = 0
-        active_scans[scan_id]["message"] = f"Error: {str(e)}"
-        active_scans[scan_id]["completed_at"] = datetime.now()
-        active_scans[scan_id]["reports"] = []
-        active_scans[scan_id]["vulnerabilities_count"] = 0
+        update_scan_status(
+            scan_id,
+            status="failed",
+            progress=0,
+            message=f"Error: {str(e)}",
+            completed_at=datetime.now(),
+            reports=[],
+            vulnerabilities_count=0
+        )
+    finally:
+        running_agents.pop(scan_id, None)
+        status = active_scans.get(scan_id, {}).get("status", "failed")
+        scan_duration.observe(time.perf_counter() - started, profile=request.profile, status=status)
+        scans_finished.inc(status=status)
 
 
 def generate_basic_reports(scan_id: str, target: str, profile: str, 
-                          output_dir: str, formats: List[str]) -> List[str]:
+                          output_dir: str, formats: List[str],
+                          parsed_data: Optional[dict] = None,
+                          analysis: Optional[dict] = None) -> Tuple[List[str], dict]:
     """
-    Genera reportes profesionales usando ScanResultParser y VulnerabilityAnalyzer.
-    Parsea archivos raw del escaneo y crea reportes estructurados con análisis de riesgo.
+    Genera reportes profesionales con el parseo (ScanParser) y el análisis
+    (VulnerabilityInterpreter) de scanagent, traducidos al esquema web por
+    ScanResultParser y WebAnalysis.
+    
+    Solo escribe el análisis en JSON; `formats` indica los formatos que el
+    usuario solicitó, que quedan disponibles para renderizado bajo demanda.
+    
+    Args:
+        parsed_data: Datos ya parseados por ScanAgent.run (agent.context);
+            solo si faltan se parsean los archivos raw de output_dir
+        analysis: Análisis de ScanAgent.run (agent.context); solo si falta
+            se analiza aquí con VulnerabilityInterpreter
+    
+    Returns:
+        (reportes escritos, análisis en memoria)
     """
     reports = []
     report_dir = Path("./reports")
     report_dir.mkdir(parents=True, exist_ok=True)
     output_path = Path(output_dir)
     
-    # Parsear archivos raw usando el parser
-    parser = ScanResultParser()
-    parsed_data = parser.parse_all_files(output_path, target)
+    # Cada archivo raw se parsea y se analiza una sola vez por escaneo: se
+    # reutiliza el resultado del agente si llegó a completarse
+    if not parsed_data and output_path.exists():
+        parsed_data = ScanParser(str(output_path)).parse_all(target)
+    if not analysis:
+        analysis = VulnerabilityInterpreter(parsed_data).analyze() if parsed_data else {}
     
-    # Analizar vulnerabilidades
-    analyzer = VulnerabilityAnalyzer(parsed_data)
-    analysis = analyzer.analyze()
+    parsed_data = ScanResultParser().from_parsed_data(parsed_data or {}, target)
+    analysis = WebAnalysis(analysis, parsed_data).build()
     
     # Crear estructura de datos completa
     scan_data = {
@@ -368,9 +663,14 @@ def generate_basic_reports(scan_id: str, target: str, profile: str,
         "target": target,
         "profile": profile,
         "timestamp": datetime.now().isoformat(),
-        "host_info": parsed_data.get("host", {}),
+        "host_info": {
+            "status": "up" if parsed_data.get("host_up") else "down",
+            "latency": f"{parsed_data['latency_ms']} ms" if parsed_data.get("latency_ms") is not None else "",
+            "os": parsed_data.get("os", "Unknown"),
+            "cpe": parsed_data.get("os_cpe", "")
+        },
         "ports": parsed_data.get("ports", []),
-        "http_headers": parsed_data.get("http_headers", {}),
+        "http_headers": parsed_data.get("headers", {}),
         "directories": parsed_data.get("directories", []),
         "vulnerabilities": analysis.get("findings", []),
         "risk_score": analysis.get("risk_score", 0),
@@ -387,41 +687,13 @@ def generate_basic_reports(scan_id: str, target: str, profile: str,
         }
     }
     
-    # Generar reportes en formatos solicitados
-    for fmt in formats:
-        try:
-            report_path = report_dir / f"scan_{scan_id}.{fmt}"
-            
-            if fmt == "json":
-                with open(report_path, 'w', encoding='utf-8') as f:
-                    json.dump(scan_data, f, indent=2, ensure_ascii=False)
-                reports.append(str(report_path))
-                
-            elif fmt == "html":
-                html_content = generate_professional_html_report(scan_data)
-                with open(report_path, 'w', encoding='utf-8') as f:
-                    f.write(html_content)
-                reports.append(str(report_path))
-                
-            elif fmt == "txt":
-                txt_content = generate_professional_txt_report(scan_data)
-                with open(report_path, 'w', encoding='utf-8') as f:
-                    f.write(txt_content)
-                reports.append(str(report_path))
-                
-            elif fmt == "md":
-                md_content = generate_professional_md_report(scan_data)
-                with open(report_path, 'w', encoding='utf-8') as f:
-                    f.write(md_content)
-                reports.append(str(report_path))
-                
-                
-        except Exception as e:
-            print(f"❌ Error generando reporte {fmt}: {e}")
-            import traceback
-            traceback.print_exc()
+    # Solo se persiste el análisis: html/txt/md se renderizan bajo demanda
+    # desde /api/reports/{scan_id}/download/{format} (ver ReportCache)
+    report_path = report_dir / f"scan_{scan_id}.json"
+    serialization.dump(scan_data, report_path, pretty=True)
+    reports.append(str(report_path))
     
-    return reports
+    return reports, scan_data
 
 
 def generate_professional_html_report(scan_data: dict) -> str:
@@ -6,9 +6,11 @@ FastAPI application para interfaz web de Scan Agent.
 
 Características:
 - API REST para ejecutar escaneos
-- WebSocket para progreso en tiempo real
+- WebSocket para progreso en tiempo real (por escaneo y global)
+- Salida en vivo de las herramientas (WebSocket y HTTP chunked)
 - Gestión de historial de escaneos
 - Exportación de reportes
+- Métricas en formato Prometheus (/metrics)
 
 Autor: Scan Agent Team
 Versión: 1.0.0
@@ -16,10 +18,12 @@ Versión: 1.0.0
 
 import sys
 from pathlib import Path
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from typing import Optional
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
@@ -29,6 +33,11 @@ sys.path.insert(0, str(src_path))
 
 # Importar routers de la API
 from webapp.api.scans import router as scans_router
+from webapp.api.scans import active_scans, progress_broker, update_scan_status
+from webapp.api.scans import output_tail, open_output_tail, file_manager
+from webapp.utils.progress import ALL_SCANS
+from webapp.utils.metrics import metrics
+from scanagent.scheduler import scheduler
 from webapp.api.reports import router as reports_router
 from webapp.api.profiles import router as profiles_router
 
@@ -61,32 +70,6 @@ app.include_router(reports_router, prefix="/api/reports", tags=["Reports"])
 app.include_router(profiles_router, prefix="/api/profiles", tags=["Profiles"])
 
 
-# WebSocket Manager para progreso en tiempo real
-class ConnectionManager:
-    """Gestiona conexiones WebSocket para actualizar progreso en tiempo real"""
-    
-    def __init__(self):
-        self.active_connections: dict[str, WebSocket] = {}
-    
-    async def connect(self, scan_id: str, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections[scan_id] = websocket
-    
-    def disconnect(self, scan_id: str):
-        if scan_id in self.active_connections:
-            del self.active_connections[scan_id]
-    
-    async def send_progress(self, scan_id: str, message: dict):
-        if scan_id in self.active_connections:
-            try:
-                await self.active_connections[scan_id].send_json(message)
-            except:
-                self.disconnect(scan_id)
-
-
-manager = ConnectionManager()
-
-
 @app.get("/", response_class=HTMLResponse)
 async def index():
     """Página principal de la aplicación web"""
@@ -95,15 +78,113 @@ async def index():
 
 
 @app.websocket("/ws/{scan_id}")
-async def websocket_endpoint(websocket: WebSocket, scan_id: str):
-    """WebSocket para recibir actualizaciones de progreso del escaneo"""
-    await manager.connect(scan_id, websocket)
+async def websocket_endpoint(websocket: WebSocket, scan_id: str, since: Optional[int] = None):
+    """
+    WebSocket para recibir actualizaciones de progreso del escaneo.
+    
+    Al conectar se reenvían los eventos recientes del escaneo; al reconectar,
+    `?since=<seq>` limita la repetición a los eventos no recibidos.
+    """
+    subscriber = await progress_broker.subscribe(scan_id, websocket, since=since)
+    
+    # La suscripción se libera con cualquier salida, no solo con la desconexión
     try:
+        # Sin historial (p. ej. tras reiniciar el servidor): publicar el estado actual
+        if not progress_broker.history(scan_id) and scan_id in active_scans:
+            update_scan_status(scan_id)
+        
         while True:
             # Mantener la conexión abierta
             await websocket.receive_text()
     except WebSocketDisconnect:
-        manager.disconnect(scan_id)
+        pass
+    finally:
+        progress_broker.unsubscribe(subscriber)
+
+
+@app.websocket("/ws")
+async def all_scans_websocket(websocket: WebSocket):
+    """WebSocket con los eventos de progreso de todos los escaneos (panel de operaciones)"""
+    subscriber = await progress_broker.subscribe(ALL_SCANS, websocket)
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        progress_broker.unsubscribe(subscriber)
+
+
+@app.websocket("/ws/{scan_id}/output")
+async def output_websocket(websocket: WebSocket, scan_id: str, offset: int = 0):
+    """
+    WebSocket con la salida en vivo de las herramientas de un escaneo.
+    
+    Envía mensajes {"type": "output", "offset", "tool", "stream", "data"} y
+    {"type": "gap", ...} si el cliente se quedó atrás; al terminar la fase de
+    escaneo envía {"type": "end", "offset"} y cierra. Para reconectar sin
+    repetir salida, usar `?offset=<offset + len(data)>` del último mensaje.
+    """
+    try:
+        open_output_tail(scan_id)
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+    
+    await websocket.accept()
+    offset_sent = offset
+    try:
+        # El siguiente lote solo se lee cuando el anterior se ha enviado
+        async for message in output_tail.follow(scan_id, offset):
+            await websocket.send_json(message)
+            if message["type"] == "output":
+                offset_sent = message["offset"] + len(message["data"])
+            else:
+                offset_sent = message["offset"] + message["skipped"]
+        await websocket.send_json({"type": "end", "offset": offset_sent})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+
+def collect_service_metrics():
+    """Gauges del estado actual del servicio (ver webapp/utils/metrics.py)"""
+    statuses = [scan.get("status") for scan in list(active_scans.values())]
+    commands = scheduler.stats()
+    storage = file_manager.get_storage_stats()
+    return [
+        ("scanagent_scan_queue_depth", "Escaneos en cola esperando a empezar",
+         [({}, statuses.count("pending"))]),
+        ("scanagent_scans_running", "Escaneos en ejecución",
+         [({}, statuses.count("running"))]),
+        ("scanagent_commands_running", "Comandos de herramientas en ejecución por herramienta",
+         [({"tool": tool}, count) for tool, count in sorted(commands["by_tool"].items())]),
+        ("scanagent_commands_waiting", "Comandos esperando hueco en el scheduler",
+         [({}, commands["waiting"])]),
+        ("scanagent_websocket_subscribers", "Clientes WebSocket suscritos al progreso",
+         [({}, progress_broker.subscriber_count())]),
+        ("scanagent_storage_bytes", "Espacio ocupado por escaneos y reportes",
+         [({}, storage["total_size_mb"] * 1024 * 1024)]),
+        ("scanagent_storage_usage_ratio", "Fracción usada del límite de almacenamiento",
+         [({}, storage["usage_percent"] / 100)]),
+        ("scanagent_stored_scans", "Escaneos guardados por estado de retención",
+         [({"status": "active"}, storage["active_scans"]),
+          ({"status": "archived"}, storage["archived_scans"])])
+    ]
+
+
+metrics.collector(collect_service_metrics)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """
+    Métricas en formato de texto de Prometheus.
+    
+    Se generan en el threadpool: las de almacenamiento recorren el disco.
+    """
+    content = await run_in_threadpool(metrics.render)
+    return PlainTextResponse(content, media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 @app.get("/health")
@@ -8,7 +8,11 @@
 const API_BASE = '/api';
 let currentScanId = null;
 let selectedProfile = null;
-let pollInterval = null;
+let progressSocket = null;
+let outputSocket = null;
+
+// Caracteres de salida en vivo que se mantienen en pantalla
+const LIVE_OUTPUT_LIMIT = 200000;
 
 // ============================================
 // Inicialización
@@ -222,8 +226,9 @@ async function handleScanSubmit(e) {
         // Mostrar sección de progreso
         showProgressSection(result);
         
-        // Iniciar polling de estado
-        startProgressPolling(currentScanId);
+        // Suscribirse al progreso y a la salida en vivo por WebSocket
+        subscribeToProgress(currentScanId);
+        subscribeToOutput(currentScanId);
         
     } catch (error) {
         console.error('Error:', error);
@@ -281,6 +286,7 @@ function showProgressSection(scanStatus) {
     document.getElementById('current-scan-id').textContent = scanStatus.scan_id;
     document.getElementById('current-target').textContent = scanStatus.target;
     document.getElementById('current-profile').textContent = scanStatus.profile;
+    document.getElementById('partial-findings-count').textContent = scanStatus.partial_findings || 0;
     
     updateProgress(scanStatus);
     
@@ -298,33 +304,145 @@ function updateProgress(scanStatus) {
     percentage.textContent = `${scanStatus.progress}%`;
 }
 
-function startProgressPolling(scanId) {
-    // Limpiar polling anterior si existe
-    if (pollInterval) {
-        clearInterval(pollInterval);
+function subscribeToProgress(scanId, since = null) {
+    // Cerrar suscripción anterior si existe
+    if (progressSocket) {
+        progressSocket.onclose = null;
+        progressSocket.close();
     }
     
-    // Polling cada 2 segundos
-    pollInterval = setInterval(async () => {
+    const protocol = window.location.protocol === 'https:' ? 'wss' : 'ws';
+    const query = since !== null ? `?since=${since}` : '';
+    const socket = new WebSocket(`${protocol}://${window.location.host}/ws/${scanId}${query}`);
+    progressSocket = socket;
+    let finished = false;
+    let lastSeq = since;
+    
+    socket.onmessage = (event) => {
+        const data = JSON.parse(event.data);
+        if (data.seq) {
+            lastSeq = data.seq;
+        }
+        
+        if (data.type === 'finding') {
+            addPartialFinding(data.finding);
+            return;
+        }
+        
+        // Solo los eventos de estado actualizan la barra; el resto
+        // (comandos, fases) se reflejan a través del estado
+        if (data.type !== 'status') {
+            return;
+        }
+        
+        updateProgress(data);
+        
+        if (data.status === 'completed') {
+            finished = true;
+            socket.close();
+            showResults(scanId);
+        } else if (data.status === 'failed' || data.status === 'cancelled') {
+            finished = true;
+            socket.close();
+            showToast(`Escaneo ${data.status === 'failed' ? 'fallido' : 'cancelado'}: ${data.message}`, 'error');
+        }
+    };
+    
+    socket.onclose = async () => {
+        if (finished || progressSocket !== socket) {
+            return;
+        }
+        
+        // Conexión perdida (o cerrada por cliente lento): consultar el estado
+        // una vez y reconectar pidiendo solo los eventos no recibidos
         try {
             const response = await fetch(`${API_BASE}/scans/status/${scanId}`);
             const status = await response.json();
-            
             updateProgress(status);
             
-            // Si completó o falló, detener polling
             if (status.status === 'completed') {
-                clearInterval(pollInterval);
                 showResults(scanId);
-            } else if (status.status === 'failed') {
-                clearInterval(pollInterval);
-                showToast(`Escaneo fallido: ${status.message}`, 'error');
+                return;
+            }
+            if (status.status === 'failed' || status.status === 'cancelled') {
+                showToast(`Escaneo ${status.status === 'failed' ? 'fallido' : 'cancelado'}: ${status.message}`, 'error');
+                return;
             }
-            
         } catch (error) {
-            console.error('Error polling status:', error);
+            console.error('Error consultando estado:', error);
         }
-    }, 2000);
+        
+        setTimeout(() => {
+            if (progressSocket === socket) {
+                subscribeToProgress(scanId, lastSeq);
+            }
+        }, 3000);
+    };
+}
+
+function addPartialFinding(finding) {
+    const counter = document.getElementById('partial-findings-count');
+    counter.textContent = parseInt(counter.textContent || '0', 10) + 1;
+}
+
+function subscribeToOutput(scanId, offset = 0) {
+    if (outputSocket) {
+        outputSocket.onclose = null;
+        outputSocket.close();
+    }
+    
+    const pre = document.getElementById('live-output');
+    if (offset === 0) {
+        pre.textContent = '';
+    }
+    
+    const protocol = window.location.protocol === 'https:' ? 'wss' : 'ws';
+    const socket = new WebSocket(`${protocol}://${window.location.host}/ws/${scanId}/output?offset=${offset}`);
+    outputSocket = socket;
+    let currentSource = null;
+    let finished = false;
+    let nextOffset = offset;
+    
+    socket.onmessage = (event) => {
+        const data = JSON.parse(event.data);
+        let text = '';
+        
+        if (data.type === 'output') {
+            const source = `${data.tool}:${data.stream}`;
+            if (source !== currentSource) {
+                currentSource = source;
+                text += `\n==> ${data.tool}${data.stream === 'stderr' ? ' (stderr)' : ''} <==\n`;
+            }
+            text += data.data;
+            nextOffset = data.offset + data.data.length;
+        } else if (data.type === 'gap') {
+            text = `\n[... ${data.skipped} caracteres omitidos ...]\n`;
+            nextOffset = data.offset + data.skipped;
+        } else if (data.type === 'end') {
+            finished = true;
+            return;
+        }
+        
+        // Mantener solo el final de la salida y seguir la última línea
+        const atBottom = pre.scrollTop + pre.clientHeight >= pre.scrollHeight - 20;
+        pre.textContent = (pre.textContent + text).slice(-LIVE_OUTPUT_LIMIT);
+        if (atBottom) {
+            pre.scrollTop = pre.scrollHeight;
+        }
+    };
+    
+    socket.onclose = () => {
+        if (finished || outputSocket !== socket || currentScanId !== scanId) {
+            return;
+        }
+        
+        // Reconectar desde el último carácter recibido
+        setTimeout(() => {
+            if (outputSocket === socket) {
+                subscribeToOutput(scanId, nextOffset);
+            }
+        }, 3000);
+    };
 }
 
 async function showResults(scanId) {
@@ -336,11 +454,17 @@ async function showResults(scanId) {
     const content = document.getElementById('scan-results-content');
     
     try {
-        const response = await fetch(`${API_BASE}/reports/${scanId}/preview`);
-        const data = await response.json();
+        // Solo se pide la sección de resumen, no el análisis completo
+        const response = await fetch(`${API_BASE}/reports/${scanId}/preview?section=summary`);
+        const summary = await response.json();
         
-        const vulnCount = data.vulnerabilities?.length || 0;
-        const severity = analyzeSeverity(data.vulnerabilities || []);
+        const severity = {
+            critical: summary.critical_findings || 0,
+            high: summary.high_findings || 0,
+            medium: summary.medium_findings || 0,
+            low: (summary.low_findings || 0) + (summary.info_findings || 0)
+        };
+        const vulnCount = severity.critical + severity.high + severity.medium + severity.low;
         
         content.innerHTML = `
             <div class="results-summary">
@@ -374,20 +498,6 @@ async function showResults(scanId) {
     }
 }
 
-function analyzeSeverity(vulnerabilities) {
-    const severity = { critical: 0, high: 0, medium: 0, low: 0 };
-    
-    vulnerabilities.forEach(vuln => {
-        const sev = (vuln.severity || '').toLowerCase();
-        if (sev.includes('critical') || sev.includes('crítico')) severity.critical++;
-        else if (sev.includes('high') || sev.includes('alto')) severity.high++;
-        else if (sev.includes('medium') || sev.includes('medio')) severity.medium++;
-        else severity.low++;
-    });
-    
-    return severity;
-}
-
 // ============================================
 // Historial de Escaneos
 // ============================================
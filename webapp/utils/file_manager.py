@@ -203,7 +203,15 @@ class FileRetentionManager:
             
             for report_file in reports_dir.glob(f"scan_{scan_id}.*"):
                 report_file.unlink()
-            
+
+            # Eliminar renderizados cacheados e índice del catálogo
+            cache_dir = reports_dir / ".cache" / f"scan_{scan_id}"
+            if cache_dir.exists():
+                shutil.rmtree(cache_dir)
+            index_file = reports_dir / ".index" / f"scan_{scan_id}.json"
+            if index_file.exists():
+                index_file.unlink()
+
             # Actualizar metadata
             metadata = self.load_scan_metadata(scan_id)
             if metadata:
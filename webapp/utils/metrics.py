@@ -0,0 +1,203 @@
+"""
+Metrics
+=======
+Métricas del servicio web en formato de exposición de Prometheus (texto
+0.0.4), sin dependencias externas.
+
+Hay dos tipos de métricas:
+- Histogramas y contadores que el código actualiza según ocurren las cosas
+  (duración de escaneos, de comandos, de fases, consultas a la BD...)
+- Gauges que se calculan al pedir /metrics a partir del estado actual
+  (escaneos en cola, suscriptores WebSocket, almacenamiento...), mediante
+  funciones registradas con MetricsRegistry.collector()
+
+Los histogramas son acumulativos y seguros desde cualquier hilo: los
+escaneos los actualizan desde el threadpool.
+
+Autor: Scan Agent Team
+Versión: 1.0.0
+"""
+
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Tuple
+import threading
+import time
+
+# Muestra de un gauge: (etiquetas, valor)
+Sample = Tuple[Dict[str, str], float]
+
+# Gauge calculado: (nombre, descripción, muestras)
+Gauge = Tuple[str, str, List[Sample]]
+
+# Límites para duraciones de escaneos y herramientas (segundos)
+SCAN_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200)
+
+# Límites para operaciones internas: parsing, reportes, BD (segundos)
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Histogram:
+    """Histograma acumulativo con etiquetas"""
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # etiquetas -> [cuentas por bucket, suma, total]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observa la duración del bloque"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted(self._series.items())
+            for key, (counts, total, count) in series:
+                labels = dict(zip(self.labelnames, key))
+                for bound, bucket_count in zip(self.buckets, counts):
+                    bucket_labels = _format_labels({**labels, "le": _format_value(bound)})
+                    lines.append(f"{self.name}_bucket{bucket_labels} {bucket_count}")
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class Counter:
+    """Contador acumulativo con etiquetas"""
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                labels = _format_labels(dict(zip(self.labelnames, key)))
+                lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Conjunto de métricas expuesto en /metrics"""
+
+    def __init__(self):
+        self._metrics: List = []
+        self._collectors: List[Callable[[], List[Gauge]]] = []
+
+    def histogram(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help_text, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, help_text, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, collect: Callable[[], List[Gauge]]) -> None:
+        """
+        Registra una función que calcula gauges al exportar.
+
+        Args:
+            collect: Devuelve [(nombre, descripción, [(etiquetas, valor)])]
+        """
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        """Todas las métricas en formato de texto de Prometheus"""
+        lines = []
+        for collect in self._collectors:
+            for name, help_text, samples in collect():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} gauge")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Instancia compartida por el proceso
+metrics = MetricsRegistry()
+
+scan_duration = metrics.histogram(
+    "scanagent_scan_duration_seconds",
+    "Duración total de los escaneos por perfil y resultado",
+    ("profile", "status"), SCAN_BUCKETS
+)
+command_duration = metrics.histogram(
+    "scanagent_command_duration_seconds",
+    "Duración de los comandos de las herramientas (sin caché ni reanudados)",
+    ("tool", "success"), SCAN_BUCKETS
+)
+phase_duration = metrics.histogram(
+    "scanagent_phase_duration_seconds",
+    "Duración de las fases de análisis (parsing, interpretation, reports, database)",
+    ("phase",)
+)
+report_render_duration = metrics.histogram(
+    "scanagent_report_render_seconds",
+    "Tiempo de renderizado bajo demanda de reportes por formato",
+    ("format",)
+)
+db_query_duration = metrics.histogram(
+    "scanagent_db_query_seconds",
+    "Latencia de las consultas a la base de datos desde la API",
+    ("operation",)
+)
+scans_finished = metrics.counter(
+    "scanagent_scans_finished_total",
+    "Escaneos terminados por resultado",
+    ("status",)
+)
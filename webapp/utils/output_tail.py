@@ -0,0 +1,176 @@
+"""
+Output Tail
+===========
+Salida en vivo de las herramientas de un escaneo (nmap, nikto, gobuster...).
+
+El escáner entrega cada línea de salida a medida que la herramienta la
+produce y OutputTail la guarda en un buffer acotado por escaneo, con
+offsets absolutos (caracteres desde el inicio del escaneo).
+
+Los clientes (WebSocket o HTTP chunked) leen a su ritmo desde su propio
+offset, así que la contrapresión no afecta al escaneo:
+- Un cliente lento recibe los fragmentos pendientes agrupados en lotes
+- Si se queda atrás más de lo que guarda el buffer, recibe un aviso de
+  salto ("gap") con los caracteres omitidos y continúa desde lo disponible
+
+Autor: Scan Agent Team
+Versión: 1.0.0
+"""
+
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Deque, List, Optional, Tuple
+import asyncio
+import threading
+
+# (offset, tool, stream, text)
+Chunk = Tuple[int, str, str, str]
+
+
+class OutputChannel:
+    """Buffer de salida de un escaneo"""
+
+    def __init__(self):
+        self.chunks: Deque[Chunk] = deque()
+        self.size = 0          # Caracteres retenidos en el buffer
+        self.end = 0           # Offset del siguiente carácter
+        self.closed = False
+        self.waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+
+    @property
+    def start(self) -> int:
+        """Offset del carácter más antiguo retenido"""
+        return self.chunks[0][0] if self.chunks else self.end
+
+
+class OutputTail:
+    """Buffers de salida en vivo de los escaneos"""
+
+    # Caracteres retenidos por escaneo
+    BUFFER_SIZE = 1024 * 1024
+
+    # Escaneos con buffer en memoria (se descartan los más antiguos)
+    MAX_CHANNELS = 50
+
+    # Caracteres máximos por lote enviado a un cliente
+    BATCH_SIZE = 64 * 1024
+
+    def __init__(self, buffer_size: int = BUFFER_SIZE, max_channels: int = MAX_CHANNELS,
+                 batch_size: int = BATCH_SIZE):
+        self.buffer_size = buffer_size
+        self.max_channels = max_channels
+        self.batch_size = batch_size
+        self._channels: "OrderedDict[str, OutputChannel]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _channel(self, scan_id: str) -> OutputChannel:
+        """Obtiene o crea el buffer de un escaneo (con el lock tomado)"""
+        channel = self._channels.get(scan_id)
+        if channel is None:
+            channel = self._channels[scan_id] = OutputChannel()
+            while len(self._channels) > self.max_channels:
+                _, evicted = self._channels.popitem(last=False)
+                evicted.closed = True
+                self._wake(evicted)
+        return channel
+
+    def open(self, scan_id: str) -> None:
+        """Prepara el buffer de un escaneo que va a empezar (o se reanuda)"""
+        with self._lock:
+            self._channel(scan_id).closed = False
+
+    def __contains__(self, scan_id: str) -> bool:
+        with self._lock:
+            return scan_id in self._channels
+
+    def append(self, scan_id: str, tool: str, stream: str, text: str) -> None:
+        """Añade salida de una herramienta (seguro desde cualquier hilo)"""
+        if not text:
+            return
+        with self._lock:
+            channel = self._channel(scan_id)
+            channel.chunks.append((channel.end, tool, stream, text))
+            channel.end += len(text)
+            channel.size += len(text)
+            while channel.size > self.buffer_size and len(channel.chunks) > 1:
+                channel.size -= len(channel.chunks.popleft()[3])
+            self._wake(channel)
+
+    def close(self, scan_id: str) -> None:
+        """Marca el fin de la salida de un escaneo"""
+        with self._lock:
+            channel = self._channels.get(scan_id)
+            if channel is not None:
+                channel.closed = True
+                self._wake(channel)
+
+    @staticmethod
+    def _wake(channel: OutputChannel) -> None:
+        """Despierta a los lectores en espera (con el lock tomado)"""
+        for loop, event in channel.waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # Event loop cerrado
+                pass
+        channel.waiters.clear()
+
+    def _read(self, scan_id: str, offset: int) -> Tuple[List[dict], int, bool, Optional[asyncio.Event]]:
+        """
+        Lee un lote desde `offset`.
+
+        Returns:
+            (mensajes, nuevo offset, terminado, evento a esperar si no hay datos)
+        """
+        with self._lock:
+            channel = self._channels.get(scan_id)
+            if channel is None:
+                return [], offset, True, None
+
+            messages = []
+            if offset < channel.start:
+                messages.append({"type": "gap", "offset": offset, "skipped": channel.start - offset})
+                offset = channel.start
+
+            batch = 0
+            for chunk_offset, tool, stream, text in channel.chunks:
+                chunk_end = chunk_offset + len(text)
+                if chunk_end <= offset:
+                    continue
+                text = text[offset - chunk_offset:] if chunk_offset < offset else text
+                last = messages[-1] if messages else None
+                # Agrupar fragmentos consecutivos de la misma herramienta y stream
+                if last and last["type"] == "output" and last["tool"] == tool and last["stream"] == stream:
+                    last["data"] += text
+                else:
+                    messages.append({"type": "output", "offset": offset, "tool": tool,
+                                     "stream": stream, "data": text})
+                offset = chunk_end
+                batch += len(text)
+                if batch >= self.batch_size:
+                    break
+
+            if messages:
+                return messages, offset, False, None
+            if channel.closed:
+                return [], offset, True, None
+
+            event = asyncio.Event()
+            channel.waiters.append((asyncio.get_running_loop(), event))
+            return [], offset, False, event
+
+    async def follow(self, scan_id: str, offset: int = 0) -> AsyncIterator[dict]:
+        """
+        Sigue la salida de un escaneo desde `offset` hasta que termina.
+
+        Produce mensajes {"type": "output", "offset", "tool", "stream", "data"}
+        y {"type": "gap", "offset", "skipped"}. Solo lee el siguiente lote
+        cuando el consumidor ha procesado el anterior.
+        """
+        while True:
+            messages, offset, finished, event = self._read(scan_id, offset)
+            for message in messages:
+                yield message
+            if finished:
+                return
+            if event is not None:
+                await event.wait()
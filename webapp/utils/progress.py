@@ -0,0 +1,206 @@
+"""
+Progress Broker
+===============
+Publicación/suscripción de eventos de progreso de escaneos por WebSocket.
+
+Los escaneos publican eventos (cambios de estado, inicio y fin de cada
+comando, fases de parsing y reportes) y el broker los reparte entre todos
+los clientes suscritos a ese escaneo y al canal "*" (todos los escaneos).
+
+Características:
+- Varios suscriptores por escaneo
+- Buffer circular de eventos recientes por escaneo: un cliente que se
+  conecta tarde (o reconecta con ?since=<seq>) recibe lo que se perdió
+- Cola acotada por cliente: si un cliente no consume a tiempo se le
+  desconecta en lugar de frenar al escaneo que publica
+- Publicación segura desde cualquier hilo
+
+Autor: Scan Agent Team
+Versión: 2.0.0
+"""
+
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional, Set
+import asyncio
+import logging
+import threading
+
+from fastapi import WebSocket
+
+logger = logging.getLogger(__name__)
+
+# Canal que recibe los eventos de todos los escaneos
+ALL_SCANS = "*"
+
+# Código de cierre WebSocket para clientes demasiado lentos (Try Again Later)
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class Subscriber:
+    """Cliente WebSocket suscrito a un canal con su cola de envío"""
+
+    def __init__(self, channel: str, websocket: WebSocket,
+                 loop: asyncio.AbstractEventLoop, queue_size: int):
+        self.channel = channel
+        self.websocket = websocket
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+        self.task: Optional[asyncio.Task] = None
+
+
+class ProgressBroker:
+    """Reparte eventos de progreso entre los clientes suscritos"""
+
+    # Eventos recientes guardados por escaneo
+    HISTORY_SIZE = 256
+
+    # Escaneos con historial en memoria (se descartan los más antiguos)
+    MAX_CHANNELS = 500
+
+    # Eventos pendientes por cliente antes de considerarlo lento
+    QUEUE_SIZE = 512
+
+    def __init__(self, history_size: int = HISTORY_SIZE, queue_size: int = QUEUE_SIZE,
+                 max_channels: int = MAX_CHANNELS):
+        self.history_size = history_size
+        self.queue_size = queue_size
+        self.max_channels = max_channels
+        self._history: "OrderedDict[str, Deque[dict]]" = OrderedDict()
+        self._sequence: Dict[str, int] = {}
+        self._subscribers: Dict[str, Set[Subscriber]] = {}
+        self._lock = threading.Lock()
+
+    def subscriber_count(self, channel: Optional[str] = None) -> int:
+        """Número de suscriptores de un canal (o de todos)"""
+        with self._lock:
+            if channel is not None:
+                return len(self._subscribers.get(channel, ()))
+            return sum(len(subs) for subs in self._subscribers.values())
+
+    def history(self, scan_id: str, since: int = 0) -> List[dict]:
+        """Eventos guardados de un escaneo con seq mayor que `since`"""
+        with self._lock:
+            return [e for e in self._history.get(scan_id, ()) if e["seq"] > since]
+
+    async def subscribe(self, channel: str, websocket: WebSocket,
+                        since: Optional[int] = None) -> Subscriber:
+        """
+        Acepta un WebSocket y lo suscribe a un canal.
+
+        Args:
+            channel: ID del escaneo o ALL_SCANS
+            websocket: Conexión del cliente
+            since: Último seq recibido por el cliente; se reenvía lo posterior.
+                Si es None se reenvía todo el historial del escaneo
+        """
+        await websocket.accept()
+        subscriber = Subscriber(channel, websocket, asyncio.get_running_loop(), self.queue_size)
+
+        with self._lock:
+            # Registrar y copiar el historial bajo el mismo lock: ningún evento
+            # se pierde ni se duplica entre la repetición y los nuevos
+            if channel == ALL_SCANS:
+                replay = []
+            else:
+                replay = [e for e in self._history.get(channel, ()) if e["seq"] > (since or 0)]
+            self._subscribers.setdefault(channel, set()).add(subscriber)
+
+        # La repetición se envía directamente (no cuenta contra la cola); lo
+        # publicado mientras tanto espera en la cola y sale después
+        try:
+            for event in replay:
+                await websocket.send_json(event)
+        except Exception:
+            self.unsubscribe(subscriber)
+            raise
+
+        subscriber.task = asyncio.create_task(self._sender(subscriber))
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Elimina un suscriptor y detiene su envío"""
+        with self._lock:
+            subscribers = self._subscribers.get(subscriber.channel)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[subscriber.channel]
+
+        if subscriber.task and not subscriber.task.done():
+            subscriber.task.cancel()
+
+    def publish(self, scan_id: str, event: dict) -> dict:
+        """
+        Publica un evento de un escaneo desde cualquier hilo.
+
+        El evento se numera (seq), se guarda en el historial del escaneo y se
+        encola para cada suscriptor sin esperar a que se envíe.
+
+        Returns:
+            Evento publicado con scan_id y seq
+        """
+        with self._lock:
+            seq = self._sequence.get(scan_id, 0) + 1
+            self._sequence[scan_id] = seq
+            event = {**event, "scan_id": scan_id, "seq": seq}
+
+            history = self._history.get(scan_id)
+            if history is None:
+                history = self._history[scan_id] = deque(maxlen=self.history_size)
+                while len(self._history) > self.max_channels:
+                    evicted, _ = self._history.popitem(last=False)
+                    self._sequence.pop(evicted, None)
+            else:
+                self._history.move_to_end(scan_id)
+            history.append(event)
+
+            targets = list(self._subscribers.get(scan_id, ())) + \
+                list(self._subscribers.get(ALL_SCANS, ()))
+
+        for subscriber in targets:
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+
+            if running is subscriber.loop:
+                self._enqueue(subscriber, event)
+            else:
+                try:
+                    subscriber.loop.call_soon_threadsafe(self._enqueue, subscriber, event)
+                except RuntimeError:
+                    # Event loop cerrado: el cliente ya no existe
+                    self.unsubscribe(subscriber)
+
+        return event
+
+    def _enqueue(self, subscriber: Subscriber, event: dict) -> None:
+        """Encola un evento; si la cola está llena el cliente se desconecta"""
+        if subscriber.dropped:
+            return
+        try:
+            subscriber.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            subscriber.dropped = True
+            logger.warning(f"Cliente lento desconectado del canal {subscriber.channel}")
+            self.unsubscribe(subscriber)
+            asyncio.ensure_future(self._close(subscriber))
+
+    async def _sender(self, subscriber: Subscriber) -> None:
+        """Envía al cliente los eventos de su cola"""
+        try:
+            while True:
+                event = await subscriber.queue.get()
+                await subscriber.websocket.send_json(event)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            self.unsubscribe(subscriber)
+
+    @staticmethod
+    async def _close(subscriber: Subscriber) -> None:
+        try:
+            await subscriber.websocket.close(code=SLOW_CONSUMER_CLOSE_CODE)
+        except Exception:
+            pass
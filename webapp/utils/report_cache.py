@@ -0,0 +1,292 @@
+"""
+Report Cache
+============
+Renderizado bajo demanda y caché en disco de reportes.
+
+Al finalizar un escaneo solo se persiste el análisis (scan_{id}.json).
+El resto de formatos se renderiza la primera vez que se solicitan y se
+guardan en ./reports/.cache junto con sus variantes comprimidas.
+
+Características:
+- ETag derivado del hash del análisis almacenado (uno por codificación)
+- Soporte para If-None-Match (304 Not Modified)
+- Variantes pre-comprimidas gzip y brotli (si está instalado)
+- Invalidación automática cuando cambia el análisis
+
+Autor: Scan Agent Team
+Versión: 1.0.0
+"""
+
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from webapp.utils.metrics import report_render_duration
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+class CachedReport:
+    """Referencia a un reporte listo para servir"""
+
+    def __init__(self, path: Path, etag: str, encoding: Optional[str] = None):
+        self.path = path
+        self.etag = etag
+        self.encoding = encoding
+
+
+class ReportCache:
+    """Renderiza reportes a partir del análisis y los cachea en disco"""
+
+    # Incrementar si cambia la salida de los renderizadores
+    RENDER_VERSION = "1"
+
+    # Extensión de archivo por cada Content-Encoding soportado
+    ENCODINGS = {
+        "br": ".br",
+        "gzip": ".gz"
+    }
+
+    # Claves de primer nivel del análisis del servicio web
+    # (generate_basic_reports). Un JSON con otro esquema, como el
+    # informe_tecnico.json de la CLI, no se puede renderizar
+    ANALYSIS_KEYS = frozenset({"scan_id", "summary", "vulnerabilities"})
+
+    def __init__(self, reports_dir: str = "./reports",
+                 renderers: Optional[Dict[str, Callable[[dict], str]]] = None):
+        """
+        Inicializa la caché de reportes.
+
+        Args:
+            reports_dir: Directorio donde se guardan los análisis
+            renderers: Función de renderizado por formato (html, txt, md)
+        """
+        self.reports_dir = Path(reports_dir)
+        self.cache_dir = self.reports_dir / ".cache"
+        self.renderers = renderers or {}
+        self._etags: Dict[Path, Tuple[int, int, str]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def is_analysis(cls, keys: Iterable[str]) -> bool:
+        """Indica si las claves de primer nivel de un JSON son las de un análisis renderizable"""
+        return cls.ANALYSIS_KEYS.issubset(keys)
+
+    def available_encodings(self) -> List[str]:
+        """Retorna los Content-Encoding que se pueden servir, por preferencia"""
+        return [enc for enc in self.ENCODINGS if enc != "br" or brotli is not None]
+
+    def source_path(self, scan_id: str, fmt: str) -> Optional[Path]:
+        """
+        Localiza el archivo a partir del cual se sirve un formato.
+
+        Un reporte pre-renderizado (escaneos antiguos) tiene prioridad; si no
+        existe se usa el análisis JSON almacenado.
+        """
+        prerendered = self.reports_dir / f"scan_{scan_id}.{fmt}"
+        if prerendered.exists():
+            return prerendered
+
+        analysis = self.reports_dir / f"scan_{scan_id}.json"
+        if fmt in self.renderers and analysis.exists():
+            return analysis
+
+        return None
+
+    def get_digest(self, source: Path) -> str:
+        """
+        Calcula el hash del archivo fuente de un reporte.
+
+        El hash se memoriza por (mtime, tamaño) para no releer el análisis
+        completo en cada petición.
+        """
+        stat = source.stat()
+        with self._lock:
+            cached = self._etags.get(source)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            digest = cached[2]
+        else:
+            sha = hashlib.sha256()
+            with open(source, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    sha.update(chunk)
+            digest = sha.hexdigest()[:32]
+            with self._lock:
+                self._etags[source] = (stat.st_mtime_ns, stat.st_size, digest)
+
+        return digest
+
+    def etag(self, scan_id: str, fmt: str, accept_encoding: str = "") -> Optional[str]:
+        """
+        ETag del reporte que serviría resolve(), sin renderizar ni comprimir.
+
+        Solo depende del hash de la fuente y de RENDER_VERSION, así que una
+        petición condicional se puede responder con 304 aunque la caché en
+        disco esté vacía.
+
+        Returns:
+            ETag o None si no existe fuente para el formato
+        """
+        source = self.source_path(scan_id, fmt)
+        if source is None:
+            return None
+        return self._etag(self._key(source), fmt, self.negotiate_encoding(accept_encoding))
+
+    def _key(self, source: Path) -> str:
+        return f"{self.get_digest(source)}-v{self.RENDER_VERSION}"
+
+    @staticmethod
+    def _etag(key: str, fmt: str, encoding: Optional[str]) -> str:
+        return f'"{key}-{fmt}-{encoding}"' if encoding else f'"{key}-{fmt}"'
+
+    def resolve(self, scan_id: str, fmt: str,
+                accept_encoding: str = "") -> Optional[CachedReport]:
+        """
+        Obtiene (renderizando si hace falta) el reporte a servir.
+
+        Args:
+            scan_id: ID del escaneo
+            fmt: Formato solicitado (json, html, txt, md)
+            accept_encoding: Valor del header Accept-Encoding del cliente
+
+        Returns:
+            CachedReport o None si no existe análisis para el escaneo (o si
+            el JSON no tiene el esquema del análisis)
+        """
+        source = self.source_path(scan_id, fmt)
+        if source is None:
+            return None
+
+        key = self._key(source)
+
+        # Reporte sin comprimir: el propio archivo fuente o un renderizado cacheado
+        if source.suffix == f".{fmt}":
+            plain = source
+        else:
+            plain = self.cache_dir / f"scan_{scan_id}" / f"{key}.{fmt}"
+            if not plain.exists() and not self._render(scan_id, fmt, source, plain):
+                return None
+
+        encoding = self.negotiate_encoding(accept_encoding)
+        if encoding is None:
+            return CachedReport(plain, self._etag(key, fmt, None))
+
+        compressed = self.cache_dir / f"scan_{scan_id}" / f"{key}.{fmt}{self.ENCODINGS[encoding]}"
+        if not compressed.exists():
+            try:
+                self._compress(plain, compressed, encoding)
+            except FileNotFoundError:
+                # Otra petición eliminó el renderizado entretanto: se regenera
+                if plain == source or not self._render(scan_id, fmt, source, plain):
+                    raise
+                self._compress(plain, compressed, encoding)
+
+        return CachedReport(compressed, self._etag(key, fmt, encoding), encoding)
+
+    def negotiate_encoding(self, accept_encoding: str) -> Optional[str]:
+        """Elige el mejor Content-Encoding aceptado por el cliente"""
+        accepted = {}
+        for part in accept_encoding.split(","):
+            token, _, params = part.strip().partition(";")
+            token = token.strip().lower()
+            if not token:
+                continue
+            quality = 1.0
+            params = params.strip()
+            if params.startswith("q="):
+                try:
+                    quality = float(params[2:])
+                except ValueError:
+                    quality = 0.0
+            accepted[token] = quality
+
+        for encoding in self.available_encodings():
+            if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+                return encoding
+        return None
+
+    @staticmethod
+    def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+        """Compara un header If-None-Match con el ETag actual (comparación débil)"""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+
+        current = etag[2:] if etag.startswith("W/") else etag
+        for candidate in if_none_match.split(","):
+            candidate = candidate.strip()
+            if candidate.startswith("W/"):
+                candidate = candidate[2:]
+            if candidate == current:
+                return True
+        return False
+
+    def _render(self, scan_id: str, fmt: str, source: Path, destination: Path) -> bool:
+        """
+        Renderiza un formato desde el análisis y descarta versiones obsoletas.
+
+        Returns:
+            False si el JSON no tiene el esquema del análisis
+        """
+        with open(source, 'r', encoding='utf-8') as f:
+            scan_data = json.load(f)
+
+        if not isinstance(scan_data, dict) or not self.is_analysis(scan_data):
+            logger.warning(f"scan_{scan_id}.json no es un análisis del servicio web: no se renderiza {fmt}")
+            return False
+
+        with report_render_duration.time(format=fmt):
+            content = self.renderers[fmt](scan_data)
+
+        # Eliminar renderizados de versiones anteriores del análisis. Solo los
+        # escritos antes que el análisis actual: uno posterior con otra clave
+        # es de una petición en curso que leyó el análisis previo
+        if destination.parent.exists():
+            current = source.stat().st_mtime_ns
+            for stale in destination.parent.glob(f"*.{fmt}*"):
+                if stale.name.startswith(destination.stem + "."):
+                    continue
+                try:
+                    if stale.stat().st_mtime_ns < current:
+                        stale.unlink(missing_ok=True)
+                except FileNotFoundError:
+                    pass
+
+        self._write_atomic(destination, content.encode('utf-8'))
+        logger.info(f"Reporte {fmt} renderizado bajo demanda: {scan_id}")
+        return True
+
+    def _compress(self, plain: Path, destination: Path, encoding: str) -> None:
+        """Genera la variante comprimida de un reporte"""
+        data = plain.read_bytes()
+        if encoding == "br":
+            compressed = brotli.compress(data, quality=11)
+        else:
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        self._write_atomic(destination, compressed)
+
+    @staticmethod
+    def _write_atomic(destination: Path, data: bytes) -> None:
+        """Escribe un archivo de forma atómica para tolerar peticiones concurrentes"""
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(destination.parent), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, destination)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
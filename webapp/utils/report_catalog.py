@@ -0,0 +1,268 @@
+"""
+Report Catalog
+==============
+Catálogo indexado de los reportes disponibles por escaneo.
+
+Evita recorrer ./reports con glob en cada petición y guarda, para cada
+análisis JSON, los offsets en bytes de sus secciones de primer nivel y
+de cada elemento de sus listas. Con ello la API puede servir una sección
+(p. ej. solo el resumen) o una página de vulnerabilidades leyendo
+únicamente ese fragmento del archivo, sin cargar el JSON completo.
+
+Autor: Scan Agent Team
+Versión: 1.0.0
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+import json
+import logging
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class ReportCatalog:
+    """Índice de reportes y secciones JSON por escaneo"""
+
+    # Formatos reconocidos en ./reports
+    FORMATS = ['json', 'html', 'txt', 'md']
+
+    # Tamaño de bloque para lecturas en streaming
+    CHUNK_SIZE = 64 * 1024
+
+    # Entradas mantenidas en memoria (el resto se relee del índice en disco)
+    MAX_CACHED_ENTRIES = 256
+
+    def __init__(self, reports_dir: str = "./reports"):
+        """
+        Inicializa el catálogo.
+
+        Args:
+            reports_dir: Directorio donde se guardan los reportes
+        """
+        self.reports_dir = Path(reports_dir)
+        self.index_dir = self.reports_dir / ".index"
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, scan_id: str) -> Optional[dict]:
+        """
+        Indexa los reportes de un escaneo y persiste la entrada del catálogo.
+
+        Args:
+            scan_id: ID del escaneo
+
+        Returns:
+            Entrada del catálogo o None si el escaneo no tiene reportes
+        """
+        files = {}
+        for fmt in self.FORMATS:
+            report_file = self.reports_dir / f"scan_{scan_id}.{fmt}"
+            if report_file.is_file():
+                stat = report_file.stat()
+                files[fmt] = {
+                    "filename": report_file.name,
+                    "size_bytes": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns
+                }
+
+        if not files:
+            return None
+
+        entry = {"scan_id": scan_id, "files": files, "sections": {}, "items": {}}
+
+        if "json" in files:
+            try:
+                sections, items = self._index_json(self.reports_dir / files["json"]["filename"])
+                entry["sections"] = sections
+                entry["items"] = items
+            except (ValueError, IndexError) as e:
+                logger.error(f"No se pudo indexar el JSON de {scan_id}: {e}")
+
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.index_dir / f"scan_{scan_id}.json", 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+
+        self._remember(scan_id, entry)
+        return entry
+
+    def get(self, scan_id: str) -> Optional[dict]:
+        """
+        Obtiene la entrada del catálogo de un escaneo.
+
+        Se consulta primero la memoria y después el índice en disco; si el
+        análisis JSON cambió desde que se indexó, se vuelve a indexar.
+        """
+        with self._lock:
+            entry = self._entries.get(scan_id)
+
+        if entry is None:
+            index_file = self.index_dir / f"scan_{scan_id}.json"
+            if index_file.exists():
+                try:
+                    with open(index_file, 'r', encoding='utf-8') as f:
+                        entry = json.load(f)
+                except Exception as e:
+                    logger.error(f"Índice corrupto para {scan_id}: {e}")
+
+        if entry is None or self._is_stale(entry):
+            return self.register(scan_id)
+
+        self._remember(scan_id, entry)
+        return entry
+
+    def json_path(self, scan_id: str) -> Optional[Path]:
+        """Retorna la ruta del análisis JSON si está catalogado"""
+        entry = self.get(scan_id)
+        if not entry or "json" not in entry["files"]:
+            return None
+        return self.reports_dir / entry["files"]["json"]["filename"]
+
+    def stream_section(self, scan_id: str, section: str) -> Optional[Iterator[bytes]]:
+        """
+        Genera los bytes de una sección de primer nivel del análisis.
+
+        El fragmento se copia tal cual del archivo: es JSON válido y no
+        requiere deserializar el documento.
+        """
+        entry = self.get(scan_id)
+        if not entry or section not in entry["sections"]:
+            return None
+
+        start, end = entry["sections"][section]
+        path = self.reports_dir / entry["files"]["json"]["filename"]
+        return self.iter_file_range(path, start, end)
+
+    def stream_items(self, scan_id: str, section: str, page: int,
+                     page_size: int) -> Optional[Iterator[bytes]]:
+        """
+        Genera una página de los elementos de una lista del análisis.
+
+        La respuesta tiene la forma
+        {"section", "page", "page_size", "total", "items": [...]} y los
+        elementos se copian directamente desde el archivo.
+        """
+        entry = self.get(scan_id)
+        if not entry or section not in entry["items"]:
+            return None
+
+        offsets = entry["items"][section]
+        first = (page - 1) * page_size
+        selected = offsets[first:first + page_size]
+
+        header = json.dumps({
+            "section": section,
+            "page": page,
+            "page_size": page_size,
+            "total": len(offsets)
+        }, ensure_ascii=False)[:-1] + ', "items": ['
+
+        path = self.reports_dir / entry["files"]["json"]["filename"]
+
+        def generate() -> Iterator[bytes]:
+            yield header.encode('utf-8')
+            if selected:
+                # Entre el primer y el último elemento solo hay comas y espacios
+                yield from self.iter_file_range(path, selected[0][0], selected[-1][1])
+            yield b']}'
+
+        return generate()
+
+    def iter_file_range(self, path: Path, start: int, end: int) -> Iterator[bytes]:
+        """Lee el rango [start, end) de un archivo en bloques"""
+        with open(path, 'rb') as f:
+            f.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = f.read(min(self.CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def _remember(self, scan_id: str, entry: dict) -> None:
+        """Guarda una entrada en memoria descartando las menos usadas"""
+        with self._lock:
+            self._entries[scan_id] = entry
+            self._entries.move_to_end(scan_id)
+            while len(self._entries) > self.MAX_CACHED_ENTRIES:
+                self._entries.popitem(last=False)
+
+    def _is_stale(self, entry: dict) -> bool:
+        """Comprueba si el análisis JSON cambió desde que se indexó"""
+        json_info = entry["files"].get("json")
+        if not json_info:
+            return False
+        json_file = self.reports_dir / json_info["filename"]
+        if not json_file.exists():
+            return True
+        stat = json_file.stat()
+        return stat.st_mtime_ns != json_info["mtime_ns"] or stat.st_size != json_info["size_bytes"]
+
+    @staticmethod
+    def _index_json(path: Path) -> Tuple[Dict[str, List[int]], Dict[str, List[List[int]]]]:
+        """
+        Calcula los offsets en bytes de las secciones de un objeto JSON.
+
+        Returns:
+            (secciones, elementos): rango [inicio, fin) de cada clave de primer
+            nivel y, para las listas, el rango de cada elemento
+        """
+        text = path.read_text(encoding='utf-8')
+        decoder = json.JSONDecoder()
+        ascii_only = text.isascii()
+        cursor = [0, 0]  # (posición en caracteres, posición en bytes)
+
+        def byte_offset(char_pos: int) -> int:
+            # Las llamadas son monótonas: se codifica solo el tramo nuevo
+            if ascii_only:
+                return char_pos
+            cursor[1] += len(text[cursor[0]:char_pos].encode('utf-8'))
+            cursor[0] = char_pos
+            return cursor[1]
+
+        def skip(pos: int) -> int:
+            return _WHITESPACE.match(text, pos).end()
+
+        sections = {}
+        items = {}
+
+        pos = skip(0)
+        if text[pos] != '{':
+            return sections, items
+        pos = skip(pos + 1)
+
+        while text[pos] != '}':
+            key, pos = decoder.raw_decode(text, pos)
+            pos = skip(pos)
+            if text[pos] != ':':
+                raise ValueError(f"Se esperaba ':' en la posición {pos}")
+            pos = skip(pos + 1)
+
+            start = byte_offset(pos)
+            if text[pos] == '[':
+                elements = []
+                pos = skip(pos + 1)
+                while text[pos] != ']':
+                    element_start = byte_offset(pos)
+                    _, pos = decoder.raw_decode(text, pos)
+                    elements.append([element_start, byte_offset(pos)])
+                    pos = skip(pos)
+                    if text[pos] == ',':
+                        pos = skip(pos + 1)
+                pos += 1
+                items[key] = elements
+            else:
+                _, pos = decoder.raw_decode(text, pos)
+
+            sections[key] = [start, byte_offset(pos)]
+            pos = skip(pos)
+            if text[pos] == ',':
+                pos = skip(pos + 1)
+
+        return sections, items